@@ -1,10 +1,100 @@
+from itertools import compress
+
+import numpy
 
 from openmdao.main.case import Case
 from openmdao.main.interfaces import implements, ICaseRecorder, ICaseIterator
 
+# Initial number of rows allocated for each column.
+_MIN_ROWS = 16
+
+# Value types stored in typed columns. Anything else is stored in an object
+# column.
+_SCALAR_TYPES = (bool, int, long, float, complex, numpy.bool_, numpy.number)
+
+
+def _column_dtype(value):
+    """Return the numpy dtype to be used for a column containing `value`."""
+    if isinstance(value, _SCALAR_TYPES):
+        return numpy.asarray(value).dtype  # Big longs become object.
+    return numpy.dtype(object)
+
+
+def _promote(dtype1, dtype2):
+    """Return the dtype for a column holding values of both dtypes. Typed
+    columns are only widened within a kind (int to int, etc.), otherwise
+    values would come back as a different type (an int as a float, say),
+    so mixed kinds use an object column.
+    """
+    if dtype1 == dtype2:
+        return dtype1
+    if dtype1.kind == dtype2.kind:
+        return numpy.promote_types(dtype1, dtype2)
+    return numpy.dtype(object)
+
+
+def _make_column(values):
+    """Return a 1D numpy array holding the sequence `values`."""
+    try:
+        arr = numpy.array(values)
+    except ValueError:  # Ragged.
+        pass
+    else:
+        if arr.ndim == 1 and arr.dtype.kind in 'biufc' and \
+           len(set(map(type, values))) == 1:  # Don't convert mixed types.
+            return arr
+    arr = numpy.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        arr[i] = value
+    return arr
+
+
+def _concatenate(col1, col2):
+    """Return `col1` followed by `col2`."""
+    dtype = _promote(col1.dtype, col2.dtype)
+    return numpy.concatenate((col1.astype(dtype), col2.astype(dtype)))
+
+
+# NaN never compares equal, so index keys use this single NaN object instead.
+_NAN = float('nan')
+
+
+def _key(values):
+    """Return hashable index key for a row of `values`."""
+    return tuple([_NAN if isinstance(val, float) and val != val else val
+                  for val in values])
+
+
+def _column_keys(col):
+    """Return list of the values in `col` suitable for index keys."""
+    values = col.tolist()
+    if col.dtype == object or \
+       (col.dtype.kind in 'fc' and numpy.isnan(col).any()):
+        values = [_NAN if isinstance(val, float) and val != val else val
+                  for val in values]
+    return values
+
+
+def _match(col, value):
+    """Return a boolean array indicating which entries of `col` equal
+    `value`.
+    """
+    if col.dtype != object:
+        if _column_dtype(value) == object:
+            return numpy.zeros(len(col), dtype=bool)
+        if value != value:  # NaN
+            return numpy.isnan(col)
+        return col == value
+    if isinstance(value, float) and value != value:
+        return numpy.array([isinstance(val, float) and val != val
+                            for val in col], dtype=bool)
+    return numpy.array([val == value for val in col], dtype=bool)
+
+
 class CaseArray(object):
     """A CaseRecorder/CaseIterator containing Cases having the same set of
     input/output strings but different data. Cases are not necessarily unique.
+    The values for each input/output are kept in a separate numpy array.
     """
     
     implements(ICaseIterator, ICaseRecorder)
@@ -35,7 +125,8 @@ class CaseArray(object):
             self._names = []
         else:
             self._names = names[:]
-        self._values = []
+        self._columns = None  # One array per name, allocated on first use.
+        self._len = 0         # Number of rows in use.
         if isinstance(obj, dict):
             self._add_dict_cases(obj)
         elif isinstance(obj, Case):
@@ -47,7 +138,7 @@ class CaseArray(object):
     
     def copy(self):
         ca = CaseArray(parent_uuid=self._parent_uuid, names=self._names)
-        ca._values = self._values[:]
+        ca._set_columns(self._get_columns())
         ca._split_idx = self._split_idx
         return ca
         
@@ -57,7 +148,10 @@ class CaseArray(object):
             values = self._get_case_data(case)
         except KeyError:
             raise KeyError("Case to be removed is not a member of this CaseArray")
-        self._values.remove(values)
+        idx = self._find(values)
+        if idx is None:
+            raise ValueError("Case to be removed is not a member of this CaseArray")
+        self._delete_row(idx)
 
     def _add_dict_cases(self, dct):
         length = -1
@@ -79,12 +173,10 @@ class CaseArray(object):
                 raise ValueError("number of values at key '%s' (%d) differs " % (key,len(val)) +
                                  "from number of other values (%d) in CaseSet" % length)
             biglist.append(val)
-        self._values = []
+        self._columns = None
+        self._len = 0
         if length > 0:
-            idxs = range(len(self._names))
-            for i in range(length):
-                lst = [biglist[j][i] for j in idxs]
-                self._add_values(lst)
+            self._add_columns([_make_column(lst) for lst in biglist])
 
     def _record_first_case(self, case):
         """Called the first time we record a Case"""
@@ -106,11 +198,12 @@ class CaseArray(object):
             tmp.extend(case.values(iotype='out'))
 
         self._names = names
+        self._columns = None
         self._add_values(tmp)
         
     def record(self, case):
         """Record the given Case."""
-        if not self._values:
+        if not self._len:
             self._record_first_case(case)
         else:
             self._add_values(self._get_case_data(case))
@@ -119,7 +212,7 @@ class CaseArray(object):
         return self._next_case()
 
     def _next_case(self):
-        for i in range(len(self._values)):
+        for i in range(self._len):
             yield self.__getitem__(i)
     
     def __getitem__(self, key):
@@ -129,15 +222,23 @@ class CaseArray(object):
         case.
         """
         if isinstance(key, basestring): # return all of the values for the given name
-            try: 
-                idx = self._names.index(key)
-            except ValueError as err: 
-                raise KeyError("CaseSet has no input or outputs named %s"%key )
-            return [lst[idx] for lst in self._values]
-        else:  # key is the case numbe
-            return self._case_from_values(self._values[key])
+            return self.get_column(key).tolist()
+        else:  # key is the case number
+            return self._case_from_values(self._get_row(key))
         
-    
+    def get_column(self, name):
+        """Return a numpy array of all of the recorded values corresponding
+        to the varname or expression `name`. The array shares data with
+        this container, so it should not be modified, and it may not
+        reflect Cases recorded later.
+        """
+        try: 
+            idx = self._names.index(name)
+        except ValueError: 
+            raise KeyError("CaseSet has no input or outputs named %s" % name)
+        if self._columns is None:
+            return numpy.array([])
+        return self._columns[idx][:self._len]
             
     def _case_from_values(self, values):
         return Case(inputs=[(n,v) for n,v in zip(self._names[0:self._split_idx],
@@ -156,10 +257,87 @@ class CaseArray(object):
             raise KeyError("input or output is missing from case: %s" % str(err))
         
     def _add_values(self, vals):
-        self._values.append(vals)
+        self._append_row(vals)
+
+    def _append_row(self, vals):
+        """Append a row of values, growing or converting columns as
+        necessary.
+        """
+        if self._columns is None:
+            self._columns = [numpy.empty(_MIN_ROWS, dtype=_column_dtype(val))
+                             for val in vals]
+        elif self._len == len(self._columns[0]):
+            for i, col in enumerate(self._columns):
+                new_col = numpy.empty(2*len(col), dtype=col.dtype)
+                new_col[:self._len] = col
+                self._columns[i] = new_col
+
+        row = self._len
+        for i, val in enumerate(vals):
+            col = self._columns[i]
+            if col.dtype != object:
+                dtype = _column_dtype(val)
+                if dtype != col.dtype:
+                    col = col.astype(_promote(col.dtype, dtype))
+                    self._columns[i] = col
+            col[row] = val
+        self._len += 1
+
+    def _add_columns(self, columns):
+        """Append rows given as one array per name."""
+        if self._columns is None or not self._len:
+            self._columns = [col.copy() for col in columns]
+            self._len = len(columns[0])
+        else:
+            self._columns = [_concatenate(col[:self._len], new_col)
+                             for col, new_col in zip(self._columns, columns)]
+            self._len = len(self._columns[0])
+
+    def _get_columns(self):
+        """Return a list of column arrays trimmed to the rows in use."""
+        if self._columns is None:
+            return []
+        return [col[:self._len] for col in self._columns]
+
+    def _set_columns(self, columns):
+        """Replace our rows with copies of the given column arrays."""
+        self._columns = None
+        self._len = 0
+        if columns and len(columns[0]):
+            self._add_columns(columns)
+
+    def _get_row(self, idx):
+        """Return a list of values for the `idx`'th row."""
+        if idx < 0:
+            idx += self._len
+        if idx < 0 or idx >= self._len:
+            raise IndexError('list index out of range')
+        return [col.item(idx) for col in self._columns]
+
+    def _delete_row(self, idx):
+        """Remove the `idx`'th row."""
+        if idx < 0:
+            idx += self._len
+        last = self._len - 1
+        for col in self._columns:
+            col[idx:last] = col[idx+1:self._len]
+            if col.dtype == object:
+                col[last] = None  # Release reference.
+        self._len = last
+
+    def _find(self, values):
+        """Return index of first row matching `values`, or None."""
+        if not self._len:
+            return None
+        mask = numpy.ones(self._len, dtype=bool)
+        for col, value in zip(self._columns, values):
+            mask &= _match(col[:self._len], value)
+            if not mask.any():
+                return None
+        return int(mask.nonzero()[0][0])
 
     def __len__(self):
-        return len(self._values)
+        return self._len
     
     def __contains__(self, case):
         if not isinstance(case, Case):
@@ -168,16 +346,14 @@ class CaseArray(object):
             values = self._get_case_data(case)
         except KeyError:
             return False
-        for val in self._values:
-            if val == values:
-                return True
-        return False
+        return self._find(values) is not None
     
     def clear(self):
         """Remove all case values from this container, but leave list of
         variables intact.
         """
-        self._values = []
+        self._columns = None
+        self._len = 0
 
     def update(self, *case_containers):
         """Add Cases from other CaseSets or CaseArrays to this one."""
@@ -186,7 +362,9 @@ class CaseArray(object):
                 self.record(case)
                 
     def pop(self, idx=-1):
-        return self._case_from_values(self._values.pop(idx))
+        values = self._get_row(idx)
+        self._delete_row(idx)
+        return self._case_from_values(values)
                 
     def _check_compatability(self, case_container):
         if self._names != case_container._names:
@@ -198,6 +376,7 @@ class CaseArray(object):
 class CaseSet(CaseArray):
     """A CaseRecorder/CaseIterator containing Cases having the same set of
     input/output strings but different data.  All Cases in the set are unique.
+    A set of value tuples is kept as an index for membership tests.
     """
     
     def __init__(self, obj=None, parent_uuid=None, names=None):
@@ -226,34 +405,90 @@ class CaseSet(CaseArray):
 
     def copy(self):
         cs = CaseSet(parent_uuid=self._parent_uuid, names=self._names)
-        cs._values = self._values[:]
+        cs._columns = [col.copy() for col in self._get_columns()] or None
+        cs._len = self._len
         cs._tupset = self._tupset.copy()
         cs._split_idx = self._split_idx
         return cs
         
     def _add_values(self, vals):
-        tup = tuple(vals)
+        tup = _key(vals)
         if tup not in self._tupset:
             self._tupset.add(tup)
-            self._values.append(tup)
+            self._append_row(vals)
+
+    def _add_columns(self, columns):
+        # Drop rows already present (or duplicated within `columns`).
+        keys = zip(*[_column_keys(col) for col in columns])
+        if not self._tupset:
+            tupset = set(keys)
+            if len(tupset) == len(keys):  # Common case, all unique.
+                self._tupset = tupset
+                super(CaseSet, self)._add_columns(columns)
+                return
+        tupset = self._tupset
+        keep = numpy.zeros(len(keys), dtype=bool)
+        for i, key in enumerate(keys):
+            if key not in tupset:
+                tupset.add(key)
+                keep[i] = True
+        if keep.all():
+            super(CaseSet, self)._add_columns(columns)
+        elif keep.any():
+            super(CaseSet, self)._add_columns([col[keep] for col in columns])
+
+    def _keys(self):
+        """Return list of value tuples, in row order."""
+        return zip(*[_column_keys(col) for col in self._get_columns()])
+
+    def _rows_in(self, tupset):
+        """Return boolean array indicating which rows are in `tupset`."""
+        return numpy.array(map(tupset.__contains__, self._keys()),
+                           dtype=bool)
 
     def __contains__(self, case):
         if not isinstance(case, Case):
             return False
         try:
-            values = tuple(self._get_case_data(case))
+            values = _key(self._get_case_data(case))
         except KeyError:
             return False
         return values in self._tupset
     
-    def _make_case_set(self, tupset):
+    def _make_case_set(self, columns, tupset):
         cs = CaseSet(parent_uuid=self._parent_uuid)
         cs._names = self._names[:]
-        cs._values = list(tupset)
+        if columns and len(columns[0]):
+            cs._columns = columns
+            cs._len = len(columns[0])
         cs._tupset = tupset
         cs._split_idx = self._split_idx
         return cs
     
+    def _select(self, tupset):
+        """Return a new CaseSet with our rows that are in `tupset`."""
+        if not tupset:
+            return self._make_case_set(None, tupset)
+        mask = self._rows_in(tupset)
+        return self._make_case_set([col[mask] for col in self._get_columns()],
+                                   tupset)
+
+    def subset(self, mask):
+        """Return a new CaseSet with the Cases selected by `mask`, in the
+        same order.
+
+        mask: sequence of bool
+            One entry per Case in this CaseSet (a numpy boolean array, for
+            example ``cs.get_column('y') > 0``), True for Cases to keep.
+        """
+        mask = numpy.asarray(mask, dtype=bool)
+        if mask.shape != (self._len,):
+            raise ValueError("mask length (%d) differs from number of Cases "
+                             "(%d) in CaseSet" % (mask.size, self._len))
+        tupset = set(compress(self._keys(), mask))
+        return self._make_case_set([col[mask] for col in self._get_columns()],
+                                   tupset)
+
     def isdisjoint(self, case_set):
         """Return True if this CaseSet has no Cases in common with the
         given CaseSet.
@@ -275,11 +510,21 @@ class CaseSet(CaseArray):
         """Return a new CaseSet with Cases from this one
         and all others.
         """
-        tupsets = []
         for cset in case_sets:
             self._check_compatability(cset)
-            tupsets.append(cset._tupset)
-        return self._make_case_set(self._tupset.union(*tupsets))
+        cs = self.copy()
+        for cset in case_sets:
+            if cset._len:
+                if cs._len:
+                    mask = ~cset._rows_in(cs._tupset)
+                    columns = [col[mask] for col in cset._get_columns()]
+                    cs._tupset.update(cset._tupset)
+                    if mask.any():
+                        CaseArray._add_columns(cs, columns)
+                else:
+                    cs._tupset = cset._tupset.copy()
+                    CaseArray._set_columns(cs, cset._get_columns())
+        return cs
     
     def intersection(self, *case_sets):
         """Return a new CaseSet with Cases that are common to this
@@ -289,7 +534,7 @@ class CaseSet(CaseArray):
         for cset in case_sets:
             self._check_compatability(cset)
             tupsets.append(cset._tupset)
-        return self._make_case_set(self._tupset.intersection(*tupsets))
+        return self._select(self._tupset.intersection(*tupsets))
     
     def difference(self, *case_sets):
         """Return a new CaseSet with Cases in this that are not in the
@@ -299,14 +544,14 @@ class CaseSet(CaseArray):
         for cset in case_sets:
             self._check_compatability(cset)
             tupsets.append(cset._tupset)
-        return self._make_case_set(self._tupset.difference(*tupsets))
+        return self._select(self._tupset.difference(*tupsets))
     
     def symmetric_difference(self, case_set):
         """Return a new CaseSet with Cases in either this one or the other but
         not both.
         """
         self._check_compatability(case_set)
-        return self._make_case_set(self._tupset.symmetric_difference(case_set._tupset))
+        return self.difference(case_set).union(case_set.difference(self))
     
     def clear(self):
         """Remove all case values from this CaseSet, but leave list of
@@ -316,17 +561,22 @@ class CaseSet(CaseArray):
         self._tupset = set()
 
     def pop(self, idx=-1):
-        vals = self._values.pop(idx)
-        self._tupset.remove(vals)
+        vals = self._get_row(idx)
+        self._delete_row(idx)
+        self._tupset.remove(_key(vals))
         return self._case_from_values(vals)
                 
     def remove(self, case):
         try:
-            values = tuple(self._get_case_data(case))
+            values = self._get_case_data(case)
         except KeyError:
             raise KeyError("Case to be removed is not a member of this CaseSet")
-        self._tupset.remove(values)
-        self._values.remove(values)
+        key = _key(values)
+        idx = self._find(values)
+        if idx is None or key not in self._tupset:
+            raise KeyError("Case to be removed is not a member of this CaseSet")
+        self._tupset.remove(key)
+        self._delete_row(idx)
 
     def __eq__(self, caseset):
         self._check_compatability(caseset)
@@ -1,10 +1,15 @@
 
 import sys
+import time
 import sqlite3
 import uuid
 from cPickle import dumps, loads, HIGHEST_PROTOCOL, UnpicklingError
+from itertools import groupby
+from operator import itemgetter
 from optparse import OptionParser
 
+from numpy import array
+
 from openmdao.main.interfaces import implements, ICaseRecorder, ICaseIterator
 from openmdao.main.case import Case
 
@@ -24,6 +29,36 @@ def _query_split(query):
         raise ValueError("No allowable operator found in query '%s'" % query)
 
 
+def _selector_sql(selector, table):
+    """Return a tuple of (sql, args) for a selector of the form 'lhs op rhs'
+    on the given table.  A literal *rhs* (a number or a quoted string) is
+    passed as a bound parameter rather than being interpolated into the SQL.
+    """
+    lhs, rel, rhs = _query_split(selector)
+    if len(rhs) > 1 and rhs[0] == rhs[-1] and rhs[0] in '"\'':
+        return ("%s.%s%s?" % (table, lhs, rel), [rhs[1:-1]])
+    for typ in (int, float):
+        try:
+            return ("%s.%s%s?" % (table, lhs, rel), [typ(rhs)])
+        except ValueError:
+            pass
+    if rhs in _casetable_attrs:
+        return ("%s.%s%scases.%s" % (table, lhs, rel, rhs), [])
+    if rhs in _vartable_attrs:
+        return ("%s.%s%scasevars.%s" % (table, lhs, rel, rhs), [])
+    raise ValueError("invalid right hand side in query '%s'" % selector)
+
+def _unpickle_value(vname, value, case_id):
+    """Return `value` unpickled if it isn't a float, int, or str."""
+    if isinstance(value, (float,int,str)):
+        return value
+    try:
+        return loads(str(value))
+    except UnpicklingError as err:
+        raise UnpicklingError("can't unpickle value '%s' for case '%s' from database: %s" %
+                              (vname, case_id, str(err)))
+
+
 class DBCaseIterator(object):
     """Pulls Cases from a relational DB (sqlite). It doesn't support
     general sql queries, but it does allow for a series of boolean
@@ -60,67 +95,85 @@ class DBCaseIterator(object):
         return self._next_case()
 
     def _next_case(self):
-        """ Generator which returns Cases one at a time. """
+        """ Generator which returns Cases one at a time. All Cases are
+        retrieved by a single query ordered by Case id.
+        """
         # figure out which selectors are for cases and which are for variables
-        sql = ["SELECT * FROM cases"]
-        if self.selectors is not None:
-            for sel in self.selectors:
-                rhs,rel,lhs = _query_split(sel)
-                if rhs in _casetable_attrs:
-                    if len(sql) == 1:
-                        sql.append("WHERE %s%s%s" % (rhs,rel,lhs))
-                    else:
-                        sql.append("AND %s%s%s" % (rhs,rel,lhs))
-            
-        casecur = self._connection.cursor()
-        casecur.execute(' '.join(sql))
-          
-        sql = ['SELECT var_id,name,case_id,sense,value from casevars WHERE case_id=%s']
+        where = []
+        args = []
         if self.selectors is not None:
             for sel in self.selectors:
-                rhs,rel,lhs = _query_split(sel)
-                if rhs in _vartable_attrs:
-                    sql.append("AND %s%s%s" % (rhs,rel,lhs))
-        combined = ' '.join(sql)
-        varcur = self._connection.cursor()
+                lhs = _query_split(sel)[0]
+                if lhs in _casetable_attrs:
+                    table = 'cases'
+                elif lhs in _vartable_attrs:
+                    table = 'casevars'
+                else:
+                    continue
+                sql, selargs = _selector_sql(sel, table)
+                where.append(sql)
+                args.extend(selargs)
         
-        for cid,text_id,parent,label,msg,retries,model_id,timeEnter in casecur:
-            varcur.execute(combined % cid)
+        sql = ["SELECT cases.id, cases.uuid, cases.parent, cases.label,",
+               "cases.msg, cases.retries, casevars.name, casevars.sense,",
+               "casevars.value FROM cases",
+               "JOIN casevars ON casevars.case_id=cases.id"]
+        if where:
+            sql.append("WHERE %s" % ' AND '.join(where))
+        sql.append("ORDER BY cases.id, casevars.var_id")
+        
+        cur = self._connection.cursor()
+        cur.execute(' '.join(sql), args)
+        
+        for cid, rows in groupby(cur, itemgetter(0)):
             inputs = []
             outputs = []
-            for var_id, vname, case_id, sense, value in varcur:
-                if not isinstance(value, (float,int,str)):
-                    try:
-                        value = loads(str(value))
-                    except UnpicklingError as err:
-                        raise UnpicklingError("can't unpickle value '%s' for case '%s' from database: %s" %
-                                              (vname, cname, str(err)))
+            for cid, text_id, parent, label, msg, retries, vname, sense, value in rows:
+                value = _unpickle_value(vname, value, text_id)
                 if sense=='i':
                     inputs.append((vname, value))
                 else:
                     outputs.append((vname, value))
-            if len(inputs) > 0 or len(outputs) > 0:
-                yield Case(inputs=inputs, outputs=outputs,
-                           retries=retries,msg=msg,label=label,
-                           case_uuid=text_id, parent_uuid=parent)
+            yield Case(inputs=inputs, outputs=outputs,
+                       retries=retries,msg=msg,label=label,
+                       case_uuid=text_id, parent_uuid=parent)
             
 
 class DBCaseRecorder(object):
     """Records Cases to a relational DB (sqlite). Values other than floats,
     ints or strings are pickled and are opaque to SQL queries.
+    
+    By default each Case is committed as soon as it is recorded. If
+    *batch_size* is greater than 1, Cases are buffered and written in a single
+    transaction once *batch_size* Cases have accumulated or *flush_interval*
+    seconds have passed since the last write, whichever happens first.
+    File databases are switched to write-ahead logging in this mode. Any
+    remaining buffered Cases are written at the end of each run of the
+    owning Driver, by :meth:`get_iterator`, or by :meth:`flush` or
+    :meth:`close`.
     """
     
     implements(ICaseRecorder)
     
-    def __init__(self, dbfile=':memory:', model_id='', append=False):
+    def __init__(self, dbfile=':memory:', model_id='', append=False,
+                 batch_size=1, flush_interval=None):
         self.dbfile = dbfile  # this creates the connection
         self.model_id = model_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._cases = []
+        self._vars = []
+        self._last_flush = time.time()
         
         if append:
             exstr = 'if not exists'
         else:
             exstr = ''
         
+        if batch_size > 1 and dbfile != ':memory:':
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        
         self._connection.execute("""
         create table %s cases(
          id INTEGER PRIMARY KEY,
@@ -141,6 +194,12 @@ class DBCaseRecorder(object):
          sense TEXT,
          value BLOB
          )""" % exstr)
+        
+        self._connection.execute("""
+        create index if not exists casevars_case_id on casevars(case_id)""")
+        self._connection.execute("""
+        create index if not exists casevars_name on casevars(name)""")
+        self._connection.commit()
 
     @property
     def dbfile(self):
@@ -157,35 +216,59 @@ class DBCaseRecorder(object):
     
     def record(self, case):
         """Record the given Case."""
-        cur = self._connection.cursor()
-        
-        cur.execute("""insert into cases(id,uuid,parent,label,msg,retries,model_id,timeEnter) 
-                           values (?,?,?,?,?,?,?,DATETIME('NOW'))""", 
-                                     (None, case.uuid, case.parent_uuid, case.label,
-                                      case.msg or '', case.retries, 
-                                      self.model_id))
-        case_id = cur.lastrowid
-        # insert the inputs and outputs into the vars table.  Pickle them if they're not one of the
-        # built-in types int, float, or str.
+        # Pickle values if they're not one of the built-in types int,
+        # float, or str.
+        # Same format as SQLite's DATETIME('NOW'), taken now rather than
+        # when the buffered Case is written.
+        self._cases.append((case.uuid, case.parent_uuid, case.label,
+                            case.msg or '', case.retries, self.model_id,
+                            time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())))
+        case_vars = []
+        for sense in ('i', 'o'):
+            for name, value in case.items(iotype='in' if sense == 'i' else 'out'):
+                if not isinstance(value, (float,int,str)):
+                    value = sqlite3.Binary(dumps(value, HIGHEST_PROTOCOL))
+                case_vars.append((name, sense, value))
+        self._vars.append(case_vars)
         
-        for name,value in case.items(iotype='in'):
-            if isinstance(value, (float,int,str)):
-                v = (None, name, case_id, 'i', value)
-            else:
-                v = (None, name, case_id, 'i', sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
-                        v)
-        for name,value in case.items(iotype='out'):
-            if isinstance(value, (float,int,str)):
-                v = (None, name, case_id, 'o', value)
-            else:
-                v = (None, name, case_id, 'o', sqlite3.Binary(dumps(value,HIGHEST_PROTOCOL)))
-            cur.execute("insert into casevars(var_id,name,case_id,sense,value) values(?,?,?,?,?)", 
-                        v)
-        self._connection.commit()
+        if len(self._cases) >= self.batch_size or \
+           (self.flush_interval is not None and
+            time.time() - self._last_flush >= self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """Write any buffered Cases to the DB and commit them."""
+        if self._cases:
+            cur = self._connection.cursor()
+            rows = []
+            for case_row, case_vars in zip(self._cases, self._vars):
+                cur.execute("""insert into cases(id,uuid,parent,label,msg,retries,model_id,timeEnter) 
+                                   values (NULL,?,?,?,?,?,?,?)""", 
+                            case_row)
+                case_id = cur.lastrowid
+                rows.extend([(name, case_id, sense, value)
+                             for name, sense, value in case_vars])
+            cur.executemany("insert into casevars(var_id,name,case_id,sense,value) values(NULL,?,?,?,?)", 
+                            rows)
+            self._connection.commit()
+            self._cases = []
+            self._vars = []
+        self._last_flush = time.time()
+    
+    def close(self):
+        """Flush any buffered Cases and close the DB connection."""
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
     
+    def __del__(self):
+        if getattr(self, '_connection', None) is not None:
+            self.flush()
+
     def get_iterator(self):
         """Return a DBCaseIterator that points to our current DB."""
+        self.flush()
         return DBCaseIterator(dbfile=self._dbfile, connection=self._connection)
 
 
@@ -207,7 +290,8 @@ def list_db_vars(dbname):
     varnames = set([v for v in varcur])
     return varnames
 
-def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=False):
+def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=False,
+                    arrays=False):
     """
     Retrieve the values of specified variables from a sqlite DB containing
     Case data.
@@ -234,57 +318,51 @@ def case_db_to_dict(dbname, varnames, case_sql='', var_sql='', include_errors=Fa
     include_errors: bool (optional) [False]
         If True, include data from cases that reported an error.
         
+    arrays: bool (optional) [False]
+        If True, the values of variables that are all ints or floats are
+        returned as a numpy array rather than a list.
+        
     """
     connection = sqlite3.connect(dbname)
     vardict = dict([(name,[]) for name in varnames])
-
-    sql = ["SELECT id FROM cases"]
+    
+    sql = ["SELECT casevars.case_id, casevars.name, casevars.value",
+           "FROM casevars JOIN cases ON cases.id=casevars.case_id"]
     qlist = []
+    args = []
+    if vardict:
+        qlist.append("casevars.name IN (%s)" % ','.join(['?']*len(vardict)))
+        args.extend(vardict.keys())
     if case_sql:
-        qlist.append(case_sql)
+        qlist.append("(%s)" % case_sql)
     if not include_errors:
-        qlist.append("msg = ''")
-            
+        qlist.append("cases.msg = ''")
+    if var_sql:
+        qlist.append("(%s)" % var_sql)
     if qlist:
         sql.append("WHERE %s" % ' AND '.join(qlist))
-        
-    casecur = connection.cursor()
-    casecur.execute(' '.join(sql))
+    sql.append("ORDER BY casevars.case_id")
     
-    sql = ["SELECT name, value from casevars WHERE case_id=%s"]
-    vars_added = False
-    for i,name in enumerate(vardict.keys()):
-        if i==0:
-            sql.append("AND (")
-        else:
-            sql.append("OR")
-        sql.append("name='%s'" % name)
-        vars_added = True
-    if vars_added: sql.append(")")
-    
-    if var_sql:
-        sql.append(" AND %s" % var_sql)
-    combined = ' '.join(sql)
+    cur = connection.cursor()
+    cur.execute(' '.join(sql), args)
     
-    varcur = connection.cursor()
-    
-    for case_id in casecur:
+    for case_id, rows in groupby(cur, itemgetter(0)):
         casedict = {}
-        varcur.execute(combined % case_id)
-        for vname, value in varcur:
-            if not isinstance(value, (float,int,str)):
-                try:
-                    value = loads(str(value))
-                except UnpicklingError as err:
-                    raise UnpicklingError("can't unpickle value '%s' from database: %s" %
-                                          (vname, str(err)))
-            casedict[vname] = value
+        for case_id, vname, value in rows:
+            casedict[vname] = _unpickle_value(vname, value, case_id)
         
         if len(casedict) != len(vardict):
             continue   # case doesn't contain a complete set of specified vars, so skip it to avoid data mismatches
         
         for name, value in casedict.items():
             vardict[name].append(value)
+    
+    connection.close()
+    
+    if arrays:
+        for name, values in vardict.items():
+            if all([isinstance(v, (float,int)) for v in values]):
+                vardict[name] = array(values)
             
     return vardict
 
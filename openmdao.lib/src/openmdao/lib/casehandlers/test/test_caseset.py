@@ -1,5 +1,7 @@
 import unittest
 
+import numpy
+
 from openmdao.main.api import Case
 from openmdao.lib.casehandlers.api import CaseSet, CaseArray, ListCaseIterator, \
                                           caseiter_to_caseset
@@ -77,6 +79,26 @@ class CaseArrayTestCase(unittest.TestCase):
         self.assertFalse(self.case2 in ca)
         self.assertFalse(None in ca)
         
+    def test_columns(self):
+        ca = CaseArray()
+        for i in range(100):
+            ca.record(Case(inputs=[('x',i),('s','s%d' % (i%3))],
+                           outputs=[('y',0.5*i)]))
+        ca.record(Case(inputs=[('x',2.5),('s','s0')], outputs=[('y',1.)]))
+        self.assertEqual(101, len(ca))
+        # mixing ints and floats doesn't change the type of recorded values
+        self.assertEqual(ca.get_column('x').dtype, object)
+        self.assertTrue(type(ca[3]['x']) is int)
+        self.assertEqual(ca.get_column('y').dtype, numpy.float64)
+        self.assertEqual(ca.get_column('s').dtype, object)
+        self.assertTrue(numpy.all(ca.get_column('y')[:100] == 0.5*numpy.arange(100)))
+        self.assertEqual(ca['s'][:4], ['s0','s1','s2','s0'])
+        self.assertEqual(ca[-1]['x'], 2.5)
+        ca.remove(Case(inputs=[('x',3),('s','s0')], outputs=[('y',1.5)]))
+        self.assertEqual(100, len(ca))
+        self.assertEqual(ca['x'][:4], [0,1,2,4])
+        self.assertRaises(KeyError, ca.get_column, 'z')
+
 
 class CaseSetTestCase(unittest.TestCase):
 
@@ -253,6 +275,54 @@ class CaseSetTestCase(unittest.TestCase):
         for c1,c2 in zip(cs1, cs2):
             self.assertEqual(c1, c2)
         
+    def test_nan(self):
+        nan = float('nan')
+        cs = CaseSet()
+        cs.record(Case(inputs=[('x',1)], outputs=[('y',nan)]))
+        cs.record(Case(inputs=[('x',1)], outputs=[('y',float('nan'))]))
+        cs.record(Case(inputs=[('x',2)], outputs=[('y',1.)]))
+        self.assertEqual(2, len(cs))
+        case = Case(inputs=[('x',1)], outputs=[('y',float('nan'))])
+        self.assertTrue(case in cs)
+        cs2 = cs.copy()
+        cs2.remove(case)
+        self.assertFalse(case in cs2)
+        self.assertEqual(cs2['x'], [2])
+        self.assertEqual((cs - cs2)['x'], [1])
+        
+    def test_subset(self):
+        cs = CaseSet({'x': range(10), 'y': [1.5*i for i in range(10)]})
+        sub = cs.subset(cs.get_column('x') % 3 == 0)
+        self.assertEqual(sub['x'], [0, 3, 6, 9])
+        self.assertEqual(sub['y'], [0., 4.5, 9., 13.5])
+        self.assertTrue(cs[3] in sub)
+        self.assertFalse(cs[4] in sub)
+        self.assertEqual(len(cs.subset([False]*10)), 0)
+        self.assertRaises(ValueError, cs.subset, [True])
+        
+    def test_remove(self):
+        cs = CaseSet({'x': [1, 2, 3], 'y': [1.5, 2.5, 3.5]})
+        self.assertEqual(cs.get_column('x').dtype.kind, 'i')
+        cs.record(Case(inputs=[('x', 4.5), ('y', 4.5)]))
+        self.assertEqual(cs['x'], [1, 2, 3, 4.5])
+        self.assertTrue(type(cs[0]['x']) is int)
+        cs.remove(Case(inputs=[('x', 2), ('y', 2.5)]))
+        self.assertEqual(cs['x'], [1, 3, 4.5])
+        self.assertRaises(KeyError, cs.remove,
+                          Case(inputs=[('x', 2), ('y', 2.5)]))
+        self.assertEqual(3, len(cs))
+        
+    def test_set_ops_order(self):
+        cs1 = CaseSet({'x': range(10)})
+        cs2 = CaseSet({'x': range(5, 15)})
+        cs3 = CaseSet({'x': range(12, 20)})
+        self.assertEqual(cs1.union(cs2, cs3)['x'], range(20))
+        self.assertEqual((cs2 & cs1)['x'], range(5, 10))
+        self.assertEqual((cs2 - cs1)['x'], range(10, 15))
+        self.assertEqual(cs1.symmetric_difference(cs2)['x'],
+                         range(5) + range(10, 15))
+        self.assertEqual(len(CaseSet({'x': [1, 1, 2]})), 2)
+        
 if __name__ == "__main__":
     unittest.main()
 
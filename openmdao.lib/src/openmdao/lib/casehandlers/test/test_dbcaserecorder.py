@@ -10,6 +10,10 @@ import tempfile
 import logging
 import shutil
 import copy
+import sqlite3
+import time
+
+from numpy import ndarray, arange
 
 from openmdao.main.api import Component, Assembly, Case, set_as_top
 from openmdao.test.execcomp import ExecComp
@@ -106,6 +110,19 @@ class DBCaseRecorderTestCase(unittest.TestCase):
                 self.assertTrue(value >= 0 and value<3)
         self.assertEqual(count, 3)
 
+    def test_case_query(self):
+        recorder = DBCaseRecorder()
+        for i in range(10):
+            inputs = [('comp1.x', i), ('comp1.y', i*2.)]
+            outputs = [('comp1.z', i*1.5)]
+            recorder.record(Case(inputs=inputs, outputs=outputs, label='case%s'%i))
+        iterator = recorder.get_iterator()
+        iterator.selectors = ["label='case3'", "name<>'comp1.y'"]
+        cases = list(iterator)
+        self.assertEqual(len(cases), 1)
+        self.assertEqual(cases[0].label, 'case3')
+        self.assertEqual(cases[0].items(), [('comp1.x', 3), ('comp1.z', 4.5)])
+
     def test_tables_already_exist(self):
         dbdir = tempfile.mkdtemp()
         dbname = os.path.join(dbdir,'junk_dbfile')
@@ -126,6 +143,67 @@ class DBCaseRecorderTestCase(unittest.TestCase):
         except OSError:
             logging.error("problem removing directory %s" % dbdir)
         
+    def test_buffered(self):
+        tmpdir = tempfile.mkdtemp()
+        dfile = os.path.join(tmpdir, 'junk.db')
+        recorder = DBCaseRecorder(dfile, batch_size=4)
+        for i in range(10):
+            inputs = [('comp1.x', i), ('comp1.y', i*2.)]
+            outputs = [('comp1.z', i*1.5)]
+            recorder.record(Case(inputs=inputs, outputs=outputs, label='case%s'%i))
+        
+        # only complete batches have been written so far
+        varinfo = case_db_to_dict(dfile, ['comp1.x', 'comp1.z'])
+        self.assertEqual(varinfo['comp1.x'], range(8))
+        
+        recorder.close()
+        varinfo = case_db_to_dict(dfile, ['comp1.x', 'comp1.z'])
+        self.assertEqual(varinfo['comp1.x'], range(10))
+        self.assertEqual(varinfo['comp1.z'], [i*1.5 for i in range(10)])
+        
+        varinfo = case_db_to_dict(dfile, ['comp1.x', 'comp1.z'], arrays=True)
+        self.assertTrue(isinstance(varinfo['comp1.z'], ndarray))
+        self.assertTrue(all(varinfo['comp1.z'] == arange(10)*1.5))
+        
+        connection = sqlite3.connect(dfile)
+        indexes = set([row[0] for row in connection.execute(
+                      "SELECT name FROM sqlite_master WHERE type='index'")])
+        connection.close()
+        self.assertEqual(indexes, set(['casevars_case_id', 'casevars_name']))
+
+        try:
+            shutil.rmtree(tmpdir)
+        except OSError:
+            logging.error("problem removing directory %s" % tmpdir)
+
+    def test_buffered_tail(self):
+        tmpdir = tempfile.mkdtemp()
+        dfile = os.path.join(tmpdir, 'junk.db')
+        # fewer cases than batch_size, written at the end of the driver run
+        self.top.driver.recorders = [DBCaseRecorder(dfile, batch_size=25)]
+        self.top.run()
+        varinfo = case_db_to_dict(dfile, ['comp1.x', 'comp2.z'])
+        self.assertEqual(sorted(varinfo['comp1.x']), range(10))
+        self.assertEqual(sorted(varinfo['comp2.z']),
+                         [i*3.+1. for i in range(10)])
+
+        self.top.driver.recorders[0].close()
+        try:
+            shutil.rmtree(tmpdir)
+        except OSError:
+            logging.error("problem removing directory %s" % tmpdir)
+
+    def test_buffered_time(self):
+        # each Case gets the time it was recorded, not when it was written
+        recorder = DBCaseRecorder(batch_size=2)
+        recorder.record(Case(inputs=[('comp1.x', 1)], label='case1'))
+        time.sleep(1.1)
+        recorder.record(Case(inputs=[('comp1.x', 2)], label='case2'))
+        times = [row[0] for row in recorder._connection.execute(
+                 "SELECT timeEnter FROM cases ORDER BY id")]
+        self.assertEqual(len(times), 2)
+        self.assertTrue(times[0] < times[1])
+
     def test_db_to_dict(self):
         tmpdir = tempfile.mkdtemp()
         dfile = os.path.join(tmpdir, 'junk.db')
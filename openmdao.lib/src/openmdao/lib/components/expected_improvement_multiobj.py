@@ -3,19 +3,24 @@
 import logging
 
 try:
-    from numpy import exp, abs, pi, array,isnan, diag, random
+    from numpy import exp, pi, asarray, column_stack, isnan, random, sqrt, \
+                      vectorize, zeros
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 _check=['numpy']
 try:
-    from math import erf
-except ImportError as err:
-    logging.warn("In %s: %r" % (__file__, err))
+    from scipy.special import erf  # ufunc, evaluates arrays directly.
+except ImportError:
     try:
-        from scipy.special import erf
+        from math import erf as _erf
     except ImportError as err:
         logging.warn("In %s: %r" % (__file__, err))
         _check.append('scipy')
+    else:
+        try:
+            erf = vectorize(_erf, otypes=[float])
+        except NameError:  # No numpy.
+            pass
 
 from openmdao.lib.datatypes.api import Slot, Str, ListStr, Enum, \
      Float, Array,Event, Int
@@ -60,108 +65,129 @@ class MultiObjExpectedImprovement(Component):
         self.y_star = None
     
     def get_y_star(self):
-        criteria_count = len(self.criteria)
-        
-        flat_crit= self.criteria.ravel()
-
         try:
-            y_star = zip(*[self.best_cases[crit] for crit in self.criteria])
+            y_star = column_stack([self.best_cases.get_column(crit)
+                                   for crit in self.criteria])
         except KeyError:
             self.raise_exception('no cases in the provided case_set had output '
                  'matching the provided criteria, %s'%self.criteria, ValueError)
         
         #sort list on first objective
-        y_star = array(y_star)[array([i[0] for i in y_star]).argsort()]
+        y_star = y_star[y_star[:, 0].argsort()]
         return y_star
         
     def _2obj_PI(self,mu,sigma):
         """Calculates the multi-objective probability of improvement
-        for a new point with two responses. Takes as input a 
-        pareto frontier, mean and sigma of new point."""
+        for new points with two responses. Takes as input the mean and
+        sigma of the new points, arrays of shape (npoints, 2). Returns an
+        array of length npoints."""
         
         y_star = self.y_star
+        cdf1 = _normal_cdf(y_star[:, 0], mu[:, 0], sigma[:, 0])
+        cdf2 = _normal_cdf(y_star[:, 1], mu[:, 1], sigma[:, 1])
 
-        PI1 = (0.5+0.5*erf((1/(2**0.5))*((y_star[0][0]-mu[0])/sigma[0])))
-        PI3 = (1-(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][0]-mu[0])/sigma[0]))))\
-        *(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][1]-mu[1])/sigma[1])))
-     
-        PI2 = 0
-        if len(y_star)>1:
-            for i in range(len(y_star)-1):
-                PI2=PI2+((0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][0]-mu[0])/sigma[0])))\
-                -(0.5+0.5*erf((1/(2**0.5))*((y_star[i][0]-mu[0])/sigma[0]))))\
-                *(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][1]-mu[1])/sigma[1])))
-        mcpi = PI1+PI2+PI3
-        return mcpi
+        PI1 = cdf1[:, 0]
+        PI2 = ((cdf1[:, 1:]-cdf1[:, :-1])*cdf2[:, 1:]).sum(axis=1)
+        PI3 = (1-cdf1[:, -1])*cdf2[:, -1]
+        return PI1+PI2+PI3
     
-    def _2obj_EI(self,mu,sigma):
+    def _2obj_EI(self,mu,sigma,PI):
         """Calculates the multi-criteria expected improvement
-        for a new point with two responses. Takes as input a 
-        pareto frontier, mean and sigma of new point."""
+        for new points with two responses. Takes as input the mean and
+        sigma of the new points, arrays of shape (npoints, 2), and their
+        probability of improvement. Returns an array of length npoints."""
         
         y_star = self.y_star
-        ybar11 = mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[0][0]-mu[0])/sigma[0])))\
-        -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[0][0]-mu[0])**2/sigma[0]**2))
-        ybar13 = (mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][0]-mu[0])/sigma[0])))\
-        -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[-1][0]-mu[0])**2/sigma[0]**2)))\
-        *(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][1]-mu[1])/sigma[1])))
-        
-        ybar12 = 0
-        if len(y_star)>1:
-            for i in range(len(y_star)-1):
-                ybar12 = ybar12+((mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][0]-mu[0])/sigma[0])))\
-                -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i+1][0]-mu[0])**2/sigma[0]**2)))\
-                -(mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i][0]-mu[0])/sigma[0])))\
-                -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i][0]-mu[0])**2/sigma[0]**2))))\
-                *(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][1]-mu[1])/sigma[1])))
-
-        ybar1 = (ybar11+ybar12+ybar13)/self.PI
-        
-        ybar21 = mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[0][1]-mu[1])/sigma[1])))\
-        -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[0][1]-mu[1])**2/sigma[1]**2))
-        ybar23 = (mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][1]-mu[1])/sigma[1])))\
-        -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[-1][1]-mu[1])**2/sigma[1]**2)))\
-        *(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][0]-mu[0])/sigma[0])))
-
-        ybar22 = 0
-        if len(y_star)>1:
-            for i in range(len(y_star)-1):
-                ybar22 = ybar22+((mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][1]-mu[1])/sigma[1])))\
-                -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i+1][1]-mu[1])**2/sigma[1]**2)))\
-                -(mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i][1]-mu[1])/sigma[1])))\
-                -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i][1]-mu[1])**2/sigma[1]**2))))\
-                *(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][0]-mu[0])/sigma[0])))
+        cdf1 = _normal_cdf(y_star[:, 0], mu[:, 0], sigma[:, 0])
+        cdf2 = _normal_cdf(y_star[:, 1], mu[:, 1], sigma[:, 1])
+        mom1 = _partial_mean(y_star[:, 0], mu[:, 0], sigma[:, 0], cdf1)
+        mom2 = _partial_mean(y_star[:, 1], mu[:, 1], sigma[:, 1], cdf2)
+
+        ybar11 = mom1[:, 0]
+        ybar12 = ((mom1[:, 1:]-mom1[:, :-1])*cdf2[:, 1:]).sum(axis=1)
+        ybar13 = mom1[:, -1]*cdf2[:, -1]
+        ybar1 = (ybar11+ybar12+ybar13)/PI
         
-        ybar2 = (ybar21+ybar22+ybar23)/self.PI
-        dists = [((ybar1-point[0])**2+(ybar2-point[1])**2)**0.5 for point in y_star]
-        mcei = self.PI*min(dists)
-        if isnan(mcei):
-            mcei = 0
+        ybar21 = mom2[:, 0]
+        ybar22 = ((mom2[:, 1:]-mom2[:, :-1])*cdf1[:, 1:]).sum(axis=1)
+        ybar23 = mom2[:, -1]*cdf1[:, -1]
+        ybar2 = (ybar21+ybar22+ybar23)/PI
+
+        dists = sqrt((ybar1[:, None]-y_star[None, :, 0])**2 +
+                     (ybar2[:, None]-y_star[None, :, 1])**2)
+        mcei = PI*dists.min(axis=1)
+        mcei[isnan(mcei)] = 0
         return mcei
  
-    def _dom(self,a,b):
-        """determines if a completely dominates b
-       returns True is if does
-    """
-        comp = [c1<c2 for c1,c2 in zip(a,b)]
-        if sum(comp)==len(self.criteria):
-            return True        
-        return False
-    
     def _nobj_PI(self,mu,sigma):
-        cov = diag(array(sigma)**2)
-        rands = random.multivariate_normal(mu,cov,self.n)
-        num = 0 #number of cases that dominate the current Pareto set
-
-        for random_sample in rands:
-            for par_point in self.y_star:
-                #par_point = [p[2] for p in par_point.outputs]
-                if self._dom(par_point,random_sample):
-                    num = num+1
-                    break
-        pi = (self.n-num)/float(self.n)
+        """Monte Carlo estimate of the probability of improvement for new
+        points with any number of responses. Takes as input the mean and
+        sigma of the new points, arrays of shape (npoints, nobj). Returns
+        an array of length npoints."""
+        y_star = self.y_star
+        nobj = y_star.shape[1]
+        # Limit size of the (samples, pareto points, objectives) comparison.
+        chunk = max(1, 4000000 // (self.n*nobj))
+        pi = zeros(len(mu))
+        for i in range(len(mu)):
+            samples = mu[i]+sigma[i]*random.standard_normal((self.n, nobj))
+            #a sample is dominated if some pareto point is better in every objective
+            dominated = zeros(self.n, dtype=bool)
+            for j in range(0, len(y_star), chunk):
+                points = y_star[j:j+chunk]
+                dominated |= (points[None, :, :] < samples[:, None, :]) \
+                             .all(axis=2).any(axis=1)
+            pi[i] = (self.n-dominated.sum())/float(self.n)
         return pi
         
+    def calc_PI(self, mu, sigma):
+        """
+        Returns an array with the probability of improvement for each of a
+        batch of candidate points.
+
+        mu: array
+            Predicted means, shape (npoints, nobj), or (nobj,) for a single
+            point.
+
+        sigma: array
+            Predicted standard deviations, same shape as `mu`.
+        """
+        mu, sigma = self._check_batch(mu, sigma)
+        if mu.shape[1] == 2:
+            return self._2obj_PI(mu, sigma)
+        return self._nobj_PI(mu, sigma)
+
+    def calc_EI(self, mu, sigma):
+        """
+        Returns an array with the expected improvement for each of a
+        batch of candidate points. Only two objectives are supported.
+
+        mu: array
+            Predicted means, shape (npoints, 2), or (2,) for a single point.
+
+        sigma: array
+            Predicted standard deviations, same shape as `mu`.
+        """
+        mu, sigma = self._check_batch(mu, sigma)
+        if mu.shape[1] != 2:
+            self.raise_exception("EI calculations not supported"
+                                    " for more than 2 objectives", ValueError)
+        return self._2obj_EI(mu, sigma, self._2obj_PI(mu, sigma))
+
+    def _check_batch(self, mu, sigma):
+        """ Return `mu` and `sigma` as 2D float arrays, loading y_star. """
+        if self.y_star is None:
+            self.y_star = self.get_y_star()
+        mu = asarray(mu, dtype=float)
+        sigma = asarray(sigma, dtype=float)
+        if mu.ndim == 1:
+            mu = mu.reshape((1, -1))
+            sigma = sigma.reshape((1, -1))
+        if mu.shape != sigma.shape or mu.shape[1] != len(self.criteria):
+            self.raise_exception('mu and sigma must have shape (npoints, %d)'
+                                 % len(self.criteria), ValueError)
+        return (mu, sigma)
+
     def execute(self): 
         """ Calculates the expected improvement or 
         probability of improvement of a candidate 
@@ -170,21 +196,37 @@ class MultiObjExpectedImprovement(Component):
         mu = [objective.mu for objective in self.predicted_values]
         sig = [objective.sigma for objective in self.predicted_values]
         
-        if self.y_star == None:
+        if self.y_star is None:
             self.y_star = self.get_y_star()
 
         n_objs = len(self.criteria)
 
         if n_objs==2:
             """biobjective optimization"""
-            self.PI = self._2obj_PI(mu,sig)
+            mu, sig = self._check_batch(mu, sig)
+            PI = self._2obj_PI(mu,sig)
+            self.PI = PI[0]
             if self.calc_switch == 'EI':
                 """execute EI calculations"""
-                self.EI = self._2obj_EI(mu,sig)
+                self.EI = self._2obj_EI(mu,sig,PI)[0]
         if n_objs>2: 
             """n objective optimization"""
-            self.PI = self._nobj_PI(mu,sig)
+            self.PI = self.calc_PI(mu,sig)[0]
             if self.calc_switch == 'EI':
                 """execute EI calculations"""
                 self.raise_exception("EI calculations not supported"
                                         " for more than 2 objectives", ValueError)
+
+
+def _normal_cdf(y, mu, sigma):
+    """Returns the normal CDF of points `y` for each of the distributions
+    given by arrays `mu` and `sigma`, shape (len(mu), len(y))."""
+    return 0.5+0.5*erf((1/(2**0.5))*((y[None, :]-mu[:, None])/sigma[:, None]))
+
+
+def _partial_mean(y, mu, sigma, cdf):
+    """Returns ``mu*cdf - sigma*pdf`` of points `y` for each of the
+    distributions given by arrays `mu` and `sigma`, shape
+    (len(mu), len(y))."""
+    z = (y[None, :]-mu[:, None])/sigma[:, None]
+    return mu[:, None]*cdf-sigma[:, None]*(1/((2*pi)**0.5))*exp(-0.5*z**2)
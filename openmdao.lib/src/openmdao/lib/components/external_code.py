@@ -2,11 +2,14 @@
 .. _`external_code.py`:
 """
 
+import cPickle
 import glob
+import hashlib
 import os.path
 import shutil
 import stat
 import sys
+import threading
 import time
 
 # pylint: disable-msg=E0611,F0401
@@ -17,10 +20,37 @@ from openmdao.main.exceptions import RunInterrupted, RunStopped
 from openmdao.main.rbac import AccessController, RoleError, rbac, remote_access
 from openmdao.main.resource import ResourceAllocationManager as RAM
 
-from openmdao.util.filexfer import filexfer, pack_zipfile, unpack_zipfile
+from openmdao.util.filexfer import FileCache, filexfer, file_digest, \
+                                   pack_zipfile, unpack_zipfile
 from openmdao.util import shellproc
 
 
+# Inputs which don't affect results.
+_NOT_HASHED = set(('directory', 'force_execute', 'resources', 'poll_delay',
+                   'timeout', 'keep_server', 'server_idle_timeout',
+                   'result_cache', 'result_cache_size'))
+
+
+def _hash_value(sha1, value):
+    """ Update `sha1` with a representation of `value`. """
+    if isinstance(value, dict):
+        sha1.update('{')
+        for key in sorted(value):
+            _hash_value(sha1, key)
+            _hash_value(sha1, value[key])
+        sha1.update('}')
+    elif isinstance(value, (list, tuple)):
+        sha1.update('(')
+        for item in value:
+            _hash_value(sha1, item)
+        sha1.update(')')
+    elif hasattr(value, 'dtype') and hasattr(value, 'tostring'):
+        sha1.update(repr((str(value.dtype), value.shape)))
+        sha1.update(value.tostring())
+    else:
+        sha1.update(repr(value))
+
+
 class ExternalCode(ComponentWithDerivatives):
     """
     Run an external code as a component. The component can be configured to
@@ -41,14 +71,33 @@ class ExternalCode(ComponentWithDerivatives):
     resources = Dict({}, iotype='in',
                      desc='Resources required to run this component.')
     poll_delay = Float(0., low=0., units='s', iotype='in',
-                       desc='Delay between polling for command completion.'
-                            ' A value of zero will use an internally computed'
-                            ' default.')
+                       desc='Not used, command completion is detected'
+                            ' without polling. Retained for compatibility.')
     timeout = Float(0., low=0., iotype='in', units='s',
                     desc='Maximum time to wait for command completion.'
                          ' A value of zero implies an infinite wait.')
     timed_out = Bool(False, iotype='out', desc='True if the command timed-out.')
     return_code = Int(0, iotype='out', desc='Return code from the command.')
+    keep_server = Bool(False, iotype='in',
+                       desc='If True, the server allocated for remote'
+                            ' execution is kept for later executions rather'
+                            ' than being released after each one.')
+    server_idle_timeout = Float(0., low=0., units='s', iotype='in',
+                                desc='Release a kept server after it has been'
+                                     ' idle this long. A value of zero keeps'
+                                     ' it until release_server() is called.')
+    result_cache = Str('', iotype='in',
+                       desc='If non-blank, the directory of a cache of results'
+                            ' from earlier executions. Executions with inputs'
+                            ' found in the cache restore the output files'
+                            ' rather than running the command.')
+    result_cache_size = Int(1024, low=0, iotype='in',
+                            desc='Size (MB) the result cache is pruned to.'
+                                 ' A value of zero implies no limit.')
+    command_version = Str('', iotype='in',
+                          desc='Included in the result cache key. Change it'
+                               ' to invalidate cached results when the'
+                               ' command changes.')
 
     def __init__(self, *args, **kwargs):
         super(ExternalCode, self).__init__(*args, **kwargs)
@@ -60,6 +109,30 @@ class ExternalCode(ComponentWithDerivatives):
 
         self._process = None
         self._server = None
+        self._init_lease()
+
+    def _init_lease(self):
+        """ Initialize state for a kept server. """
+        self._lease_lock = threading.Lock()
+        self._lease_rdesc = None  # Resources the server was allocated with.
+        self._lease_busy = False
+        self._lease_timer = None
+        self._sent_inputs = {}    # Input path -> digest on server.
+        self._digests = {}        # Input path -> (mtime, size, digest).
+
+    def __getstate__(self):
+        """ Return dict representing this component's state. """
+        state = super(ExternalCode, self).__getstate__()
+        state['_server'] = None  # Kept servers don't survive pickling.
+        for name in ('_lease_lock', '_lease_rdesc', '_lease_busy',
+                     '_lease_timer', '_sent_inputs', '_digests'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        """ Restore this component's state. """
+        super(ExternalCode, self).__setstate__(state)
+        self._init_lease()
 
     # This gets used by remote server.
     def get_access_controller(self):  #pragma no cover
@@ -126,6 +199,12 @@ class ExternalCode(ComponentWithDerivatives):
             from the remote server are defined by entries with `output`
             True.
 
+        If `result_cache` is set, the command is not run when the cache
+        holds results for the same inputs. The key is a hash of
+        `command`, `command_version`, the input variables, and the contents
+        of the input files. On a hit the output files are restored as
+        ordinary writable copies. Only successful executions are cached.
+
         .. warning::
 
             Any file **not** labelled with `binary` True will undergo
@@ -155,6 +234,13 @@ class ExternalCode(ComponentWithDerivatives):
 
         self.check_files(inputs=True)
 
+        key = None
+        if self.result_cache:
+            key = self._result_key()
+            if self._restore_results(key):
+                self.return_code = 0
+                return
+
         return_code = None
         error_msg = ''
         try:
@@ -184,6 +270,9 @@ class ExternalCode(ComponentWithDerivatives):
 
             if self.check_external_outputs:
                 self.check_files(inputs=False)
+
+            if key is not None:
+                self._save_results(key)
         finally:
             self.return_code = -999999 if return_code is None else return_code
 
@@ -243,6 +332,83 @@ class ExternalCode(ComponentWithDerivatives):
                         self.raise_exception("missing 'out' file %r" % obj.path,
                                              RuntimeError)
 
+    def _result_cache(self):
+        """ Returns :class:`FileCache` for `result_cache`. """
+        max_bytes = (self.result_cache_size << 20) or None
+        return FileCache(self.result_cache, max_bytes)
+
+    def _result_key(self):
+        """
+        Returns a digest of everything which affects the command's results.
+        """
+        sha1 = hashlib.sha1()
+        _hash_value(sha1, self.command)
+        _hash_value(sha1, (self.stdin, self.stdout, self.stderr))
+        for pathname, obj in sorted(self.items(iotype='in', recurse=True)):
+            if pathname in _NOT_HASHED:
+                continue
+            sha1.update(pathname)
+            if isinstance(obj, FileRef):
+                path = self.get_metadata(pathname, 'local_path') or \
+                       obj.abspath()
+                sha1.update(file_digest(path))
+            else:
+                _hash_value(sha1, obj)
+
+        paths = []
+        for metadata in self.external_files:
+            if metadata.get('input', False):
+                paths.extend(glob.glob(metadata.path))
+        if self.stdin and self.stdin != self.DEV_NULL:
+            paths.append(self.stdin)
+        for path in sorted(set(paths)):
+            if os.path.isfile(path):
+                sha1.update(path)
+                sha1.update(file_digest(path))
+        return sha1.hexdigest()
+
+    def _output_paths(self):
+        """ Returns paths of output files produced by the command. """
+        paths = []
+        for metadata in self.external_files:
+            if metadata.get('output', False):
+                paths.extend(glob.glob(metadata.path))
+        for pathname, obj in self.items(iotype='out', recurse=True):
+            if isinstance(obj, FileRef):
+                paths.append(obj.path)
+        for path in (self.stdout, self.stderr):
+            if isinstance(path, basestring) and path != self.DEV_NULL:
+                paths.append(path)
+        return sorted(set([path for path in paths if os.path.isfile(path)]))
+
+    def _save_results(self, key):
+        """ Save output files in the result cache under `key`. """
+        cache = self._result_cache()
+        files = {}
+        for path in self._output_paths():
+            files[path] = cache.add(path)
+        cache.write(key, cPickle.dumps(files, -1))
+
+    def _restore_results(self, key):
+        """
+        Restore output files saved under `key`.
+        Returns False if they are not in the result cache.
+        """
+        cache = self._result_cache()
+        data = cache.read(key)
+        if data is None:
+            return False
+        files = cPickle.loads(data)
+        for digest in files.values():
+            if digest not in cache:  # Pruned since saved.
+                return False
+        self._logger.info('restoring cached results...')
+        for path, digest in sorted(files.items()):
+            # Copy, outputs may be rewritten by a later execution.
+            if not cache.restore(digest, path, link=False):  #pragma no cover
+                return False  # Pruned by another process.
+        return True
+
     def _execute_local(self):
         """ Run command. """
         self._logger.info('executing %s...', self.command)
@@ -255,7 +421,8 @@ class ExternalCode(ComponentWithDerivatives):
 
         try:
             return_code, error_msg = \
-                self._process.wait(self.poll_delay, self.timeout)
+                self._process.wait(self.poll_delay, self.timeout,
+                                   self._log_output)
         finally:
             self._process.close_files()
             self._process = None
@@ -266,6 +433,10 @@ class ExternalCode(ComponentWithDerivatives):
 
         return (return_code, error_msg)
 
+    def _log_output(self, name, line):
+        """ Log a line of output from a :data:`PIPE` `stdout` or `stderr`. """
+        self._logger.info('%s: %s', name, line.rstrip())
+
     def _execute_remote(self):
         """
         Allocate a server based on required resources, send inputs,
@@ -273,10 +444,8 @@ class ExternalCode(ComponentWithDerivatives):
         """
         rdesc = self.resources.copy()
 
-        # Allocate server.
-        self._server, server_info = RAM.allocate(rdesc)
-        if self._server is None:
-            self.raise_exception('Server allocation failed :-(', RuntimeError)
+        # Allocate server (or reuse kept server).
+        reused = self._acquire_server(rdesc)
 
         return_code = -88888888
         error_msg = ''
@@ -316,11 +485,14 @@ class ExternalCode(ComponentWithDerivatives):
             # Send inputs.
             patterns = []
             textfiles = []
+            writable = []
             for metadata in self.external_files:
                 if metadata.get('input', False):
                     patterns.append(metadata.path)
                     if not metadata.binary:
                         textfiles.append(metadata.path)
+                    if metadata.get('output', False):
+                        writable.append(metadata.path)
             for pathname, obj in self.items(iotype='in', recurse=True):
                 if isinstance(obj, FileRef):
                     local_path = self.get_metadata(pathname, 'local_path')
@@ -332,10 +504,14 @@ class ExternalCode(ComponentWithDerivatives):
                 patterns.append(self.stdin)
                 textfiles.append(self.stdin)
             if patterns:
-                self._send_inputs(patterns, textfiles)
+                self._send_inputs(patterns, textfiles, writable)
             else:
                 self._logger.debug('No input files')
 
+            if reused:
+                # Remove results from previous execution.
+                self._remove_remote_outputs(rdesc)
+
             # Run command.
             self._logger.info('executing %s...', self.command)
             start_time = time.time()
@@ -385,36 +561,180 @@ class ExternalCode(ComponentWithDerivatives):
                 else:
                     sys.stdout.write('\n[No stderr available]\n')
         finally:
-            RAM.release(self._server)
-            self._server = None
+            if self.keep_server:
+                self._idle_server()
+            else:
+                self.release_server()
 
         return (return_code, error_msg)
 
-    def _send_inputs(self, patterns, textfiles):
-        """ Sends input files matching `patterns`. """
+    def _acquire_server(self, rdesc):
+        """
+        Sets `_server` to a server satisfying `rdesc`. A kept server is
+        reused if it was allocated for the same resources and is still
+        responsive. Returns True if a kept server was reused.
+        """
+        with self._lease_lock:
+            if self._lease_timer is not None:
+                self._lease_timer.cancel()
+                self._lease_timer = None
+            self._lease_busy = True
+            server = self._server
+
+        if server is not None:
+            if rdesc != self._lease_rdesc:
+                self._logger.debug('resources changed, releasing server')
+                self.release_server()
+            else:
+                try:
+                    server.echo()
+                except Exception as exc:
+                    self._logger.warning('kept server not responding: %s', exc)
+                    self._server = None
+                    self._sent_inputs = {}
+                    try:
+                        RAM.release(server)
+                    except Exception:
+                        pass
+                else:
+                    self._logger.debug('reusing server')
+                    return True
+
+        self._server, server_info = RAM.allocate(rdesc)
+        if self._server is None:
+            self._lease_busy = False
+            self.raise_exception('Server allocation failed :-(', RuntimeError)
+        self._lease_rdesc = rdesc.copy()
+        self._sent_inputs = {}
+        return False
+
+    def _idle_server(self):
+        """ Keep the server, releasing it after `server_idle_timeout`. """
+        with self._lease_lock:
+            self._lease_busy = False
+            if self._server is not None and self.server_idle_timeout > 0:
+                self._lease_timer = threading.Timer(self.server_idle_timeout,
+                                                    self._idle_timeout)
+                self._lease_timer.daemon = True
+                self._lease_timer.start()
+
+    def _idle_timeout(self):
+        """ Called by the idle timer thread. """
+        with self._lease_lock:
+            if self._lease_busy:
+                return
+            self._lease_timer = None
+        self._logger.debug('server idle timeout')
+        self.release_server()
+
+    def release_server(self):
+        """ Release the server used for remote execution, if any. """
+        with self._lease_lock:
+            if self._lease_timer is not None:
+                self._lease_timer.cancel()
+                self._lease_timer = None
+            server = self._server
+            self._server = None
+            self._lease_rdesc = None
+            self._sent_inputs = {}
+        if server is not None:
+            RAM.release(server)
+
+    def _remove_remote_outputs(self, rdesc):
+        """ Remove output files left on a kept server by a previous run. """
+        paths = []
+        for metadata in self.external_files:
+            if metadata.get('output', False) and \
+               not metadata.get('input', False):
+                paths.append(metadata.path)
+        for pathname, obj in self.items(iotype='out', recurse=True):
+            if isinstance(obj, FileRef):
+                paths.append(obj.path)
+        for key in ('output_path', 'error_path'):
+            if key in rdesc:
+                paths.append(rdesc[key])
+        for path in paths:
+            if glob.has_magic(path):
+                continue
+            try:
+                self._server.remove(path)
+            except Exception:
+                pass  # Most likely it doesn't exist.
+
+    def _send_inputs(self, patterns, textfiles, writable):
+        """
+        Sends input files matching `patterns`. Files found in the server's
+        file cache are linked there rather than sent, except that files
+        matching `writable` (also outputs) are copied. When using a kept
+        server, files which haven't changed since they were last sent are
+        skipped entirely.
+        """
         self._logger.info('sending inputs...')
         start_time = time.time()
 
-        filename = 'inputs.zip'
-        pfiles, pbytes = pack_zipfile(patterns, filename, self._logger)
-        try:
-            filexfer(None, filename, self._server, filename, 'b')
-            ufiles, ubytes = self._server.unpack_zipfile(filename,
-                                                         textfiles=textfiles)
-        finally:
-            os.remove(filename)
-            self._server.remove(filename)
-
-        # Difficult to force file transfer error.
-        if ufiles != pfiles or ubytes != pbytes:  #pragma no cover
-            msg = 'Inputs xfer error: %d:%d vs. %d:%d' \
-                  % (ufiles, ubytes, pfiles, pbytes)
-            self.raise_exception(msg, RuntimeError)
+        files = {}  # Path -> digest.
+        others = []  # Directories, etc.
+        for pattern in patterns:
+            for path in glob.glob(pattern):
+                if os.path.isfile(path):
+                    files[path] = self._get_digest(path)
+                else:
+                    others.append(path)
+        if self.keep_server:
+            sent = self._sent_inputs
+            files = dict([(path, digest) for path, digest in files.items()
+                                          if sent.get(path) != digest])
+        if not files and not others:
+            self._logger.debug('inputs unchanged')
+            return
+
+        missing = []
+        if files:
+            copies = set()
+            for pattern in writable:
+                copies.update(glob.glob(pattern))
+            copies = [path for path in files if path in copies]
+            lfiles, lbytes, missing = self._server.link_files(files, copies)
+            if lfiles:
+                self._logger.debug('linked %d cached files (%d bytes)',
+                                   lfiles, lbytes)
+        if missing or others:
+            filename = 'inputs.zip'
+            pfiles, pbytes = pack_zipfile(missing+others, filename,
+                                          self._logger)
+            try:
+                filexfer(None, filename, self._server, filename, 'b')
+                ufiles, ubytes = self._server.unpack_zipfile(filename,
+                                                             textfiles=textfiles)
+            finally:
+                os.remove(filename)
+                self._server.remove(filename)
+
+            # Difficult to force file transfer error.
+            if ufiles != pfiles or ubytes != pbytes:  #pragma no cover
+                msg = 'Inputs xfer error: %d:%d vs. %d:%d' \
+                      % (ufiles, ubytes, pfiles, pbytes)
+                self.raise_exception(msg, RuntimeError)
+
+            if missing:
+                self._server.cache_files(dict([(path, files[path])
+                                               for path in missing]))
+        self._sent_inputs.update(files)
 
         et = time.time() - start_time
         if et >= 60:  #pragma no cover
             self._logger.info('elapsed time: %f sec.', et)
 
+    def _get_digest(self, path):
+        """ Returns digest of `path`, reusing it if the file is unchanged. """
+        info = os.stat(path)
+        stamp = (info.st_mtime, info.st_size)
+        entry = self._digests.get(path)
+        if entry is None or entry[:2] != stamp:
+            entry = stamp + (file_digest(path),)
+            self._digests[path] = entry
+        return entry[2]
+
     def _retrieve_results(self, patterns, textfiles):
         """ Retrieves result files matching `patterns`. """
         self._logger.info('retrieving results...')
@@ -1,17 +1,165 @@
 """ Pareto Filter -- finds non-dominated cases. """
 
+from bisect import bisect_left, bisect_right
+
+import numpy
+
 # pylint: disable-msg=E0611,F0401
-from openmdao.main.datatypes.api import Slot, List, ListStr
+from openmdao.main.datatypes.api import Slot, List, ListStr, Int, Bool
 from openmdao.lib.casehandlers.api import CaseSet, caseiter_to_caseset
 
 from openmdao.main.component import Component
 from openmdao.main.interfaces import ICaseIterator
 from openmdao.lib.casehandlers.listcaseiter import ListCaseIterator
 
+
+def _unique_rows(y):
+    """Returns ``(u, inverse)`` where `u` contains the unique rows of `y` in
+    lexicographic order and ``u[inverse]`` reproduces `y`.
+    """
+    order = numpy.lexsort(y.T[::-1])
+    y_sorted = y[order]
+    first = numpy.ones(len(y), dtype=bool)
+    if len(y) > 1:
+        first[1:] = numpy.any(y_sorted[1:] != y_sorted[:-1], axis=1)
+    inverse = numpy.empty(len(y), dtype=int)
+    inverse[order] = numpy.cumsum(first) - 1
+    return (y_sorted[first], inverse)
+
+
+def _nondominated_2d(u):
+    """Sweep over lexicographically sorted unique rows `u` (2 columns).
+    A row is dominated if any previous row has a second value no larger.
+    """
+    dominated = numpy.zeros(len(u), dtype=bool)
+    prev_min = numpy.minimum.accumulate(u[:, 1])
+    dominated[1:] = prev_min[:-1] <= u[1:, 1]
+    return ~dominated
+
+
+def _nondominated_3d(u):
+    """Sweep over lexicographically sorted unique rows `u` (3 columns),
+    keeping a staircase of the non-dominated (second, third) pairs seen so
+    far. The staircase is ordered by increasing second value, so its third
+    values are decreasing.
+    """
+    keep = numpy.zeros(len(u), dtype=bool)
+    stair1 = []
+    stair2 = []
+    for i, (a, b, c) in enumerate(u.tolist()):
+        j = bisect_right(stair1, b)
+        if j and stair2[j-1] <= c:
+            continue  # Dominated.
+        keep[i] = True
+        # Remove staircase entries dominated by (b, c).
+        start = bisect_left(stair1, b)
+        stop = start
+        while stop < len(stair2) and stair2[stop] >= c:
+            stop += 1
+        stair1[start:stop] = [b]
+        stair2[start:stop] = [c]
+    return keep
+
+
+def _nondominated_nd(u):
+    """Vectorized elimination over unique rows `u`. Rows are visited in
+    order of increasing sum, so any dominator of a row is visited before it.
+    The first remaining row is therefore non-dominated, and every remaining
+    row it dominates is dropped.
+    """
+    order = numpy.lexsort(tuple(u.T[::-1]) + (u.sum(axis=1),))
+    u = u[order]
+    keep = numpy.zeros(len(u), dtype=bool)
+    remaining = numpy.arange(len(u))
+    while len(remaining):
+        i = remaining[0]
+        keep[order[i]] = True
+        rest = remaining[1:]
+        remaining = rest[~(u[i] <= u[rest]).all(axis=1)]
+    return keep
+
+
+def nondominated(y):
+    """
+    Returns a boolean array indicating which rows of `y` are not dominated
+    by any other row. Smaller is better in every column. Identical rows do
+    not dominate each other.
+
+    Two or three columns are handled by a sweep in O(n log n), more columns
+    by vectorized elimination.
+
+    y: 2D array
+        One row per point, one column per criterion.
+    """
+    y = numpy.asarray(y)
+    if len(y) == 0:
+        return numpy.zeros(0, dtype=bool)
+    if y.shape[1] == 1:
+        return y[:, 0] == y[:, 0].min()
+    u, inverse = _unique_rows(y)
+    if u.shape[1] == 2:
+        keep = _nondominated_2d(u)
+    elif u.shape[1] == 3:
+        keep = _nondominated_3d(u)
+    else:
+        keep = _nondominated_nd(u)
+    return keep[inverse]
+
+
+def nondominated_ranks(y, max_fronts=0):
+    """
+    Returns an array of the front number (0 is the non-dominated front) for
+    each row of `y`. Rows in fronts beyond `max_fronts` (if non-zero) are
+    given rank `max_fronts`.
+
+    y: 2D array
+        One row per point, one column per criterion.
+
+    max_fronts: int
+        Number of fronts to rank. Zero ranks all.
+    """
+    y = numpy.asarray(y)
+    ranks = numpy.empty(len(y), dtype=int)
+    remaining = numpy.arange(len(y))
+    rank = 0
+    while len(remaining) and (max_fronts <= 0 or rank < max_fronts):
+        keep = nondominated(y[remaining])
+        ranks[remaining[keep]] = rank
+        remaining = remaining[~keep]
+        rank += 1
+    ranks[remaining] = rank
+    return ranks
+
+
+def crowding_distance(y):
+    """
+    Returns the NSGA-II crowding distance of each row of `y`, normally the
+    points of a single front. Boundary points get infinite distance.
+
+    y: 2D array
+        One row per point, one column per criterion.
+    """
+    y = numpy.asarray(y, dtype=float)
+    distance = numpy.zeros(len(y))
+    if len(y) < 3:
+        distance[:] = numpy.inf
+        return distance
+    for col in y.T:
+        order = col.argsort()
+        values = col[order]
+        distance[order[0]] = distance[order[-1]] = numpy.inf
+        span = values[-1] - values[0]
+        if span > 0:
+            distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+    return distance
+
+
 class ParetoFilter(Component):
     """Takes a set of cases and filters out the subset of cases which are
     pareto optimal. Assumes that smaller values for model responses are
     better, so all problems must be posed as minimization problems.
+    Optionally, successive non-dominated fronts and their crowding distances
+    are determined.
     """
     
     # pylint: disable-msg=E1101
@@ -28,22 +176,27 @@ class ParetoFilter(Component):
                      desc="CaseSet with the cases to be filtered to "
                      "Find the pareto optimal subset.")
     
+    max_fronts = Int(1, low=0, iotype="in",
+                     desc="Number of non-dominated fronts to find. Zero "
+                          "finds all.")
+
+    calc_crowding = Bool(False, iotype="in",
+                         desc="If True, calculate crowding distances for "
+                              "the cases in each front.")
+
     pareto_set = Slot(CaseSet, iotype="out", 
                         desc="Resulting collection of pareto optimal cases.",copy="shallow")
     dominated_set = Slot(CaseSet, iotype="out",
                            desc="Resulting collection of dominated cases.",copy="shallow")
     
-    def _is_dominated(self, y1, y2):
-        """Tests to see if the point y1 is dominated by the point y2. 
-        True if y1 is dominated by y2, False otherwise.
-        """
-        if y1 == y2:
-            return False
-        for a,b in zip(y1, y2): 
-            if a<b: return False
+    fronts = List(Slot(CaseSet), iotype="out",
+                  desc="CaseSets of successive non-dominated fronts, "
+                       "fronts[0] is the pareto optimal set.")
+
+    crowding_distances = List(iotype="out",
+                              desc="Array of crowding distances for the "
+                                   "cases in each front (if calc_crowding).")
 
-        return True
-    
     def execute(self):
         """Finds and removes pareto optimal points in the given case set.
         Returns a list of pareto optimal points. Smaller is better for all
@@ -57,36 +210,36 @@ class ParetoFilter(Component):
             else: 
                 case_sets.append(ci)
         
-        y_list = []
         if len(case_sets) > 1: 
             case_set = case_sets[0].union(*case_sets[1:])
         else: 
             case_set = case_sets[0]
-        criteria_count = len(self.criteria)
         
         try: 
-            # need to transpose the list of outputs
-            y_list = zip(*[case_set[crit] for crit in self.criteria]) 
+            y = numpy.column_stack([case_set.get_column(crit)
+                                    for crit in self.criteria])
         except KeyError: 
             self.raise_exception('no cases provided had all of the outputs '
                  'matching the provided criteria, %s'%self.criteria, ValueError)
             
-        y_temp = list(y_list)
+        ranks = nondominated_ranks(y, self.max_fronts)
         
-        self.dominated_set = CaseSet()
-        self.pareto_set = CaseSet() #TODO: need a way to copy casesets
-
-        for point1, case in zip(y_list, iter(case_set)):
-            dominated = False
-            for point2 in y_temp:
-                if self._is_dominated(point1, point2):
-                    self.dominated_set.record(case)
-                    y_temp.remove(point1)
-                    dominated = True
-                    break
-            if not dominated: 
-                self.pareto_set.record(case)
-     
+        fronts = []
+        distances = []
+        nfronts = self.max_fronts or (ranks.max()+1 if len(ranks) else 0)
+        for rank in range(nfronts):
+            mask = ranks == rank
+            if not mask.any():
+                break
+            fronts.append(case_set.subset(mask))
+            if self.calc_crowding:
+                distances.append(crowding_distance(y[mask]))
+
+        self.fronts = fronts
+        self.crowding_distances = distances
+        self.pareto_set = fronts[0] if fronts else CaseSet()
+        self.dominated_set = case_set.subset(ranks != 0)
+
 if __name__ == "__main__": # pragma: no cover  
     
     # pylint: disable-msg=C0103, E1101
@@ -24,6 +24,32 @@ class MultiObjExpectedImprovementTests(unittest.TestCase):
         self.assertAlmostEqual([5.0],ei.EI,1)
         self.assertEqual(0.5,ei.PI,6)
 
+    def test_batch(self):
+        ei = MultiObjExpectedImprovement()
+        bests = CaseSet()
+        list_of_cases = [Case(outputs=[("y1",1),("y2",3)]),
+                         Case(outputs=[("y1",2),("y2",2)]),
+                         Case(outputs=[("y1",3),("y2",1)])]
+        for case in list_of_cases:
+            bests.record(case)
+        ei.best_cases = bests
+        ei.criteria = ["y1","y2"]
+        ei.calc_switch = "EI"
+        mu = array([[1.5,1.5],[2.5,0.5],[4.,4.]])
+        sigma = array([[1.,1.],[0.5,2.],[0.1,0.1]])
+        PI = ei.calc_PI(mu, sigma)
+        EI = ei.calc_EI(mu, sigma)
+        self.assertEqual(PI.shape, (3,))
+        self.assertEqual(EI.shape, (3,))
+        for i in range(3):
+            ei.predicted_values = [NormalDistribution(mu=mu[i][0],sigma=sigma[i][0]),
+                                   NormalDistribution(mu=mu[i][1],sigma=sigma[i][1])]
+            ei.execute()
+            self.assertAlmostEqual(PI[i],ei.PI,10)
+            self.assertAlmostEqual(EI[i],ei.EI,10)
+        self.assertTrue(PI[0] > PI[2])
+        self.assertTrue(PI[2] < 1e-6)
+
     def test_ei_nobj(self):
         ei = MultiObjExpectedImprovement()
         bests = CaseSet()
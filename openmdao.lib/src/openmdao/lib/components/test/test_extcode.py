@@ -6,6 +6,7 @@ import logging
 import os.path
 import pkg_resources
 import shutil
+import stat
 import sys
 import time
 import unittest
@@ -249,6 +250,47 @@ class TestCase(unittest.TestCase):
         sleeper.stderr = None
         sleeper.run()
 
+    def test_keep_server(self):
+        logging.debug('')
+        logging.debug('test_keep_server')
+        init_cluster(allow_shell=True)
+
+        sleeper = set_as_top(Sleeper())
+        sleeper.env_filename = ENV_FILE
+        sleeper.env_vars = {'SLEEP_DATA': 'Hello world!'}
+        sleeper.external_files.append(
+            FileMetadata(path=ENV_FILE, output=True))
+        sleeper.infile = FileRef(INP_FILE, sleeper, input=True)
+        sleeper.timeout = 5
+        sleeper.resources = {'min_cpus': 1}
+        sleeper.keep_server = True
+
+        sleeper.run()
+        self.assertEqual(sleeper.return_code, 0)
+        server = sleeper._server
+        self.assertNotEqual(server, None)
+        self.assertTrue('sleep.py' in sleeper._sent_inputs)
+
+        # Same server, no inputs changed.
+        sent = sleeper._sent_inputs.copy()
+        sleeper.run(force=True)
+        self.assertEqual(sleeper.return_code, 0)
+        self.assertTrue(sleeper._server is server)
+        self.assertEqual(sleeper._sent_inputs, sent)
+        with sleeper.outfile.open() as inp:
+            result = inp.read()
+        self.assertEqual(result, INP_DATA)
+
+        sleeper.release_server()
+        self.assertEqual(sleeper._server, None)
+
+        # Idle timeout releases the server.
+        sleeper.server_idle_timeout = 0.5
+        sleeper.run()
+        self.assertNotEqual(sleeper._server, None)
+        time.sleep(2)
+        self.assertEqual(sleeper._server, None)
+
     def test_bad_alloc(self):
         logging.debug('')
         logging.debug('test_bad_alloc')
@@ -307,6 +349,78 @@ class TestCase(unittest.TestCase):
         retcode = check_save_load(sleeper)
         self.assertEqual(retcode, 0)
 
+    def test_result_cache(self):
+        logging.debug('')
+        logging.debug('test_result_cache')
+
+        cache_dir = os.path.join(DIRECTORY, 'result_cache')
+        if os.path.exists(cache_dir):
+            shutil.rmtree(cache_dir)
+        try:
+            sleeper = set_as_top(Sleeper())
+            sleeper.env_filename = ENV_FILE
+            sleeper.env_vars = {'SLEEP_DATA': 'Hello world!'}
+            sleeper.external_files.append(
+                FileMetadata(path=ENV_FILE, output=True))
+            sleeper.infile = FileRef(INP_FILE, sleeper, input=True)
+            sleeper.stderr = None
+            sleeper.result_cache = cache_dir
+            sleeper.run()
+
+            # Same inputs restore results without running the command.
+            def no_execute():
+                self.fail('command was executed')
+            sleeper._execute_local = no_execute
+            sleeper.force_execute = True
+            os.remove(ENV_FILE)
+            sleeper.run()
+            self.assertEqual(sleeper.return_code, 0)
+            with open(ENV_FILE, 'rU') as inp:
+                self.assertEqual(inp.readline().rstrip(), 'Hello world!')
+            with sleeper.outfile.open() as inp:
+                self.assertEqual(inp.read(), INP_DATA)
+
+            # Restored outputs are writable copies, not links into the cache.
+            info = os.stat(ENV_FILE)
+            self.assertEqual(info.st_nlink, 1)
+            self.assertTrue(info.st_mode & stat.S_IWUSR)
+
+            # Changed input variables, input files, or command version
+            # all require execution.
+            del sleeper._execute_local
+            sleeper.env_vars = {'SLEEP_DATA': 'Hello again!'}
+            sleeper.run()
+            with open(ENV_FILE, 'rU') as inp:
+                self.assertEqual(inp.readline().rstrip(), 'Hello again!')
+
+            # That execution rewrote the restored outputs in place,
+            # the cached results are unchanged.
+            sleeper._execute_local = no_execute
+            sleeper.env_vars = {'SLEEP_DATA': 'Hello world!'}
+            sleeper.run()
+            with open(ENV_FILE, 'rU') as inp:
+                self.assertEqual(inp.readline().rstrip(), 'Hello world!')
+
+            sleeper._execute_local = no_execute
+            with open(INP_FILE, 'w') as out:
+                out.write('Changed')
+            sleeper.infile = FileRef(INP_FILE, sleeper, input=True)
+            assert_raises(self, 'sleeper.run()', globals(), locals(),
+                          AssertionError, 'command was executed')
+            del sleeper._execute_local
+            sleeper.run()
+
+            sleeper._execute_local = no_execute
+            sleeper.run()
+            sleeper.command_version = '2'
+            assert_raises(self, 'sleeper.run()', globals(), locals(),
+                          AssertionError, 'command was executed')
+        finally:
+            if os.path.exists(cache_dir):
+                for name in os.listdir(cache_dir):
+                    os.chmod(os.path.join(cache_dir, name), 0600)
+                shutil.rmtree(cache_dir)
+
     def test_timeout(self):
         logging.debug('')
         logging.debug('test_timeout')
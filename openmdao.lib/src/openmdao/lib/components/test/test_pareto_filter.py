@@ -2,7 +2,9 @@
 
 import unittest
 
-from openmdao.lib.components.pareto_filter import ParetoFilter
+import numpy
+
+from openmdao.lib.components.pareto_filter import ParetoFilter, nondominated
 from openmdao.lib.casehandlers.listcaseiter import ListCaseIterator
 from openmdao.main.case import Case
 
@@ -81,6 +83,43 @@ class ParetoFilterTests(unittest.TestCase):
         else: 
             self.fail("expected ValueError")
 
+    def test_fronts(self):
+        pf = ParetoFilter()
+        x = [1,1,1,2,2,2,3,3,3]
+        y = [1,2,3,1,2,3,1,2,3]
+        cases = []
+        for x_0,y_0 in zip(x,y):
+            cases.append(Case(outputs=[("x",x_0),("y",y_0)]))
+        
+        pf.case_sets = [ListCaseIterator(cases),]
+        pf.criteria = ['x','y']
+        pf.max_fronts = 0
+        pf.calc_crowding = True
+        pf.execute()
+
+        fronts = [zip(front['x'], front['y']) for front in pf.fronts]
+        self.assertEqual(fronts, [[(1,1)], [(1,2),(2,1)],
+                                  [(1,3),(2,2),(3,1)], [(2,3),(3,2)],
+                                  [(3,3)]])
+        self.assertEqual(len(pf.dominated_set), 8)
+        self.assertEqual(len(pf.crowding_distances), 5)
+        self.assertTrue(numpy.isinf(pf.crowding_distances[2][[0,2]]).all())
+        self.assertEqual(pf.crowding_distances[2][1], 2.)
+
+        pf.max_fronts = 2
+        pf.execute()
+        self.assertEqual(len(pf.fronts), 2)
+        self.assertEqual(len(pf.dominated_set), 8)
+
+    def test_nondominated(self):
+        # Compare against brute force, including duplicates.
+        numpy.random.seed(10)
+        for ncols in range(1, 6):
+            y = numpy.random.randint(0, 5, size=(200, ncols))
+            expected = [not ((y <= row).all(axis=1) &
+                             (y != row).any(axis=1)).any() for row in y]
+            self.assertEqual(list(nondominated(y)), expected)
+
         
 if __name__ == "__main__":
     unittest.main()
@@ -10,7 +10,7 @@ be used with polar (2D) or cylindrical (3D) coordinates. :meth:`calculate`
 should be prepared for this.
 """
 
-from math import sqrt
+from numpy import sqrt
 
 from openmdao.units.units import PhysicalQuantity
 
@@ -40,6 +40,11 @@ def register_metric(name, cls, integrate, geometry='any'):
         either the cell volume, a non-dimensional vector normal
         to the cell face with magnitude equal to its area, or the edge length;
         depending upon the type of region (volume, surface, or curve).
+        When a region is processed as a whole, `loc` is a tuple of slices
+        and `geom` contains arrays, so :meth:`calculate` should use
+        operations which work on :mod:`numpy` arrays and should not modify
+        `geom` in place. If a :class:`TypeError` is raised, cells are
+        processed one at a time instead.
         :meth:`dimensionalize` is called with the accumulated value.
         It should return a :class:`PhysicalQuantity` for the dimensionalized
         value.
@@ -111,9 +116,9 @@ class Area(object):
     def calculate(self, loc, normal):
         """ Return metric value. """
         sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+        sc1 = sc1 * self.aref
+        sc2 = sc2 * self.aref
+        sc3 = sc3 * self.aref
         return sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
 
     def dimensionalize(self, value):
@@ -200,9 +205,9 @@ class MassFlow(object):
         rvv = 0. if self.mom_c2 is None else self.mom_c2(*loc) * self.momref
         rvw = 0. if self.mom_c3 is None else self.mom_c3(*loc) * self.momref
         sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+        sc1 = sc1 * self.aref
+        sc2 = sc2 * self.aref
+        sc3 = sc3 * self.aref
         return rvu*sc1 + rvv*sc2 + rvw*sc3
 
     def dimensionalize(self, value):
@@ -291,9 +296,9 @@ class CorrectedMassFlow(object):
         else:
             gamma = self.gamma
         sc1, sc2, sc3 = normal
-        sc1 *= self.aref
-        sc2 *= self.aref
-        sc3 *= self.aref
+        sc1 = sc1 * self.aref
+        sc2 = sc2 * self.aref
+        sc3 = sc3 * self.aref
         w = rvu*sc1 + rvv*sc2 + rvw*sc3
 
         u2 = (rvu*rvu + rvv*rvv + rvw*rvw) / (rho*rho)
@@ -3,8 +3,11 @@ Support for calculating one or more scalar averages across one or more
 regions in a domain.
 """
 
+import copy
 from math import cos, sin, sqrt
 
+import numpy
+
 from openmdao.lib.datatypes.domain.flow import CELL_CENTER
 from openmdao.lib.datatypes.domain.zone import CYLINDRICAL
 from openmdao.lib.datatypes.domain.metrics import get_metric, list_metrics, \
@@ -14,7 +17,8 @@ _SCHEMES = ('area', 'mass')
 # TODO: account for ghost cells in index calculations.
 
 
-def mesh_probe(domain, regions, variables, weighting_scheme='area'):
+def mesh_probe(domain, regions, variables, weighting_scheme='area',
+               vectorize=True):
     """
     Calculate metrics on mesh regions.
     Currently only supports structured grids.
@@ -39,6 +43,12 @@ def mesh_probe(domain, regions, variables, weighting_scheme='area'):
         Specifies how individual values are weighted. Legal values are
         'area' for area averaging and 'mass' for mass averaging.
 
+    vectorize: bool
+        If True, surface and curve regions are processed as whole index
+        ranges using :mod:`numpy` array operations. Otherwise each cell is
+        processed individually (this is much slower, but is still used for
+        metrics which can't operate on arrays).
+
     Returns a list of metric values in the order of the `variables` list.
 
     .. note::
@@ -77,7 +87,8 @@ def mesh_probe(domain, regions, variables, weighting_scheme='area'):
 
     # Collect weights.
     if need_weights:
-        weights, weight_total = _calc_weights(weighting_scheme, domain, _regions)
+        weights, weight_total = _calc_weights(weighting_scheme, domain,
+                                              _regions, vectorize)
     else:
         weights, weight_total = {}, 0.
 
@@ -99,7 +110,8 @@ def mesh_probe(domain, regions, variables, weighting_scheme='area'):
                                      ' dictionary supplied for zone %s.'
                                      % zone_name)
 
-            value = _calc_metric(name, domain, region, weights, ref)
+            value = _calc_metric(name, domain, region, weights, ref,
+                                 vectorize)
             value *= zone.symmetry_instances  # Adjust for symmetry.
             if total is None:
                 total = value  # Set initial PhysicalQuantity (or float).
@@ -226,7 +238,7 @@ def _get_dimension(region):
     return dim
 
 
-def _calc_weights(scheme, domain, regions):
+def _calc_weights(scheme, domain, regions, vectorize=False):
     """
     Calculate averaging weights, updating `weights` and returning total value.
     """
@@ -235,7 +247,9 @@ def _calc_weights(scheme, domain, regions):
     for region in regions:
         dim = _get_dimension(region)
 
-        if dim == 3:
+        if vectorize and dim in (1, 2):
+            zone_weights = _block_weights(scheme, domain, region)
+        elif dim == 3:
             zone_weights = _volume_weights(scheme, domain, region)
         elif dim == 2:
             if len(region) == 7:
@@ -254,12 +268,12 @@ def _calc_weights(scheme, domain, regions):
 
         zone_name = region[0]
         zone = getattr(domain, zone_name)
-        zone_weights *= zone.symmetry_instances  # Adjust for symmetry.
         if zone_name in weights:
             raise RuntimeError('Zone %r used more than once' % zone_name)
         else:
             weights[zone_name] = zone_weights
-        weight_total += sum(zone_weights)
+        # Adjust for symmetry.
+        weight_total += numpy.sum(zone_weights) * zone.symmetry_instances
 
     return (weights, weight_total)
 
@@ -373,7 +387,7 @@ def _surface_weights_2d(scheme, domain, region):
 # FIXME: built-in ghosts
                         rvu = 0. if mom_c1 is None else mom_c1(ip1, jp1)
                         rvv = mom_c2(ip1, jp1)
-                        rvw = 0. if mom_c1 is None else mom_c3(ip1, jp1)
+                        rvw = 0. if mom_c3 is None else mom_c3(ip1, jp1)
                     else:
                         # Average across vertices.
                         if mom_c1 is None:
@@ -509,7 +523,8 @@ def _curve_weights_1d(scheme, domain, region):
     return weights
 
 
-def _calc_metric(name, domain, region, weights, reference_state):
+def _calc_metric(name, domain, region, weights, reference_state,
+                 vectorize=False):
     """
     Calculate metric `name` on `region` using `weights` and `reference_state`.
     """
@@ -521,6 +536,7 @@ def _calc_metric(name, domain, region, weights, reference_state):
 
     # Could be volume, surface, curve, or point.
     dim = _get_dimension(region)
+    total = None
     if dim == 3:
         if geometry not in ('volume', 'any'):
             raise RuntimeError('metric %r not applicable to volumes')
@@ -528,19 +544,25 @@ def _calc_metric(name, domain, region, weights, reference_state):
     elif dim == 2:
         if geometry not in ('surface', 'any'):
             raise RuntimeError('metric %r not applicable to surfaces')
-        if len(region) == 7:
-            total = _surface_3d(metric, integrate, zone, region, weights)
-        else:
-            total = _surface_2d(metric, integrate, zone, region, weights)
+        if vectorize:
+            total = _block_metric(metric, integrate, zone, region, weights)
+        if total is None:
+            if len(region) == 7:
+                total = _surface_3d(metric, integrate, zone, region, weights)
+            else:
+                total = _surface_2d(metric, integrate, zone, region, weights)
     elif dim == 1:
         if geometry not in ('curve', 'any'):
             raise RuntimeError('metric %r not applicable to curves')
-        if len(region) == 7:
-            total = _curve_3d(metric, integrate, zone, region, weights)
-        elif len(region) == 5:
-            total = _curve_2d(metric, integrate, zone, region, weights)
-        else:
-            total = _curve_1d(metric, integrate, zone, region, weights)
+        if vectorize:
+            total = _block_metric(metric, integrate, zone, region, weights)
+        if total is None:
+            if len(region) == 7:
+                total = _curve_3d(metric, integrate, zone, region, weights)
+            elif len(region) == 5:
+                total = _curve_2d(metric, integrate, zone, region, weights)
+            else:
+                total = _curve_1d(metric, integrate, zone, region, weights)
     else:
         if geometry != 'any':
             raise RuntimeError('metric %r not applicable to points')
@@ -1228,3 +1250,301 @@ def _kface_node_value(arr, loc):
     return 0.25 * (arr(i+1, j+1, k) + arr(i, j+1, k) +
                    arr(i+1, j, k) + arr(i, j, k))
 
+
+
+# Vectorized processing of surfaces and curves.
+#
+# Rather than looping over cells, each term in the per-cell expressions above
+# is evaluated for an entire index range at once by offsetting the slices
+# used to index the zone arrays. Offsets below are ordered to match the
+# summation order of the per-cell code.
+
+# Offsets of values averaged for a cell, keyed by (index dimension,
+# region dimension) and then by face or edge axis.
+_CELL_OFFSETS = {
+    (3, 2): {0: ((1, 1, 1), (0, 1, 1)),
+             1: ((1, 1, 1), (1, 0, 1)),
+             2: ((1, 1, 1), (1, 1, 0))},
+    (2, 2): {None: ((1, 1),)},
+    (3, 1): {0: ((1, 1, 1), (1, 0, 1), (1, 1, 0), (1, 0, 0)),
+             1: ((1, 1, 1), (0, 1, 1), (1, 1, 0), (0, 1, 0)),
+             2: ((1, 1, 1), (0, 1, 1), (1, 0, 1), (0, 0, 1))},
+    (2, 1): {0: ((1, 1), (1, 0)),
+             1: ((1, 1), (0, 1))},
+    (1, 1): {0: ((1,),)},
+}
+
+_NODE_OFFSETS = {
+    (3, 2): {0: ((0, 0, 0), (0, 1, 0), (0, 1, 1), (0, 0, 1)),
+             1: ((0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)),
+             2: ((0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0))},
+    (2, 2): {None: ((0, 0), (0, 1), (1, 1), (1, 0))},
+    (3, 1): {0: ((0, 0, 0), (1, 0, 0)),
+             1: ((0, 0, 0), (0, 1, 0)),
+             2: ((0, 0, 0), (0, 0, 1))},
+    (2, 1): {0: ((0, 0), (1, 0)),
+             1: ((0, 0), (0, 1))},
+    (1, 1): {0: ((0,), (1,))},
+}
+
+# Offsets of face values used for mass weighting (matching _iface_cell_value,
+# _iface_node_value, etc.).
+_FACE_CELL_OFFSETS = {
+    (3, 2): {0: ((1, 1, 1), (0, 1, 1)),
+             1: ((1, 1, 1), (1, 0, 1)),
+             2: ((1, 1, 1), (1, 1, 0))},
+    (2, 2): {None: ((1, 1),)},
+}
+
+_FACE_NODE_OFFSETS = {
+    (3, 2): {0: ((0, 1, 1), (0, 0, 1), (0, 1, 0), (0, 0, 0)),
+             1: ((1, 0, 1), (0, 0, 1), (1, 0, 0), (0, 0, 0)),
+             2: ((1, 1, 0), (0, 1, 0), (1, 0, 0), (0, 0, 0))},
+    (2, 2): {None: ((0, 0), (1, 0), (0, 1), (1, 1))},
+}
+
+# In-face axes and sign for face normals, keyed by face axis.
+# (None is a 2D surface, see _cell_normal)
+_NORMAL_AXES = {
+    0:    ((1, 2), -0.5),
+    1:    ((0, 2),  0.5),
+    2:    ((1, 0),  0.5),
+    None: ((1, 0),  0.5),
+}
+
+
+class _Slicer(object):
+    """
+    Stands in for an array's `item` method in a metric so that
+    :meth:`calculate` called with a tuple of slices returns array blocks.
+    """
+
+    def __init__(self, arr):
+        self.arr = arr
+
+    def __call__(self, *loc):
+        return _promote(self.arr[loc])
+
+
+def _vectorize_metric(metric):
+    """ Return a copy of `metric` which operates on array blocks. """
+    metric = copy.copy(metric)
+    for name, value in metric.__dict__.items():
+        if getattr(value, '__name__', None) == 'item' and \
+           isinstance(getattr(value, '__self__', None), numpy.ndarray):
+            setattr(metric, name, _Slicer(value.__self__))
+    return metric
+
+
+def _region_ranges(region):
+    """
+    Return ``(ranges, axis)`` for surface or curve `region`.
+    `ranges` is a list of ``[min, max)`` index ranges covering the cells
+    (or edges) processed, `axis` is the face axis for a 3D surface,
+    the edge axis for a curve, or None for a 2D surface.
+    """
+    ranges = [[region[i], region[i+1]] for i in range(1, len(region), 2)]
+    flat = [i for i, (imin, imax) in enumerate(ranges) if imin == imax]
+    if len(flat) == len(ranges) - 1:  # Curve.
+        axis = [i for i in range(len(ranges)) if i not in flat][0]
+    elif flat:  # Surface in 3D index space.
+        axis = flat[0]
+    else:  # Surface in 2D index space.
+        axis = None
+    for i in flat:
+        ranges[i][1] += 1
+    return (ranges, axis)
+
+
+def _promote(arr):
+    """
+    Return `arr` with single precision data converted to double precision,
+    as is done when accessing one value at a time via `item`.
+    """
+    if arr.dtype.kind == 'f' and arr.dtype.itemsize < 8:
+        return arr.astype(numpy.float64)
+    return arr
+
+
+def _block(ranges, offset):
+    """ Return tuple of slices for `ranges` shifted by `offset`. """
+    return tuple([slice(imin+delta, imax+delta)
+                  for (imin, imax), delta in zip(ranges, offset)])
+
+
+def _block_value(arr, ranges, offsets):
+    """ Return average of `arr` over `offsets` for `ranges`. """
+    val = _promote(arr[_block(ranges, offsets[0])])
+    for offset in offsets[1:]:
+        val = val + _promote(arr[_block(ranges, offset)])
+    if len(offsets) > 1:
+        val = val * (1. / len(offsets))
+    return val
+
+
+def _block_coords(zone, cylindrical):
+    """ Return coordinate arrays in `zone` (or None if not present). """
+    grid = zone.grid_coordinates
+    if cylindrical:
+        return (grid.z, grid.r, grid.t)
+    else:
+        return (grid.x, grid.y, grid.z)
+
+
+def _block_normals(c1, c2, c3, ranges, axis, cylindrical):
+    """
+    Return non-dimensional vectors normal to the faces in `ranges` with
+    magnitude equal to area. This is the vectorized form of
+    :meth:`_iface_normal`, :meth:`_jface_normal`, :meth:`_kface_normal`,
+    and :meth:`_cell_normal`.
+    """
+# FIXME: built-in ghosts
+    (axis_a, axis_b), sign = _NORMAL_AXES[axis]
+    zero = [0] * len(ranges)
+
+    def corner(arr, delta_a, delta_b):
+        """ Return `arr` at the given corner of each face. """
+        if arr is None:
+            return 0.
+        offset = list(zero)
+        offset[axis_a] = delta_a
+        offset[axis_b] = delta_b
+        return _promote(arr[_block(ranges, offset)])
+
+    # upper-left - lower-right.
+    diag_c11 = corner(c1, 1, 0) - corner(c1, 0, 1)
+    diag_c21 = corner(c2, 1, 0) - corner(c2, 0, 1)
+    diag_c31 = corner(c3, 1, 0) - corner(c3, 0, 1)
+
+    # upper-right - lower-left.
+    diag_c12 = corner(c1, 1, 1) - corner(c1, 0, 0)
+    diag_c22 = corner(c2, 1, 1) - corner(c2, 0, 0)
+    diag_c32 = corner(c3, 1, 1) - corner(c3, 0, 0)
+
+    if cylindrical:
+        r1 = (corner(c2, 0, 1) + corner(c2, 1, 0)) / 2.
+        r2 = (corner(c2, 0, 0) + corner(c2, 1, 1)) / 2.
+    else:
+        r1 = 1.
+        r2 = 1.
+
+    sc1 = sign * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
+    sc2 = sign * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
+    sc3 = sign * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
+
+    return (sc1, sc2, sc3)
+
+
+def _block_lengths(c1, c2, c3, ranges, axis, cylindrical):
+    """
+    Return lengths of the edges along `axis` in `ranges`.
+    This is the vectorized form of :meth:`_iedge_length`, etc.
+    """
+    start = [0] * len(ranges)
+    end = list(start)
+    end[axis] = 1
+
+    def delta(arr):
+        """ Return difference of `arr` across each edge. """
+        if arr is None:
+            return 0.
+        return _promote(arr[_block(ranges, end)]) - \
+               _promote(arr[_block(ranges, start)])
+
+    if cylindrical:
+        theta = delta(c3)
+        c2_end = _promote(c2[_block(ranges, end)])
+        dx = c2_end * numpy.cos(theta) - _promote(c2[_block(ranges, start)])
+        dy = c2_end * numpy.sin(theta)
+        dz = delta(c1)
+    else:
+        dx = delta(c1)
+        dy = delta(c2)
+        dz = delta(c3)
+
+    return numpy.sqrt(dx*dx + dy*dy + dz*dz)
+
+
+def _block_weights(scheme, domain, region):
+    """ Returns weights for a mesh surface or curve as a flat array. """
+    zone_name = region[0]
+    zone = getattr(domain, zone_name)
+    flow = zone.flow_solution
+    cylindrical = zone.coordinate_system == CYLINDRICAL
+    cell_center = flow.grid_location == CELL_CENTER
+    ranges, axis = _region_ranges(region)
+    key = (len(ranges), _get_dimension(region))
+
+    if key[1] == 1:  # Curve.
+        if cylindrical:
+            raise NotImplementedError('curve weights for cylindrical'
+                                      ' coordinates')
+        if scheme == 'mass':
+            raise NotImplementedError('curve mass averaging')
+        c1, c2, c3 = _block_coords(zone, False)
+        return _block_lengths(c1, c2, c3, ranges, axis, False).ravel()
+
+    c1, c2, c3 = _block_coords(zone, cylindrical)
+    sc1, sc2, sc3 = _block_normals(c1, c2, c3, ranges, axis, cylindrical)
+    if scheme == 'mass':
+        try:
+            momentum = flow.momentum
+        except AttributeError:
+            raise AttributeError("For mass averaging zone %s is missing"
+                                 " 'momentum'." % zone_name)
+        if cylindrical:
+            mom = (momentum.z, momentum.r, momentum.t)
+        else:
+            mom = (momentum.x, momentum.y, momentum.z)
+        if cell_center:
+            offsets = _FACE_CELL_OFFSETS[key][axis]
+        else:
+            offsets = _FACE_NODE_OFFSETS[key][axis]
+        rvu, rvv, rvw = [0. if arr is None else
+                         _block_value(arr, ranges, offsets) for arr in mom]
+        weights = rvu*sc1 + rvv*sc2 + rvw*sc3
+    else:
+        weights = numpy.sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
+    return weights.ravel()
+
+
+def _block_metric(metric, integrate, zone, region, weights):
+    """
+    Calculate metric on a surface or curve by evaluating whole index ranges
+    at once. Returns None if `metric` can't operate on arrays.
+    """
+    flow = zone.flow_solution
+    cylindrical = zone.coordinate_system == CYLINDRICAL
+    cell_center = flow.grid_location == CELL_CENTER
+    ranges, axis = _region_ranges(region)
+    key = (len(ranges), _get_dimension(region))
+
+    geom = None
+    if integrate:
+        c1, c2, c3 = _block_coords(zone, cylindrical)
+        if key[1] == 2:
+            geom = _block_normals(c1, c2, c3, ranges, axis, cylindrical)
+        else:
+            geom = _block_lengths(c1, c2, c3, ranges, axis, cylindrical)
+
+    if cell_center:
+# FIXME: built-in ghosts
+        offsets = _CELL_OFFSETS[key][axis]
+    else:
+        offsets = _NODE_OFFSETS[key][axis]
+
+    metric = _vectorize_metric(metric)
+    try:
+        # Metrics may return views of zone data, so no in-place operations.
+        val = metric.calculate(_block(ranges, offsets[0]), geom)
+        for offset in offsets[1:]:
+            val = val + metric.calculate(_block(ranges, offset), geom)
+    except TypeError:
+        return None
+    if len(offsets) > 1:
+        val = val * (1. / len(offsets))
+
+    if integrate:
+        return float(numpy.sum(val))
+    else:
+        return float(numpy.dot(numpy.ravel(val), weights))
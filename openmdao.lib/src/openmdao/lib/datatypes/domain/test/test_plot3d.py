@@ -6,6 +6,8 @@ import logging
 import os.path
 import unittest
 
+import numpy
+
 from openmdao.lib.datatypes.domain import read_plot3d_q, write_plot3d_q, \
                                           read_plot3d_f, write_plot3d_f, \
                                           read_plot3d_shape, write_plot3d_grid
@@ -129,6 +131,56 @@ class TestCase(unittest.TestCase):
         self.assertTrue(domain.is_equivalent(wedge, logger=logger))
 
 
+    def test_memmap(self):
+        logging.debug('')
+        logging.debug('test_memmap')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        wedge_flow = wedge.xyzzy.flow_solution
+
+        # Big-endian binary.
+        write_plot3d_q(wedge, 'be-binary.xyz', 'be-binary.q', logger=logger,
+                       big_endian=True, unformatted=False)
+        domain = read_plot3d_q('be-binary.xyz', 'be-binary.q', logger=logger,
+                               multiblock=False, big_endian=True,
+                               unformatted=False, memmap=True)
+        domain.rename_zone('xyzzy', domain.zone_1)
+        self.assertTrue(domain.is_equivalent(wedge, logger=logger))
+        self.assertTrue(isinstance(domain.xyzzy.grid_coordinates.x,
+                                   numpy.memmap))
+        self.assertTrue(isinstance(domain.xyzzy.flow_solution.density,
+                                   numpy.memmap))
+
+        # Little-endian unformatted multiblock.
+        wedge2 = create_wedge_3d((29, 19, 9), 5., 2.5, 4., 30.)
+        domain.add_domain(wedge2)
+        write_plot3d_q(domain, 'unformatted.xyz', 'unformatted.q',
+                       logger=logger)
+        domain = read_plot3d_q('unformatted.xyz', 'unformatted.q',
+                               logger=logger)
+        mapped = read_plot3d_q('unformatted.xyz', 'unformatted.q',
+                               logger=logger, memmap=True)
+        self.assertEqual(len(mapped.zones), 2)
+        for zone, expected in zip(mapped.zones, domain.zones):
+            self.assertTrue(isinstance(zone.grid_coordinates.z, numpy.memmap))
+            self.assertTrue(zone.is_equivalent(expected, logger))
+
+        # Function file.
+        varnames = ('density', 'momentum', 'energy_stagnation_density')
+        write_plot3d_f(wedge, 'unformatted.xyz', 'unformatted.f', varnames,
+                       logger=logger)
+        domain = read_plot3d_f('unformatted.xyz', 'unformatted.f',
+                               logger=logger, multiblock=False, memmap=True)
+        test_flow = domain.zone_1.flow_solution
+        self.assertTrue(isinstance(test_flow.f_1, numpy.memmap))
+        self.assertTrue((test_flow.f_1 == wedge_flow.density).all())
+        self.assertTrue((test_flow.f_4 == wedge_flow.momentum.z).all())
+        self.assertTrue((test_flow.f_5 == wedge_flow.energy_stagnation_density).all())
+
+        # Release mappings so files can be removed.
+        del domain, mapped, test_flow, zone
+
     def test_f_3d(self):
         logging.debug('')
         logging.debug('test_f_3d')
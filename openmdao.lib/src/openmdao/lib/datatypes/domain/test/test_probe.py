@@ -237,6 +237,41 @@ class TestCase(unittest.TestCase):
         assert_rel_error(self, metrics[5], -149.525, 0.00001)
         assert_rel_error(self, metrics[6], -262.976, 0.00001)
 
+    def test_vectorize(self):
+        logging.debug('')
+        logging.debug('test_vectorize')
+
+        # Verify array processing matches processing one cell at a time.
+        domain = restart.read('lpc-test', logging.getLogger())
+        surface = domain.extract([(0, -1, 0, -1, 2, 2)])
+        surface.demote()
+        variables = [('area', 'inch**2'),
+                     ('pressure_stagnation', 'psi'),
+                     ('temperature', 'degR'),
+                     ('mass_flow', 'lbm/s'),
+                     ('corrected_mass_flow', 'lbm/s')]
+        for dom, regions in ((domain, [('zone_1', 2, 2, 0, -1, 0, -1),
+                                       ('zone_2', 2, 2, 0, -1, 0, -1)]),
+                             (domain, [('zone_1', 0, -1, 2, 2, 0, -1)]),
+                             (domain, [('zone_1', 0, -1, 0, -1, 2, 2)]),
+                             (surface, [('zone_1', 0, -1, 0, -1)])):
+            for scheme in ('area', 'mass'):
+                expected = mesh_probe(dom, regions, variables, scheme,
+                                      vectorize=False)
+                metrics = mesh_probe(dom, regions, variables, scheme)
+                for value, expect in zip(metrics, expected):
+                    assert_rel_error(self, value, expect, 1e-12)
+
+        wedge = create_wedge_3d((30, 20, 100), 5., 0.5, 2., 30.)
+        variables = [('length', 'inch'), ('density', None)]
+        for regions in ((('xyzzy', 0, -1, 5, 5, 5, 5),),
+                        (('xyzzy', 5, 5, 0, -1, 5, 5),),
+                        (('xyzzy', 5, 5, 5, 5, 0, -1),)):
+            expected = mesh_probe(wedge, regions, variables, vectorize=False)
+            metrics = mesh_probe(wedge, regions, variables)
+            for value, expect in zip(metrics, expected):
+                assert_rel_error(self, value, expect, 1e-12)
+
     def test_errors(self):
         logging.debug('')
         logging.debug('test_errors')
@@ -2,13 +2,15 @@
 variety of difference types are available for both first and second order."""
 
 import logging
+import os
+from multiprocessing import Pool
 from ordereddict import OrderedDict
 from itertools import product
 
 from openmdao.main.numpy_fallback import array
 
 from enthought.traits.api import HasTraits
-from openmdao.lib.datatypes.api import Enum, Float
+from openmdao.lib.datatypes.api import Enum, Float, Int
 from openmdao.main.interfaces import implements, IDifferentiator
 from openmdao.main.container import find_name
 
@@ -33,6 +35,15 @@ def diff_2nd_xy(fpp, fpm, fmp, fmm, eps1, eps2):
     
     return (fpp - fpm - fmp + fmm)/(4.0*eps1*eps2)
 
+# The FiniteDifference instance whose points are being evaluated by a process
+# pool. Worker processes are forked from the parent and inherit it.
+_POOL_DIFFERENTIATOR = None
+
+def _run_point_in_child(data_param):
+    """Evaluates a single point in a pool worker process."""
+    
+    return _POOL_DIFFERENTIATOR._evaluate_point(data_param)
+
 
 class FiniteDifference(HasTraits):
     """ Differentiates a driver's workflow using the finite difference method.
@@ -48,6 +59,22 @@ class FiniteDifference(HasTraits):
     default_stepsize = Float(1.0e-6, iotype='in', desc='Default finite ' + \
                              'difference step size.')
     
+    n_procs = Int(1, low=1, iotype='in', desc='Number of processes used ' + \
+                  'to evaluate the finite difference points concurrently. ' + \
+                  'Each process runs its own forked copy of the model, so ' + \
+                  'the workflow must not share files or other external ' + \
+                  'state. Values greater than 1 require os.fork.')
+    
+    cache_size = Int(0, low=0, iotype='in', desc='Maximum number of ' + \
+                     'evaluated points to keep for reuse. Points are ' + \
+                     'matched on their parameter values rounded to ' + \
+                     'cache_digits significant digits. The cache is only ' + \
+                     'valid while inputs other than the parameters are ' + \
+                     'unchanged; call clear_cache() when they change.')
+    
+    cache_digits = Int(12, low=1, iotype='in', desc='Number of significant ' + \
+                       'digits used to match cached points.')
+    
     def __init__(self):
         
         # This gets set in the callback
@@ -65,11 +92,16 @@ class FiniteDifference(HasTraits):
         self.hessian_offdiag_case = OrderedDict()
         self.hessian = {}
         
+        self._point_cache = OrderedDict()
+        
     def setup(self):
         """Sets some dimensions."""
 
         self.param_names = self._parent.get_parameters().keys()
-        self.objective_names = self._parent.get_objectives().keys()
+        try:
+            self.objective_names = self._parent.get_objectives().keys()
+        except AttributeError:
+            self.objective_names = []
         
         try:
             self.ineqconst_names = self._parent.get_ineq_constraints().keys()
@@ -188,14 +220,14 @@ class FiniteDifference(HasTraits):
             self.gradient_case[param] = pcase
             
         # Run all "cases".
-        # TODO - Integrate OpenMDAO's concurrent processing capability once it
-        # is formalized. This operation is inherently paralellizable.
+        pcases = []
         for key, case in self.gradient_case.iteritems():
             for ipcase, pcase in enumerate(case):
                 if deltas[ipcase]:
-                    pcase['data'] = self._run_point(pcase['param'])
+                    pcases.append(pcase)
                 else:
                     pcase['data'] = base_data
+        self._run_cases(pcases)
                 
         
         # Calculate gradients
@@ -299,8 +331,7 @@ class FiniteDifference(HasTraits):
             self.hessian_offdiag_case[param1] = offdiag
             
         # Run all "cases".
-        # TODO - Integrate OpenMDAO's concurrent processing capability once it
-        # is formalized. This operation is inherently paralellizable.
+        pcases = []
         
         # We don't need to re-run on-diag cases if the gradients were
         # calculated with Central Difference.
@@ -314,15 +345,14 @@ class FiniteDifference(HasTraits):
                     pcase['data'] = gradient_ipcase['data'] 
         else:
             for case in self.hessian_ondiag_case.values():
-                for pcase in case:
-                    data = self._run_point(pcase['param'])
-                    pcase['data'] = data
+                pcases.extend(case)
 
         # Off-diag cases must always be run.
         for cases in self.hessian_offdiag_case.values():
             for case in cases.values():
-                for pcase in case:
-                    pcase['data'] = self._run_point(pcase['param'])
+                pcases.extend(case)
+                
+        self._run_cases(pcases)
 
                     
         # Calculate Hessians - On Diagonal
@@ -362,10 +392,96 @@ class FiniteDifference(HasTraits):
                         self.hessian[key1][key2][name]
                     
     
+    def _cache_size_changed(self, new):
+        """Discards the least recently used points that no longer fit."""
+        
+        while len(self._point_cache) > new:
+            self._point_cache.popitem(last=False)
+        
+    def clear_cache(self):
+        """Discards all cached points."""
+        
+        self._point_cache = OrderedDict()
+        
+    def _cache_key(self, data_param):
+        """Returns the key for a point in the point cache."""
+        
+        fmt = '%%.%dg' % self.cache_digits
+        return tuple(data_param.keys()) + \
+               tuple([fmt % val for val in data_param.values()])
+    
+    def _get_cached(self, data_param):
+        """Returns the cached data for a point, or None if it isn't
+        in the cache."""
+        
+        if self.cache_size:
+            key = self._cache_key(data_param)
+            data = self._point_cache.pop(key, None)
+            if data is not None:
+                # Re-insert so that this point is the most recently used.
+                self._point_cache[key] = data
+                return data.copy()
+        return None
+    
+    def _set_cached(self, data_param, data):
+        """Saves the data for a point in the cache, discarding the least
+        recently used points if the cache is full."""
+        
+        if self.cache_size:
+            self._point_cache[self._cache_key(data_param)] = data.copy()
+            self._cache_size_changed(self.cache_size)
+                
+    def _run_cases(self, pcases):
+        """Runs the model at the points given by the 'param' entry of each
+        case and stores the results in its 'data' entry. If n_procs is
+        greater than 1, the points are evaluated concurrently by a pool of
+        forked processes."""
+        
+        if self.cache_size:
+            torun = []
+            for pcase in pcases:
+                data = self._get_cached(pcase['param'])
+                if data is None:
+                    torun.append(pcase)
+                else:
+                    pcase['data'] = data
+            pcases = torun
+        
+        if self.n_procs > 1 and len(pcases) > 1 and hasattr(os, 'fork'):
+            global _POOL_DIFFERENTIATOR
+            _POOL_DIFFERENTIATOR = self
+            try:
+                pool = Pool(min(self.n_procs, len(pcases)))
+                try:
+                    results = pool.map(_run_point_in_child,
+                                       [pcase['param'] for pcase in pcases])
+                finally:
+                    pool.close()
+                    pool.join()
+            finally:
+                _POOL_DIFFERENTIATOR = None
+                
+            for pcase, data in zip(pcases, results):
+                pcase['data'] = data
+                self._set_cached(pcase['param'], data)
+        else:
+            for pcase in pcases:
+                pcase['data'] = self._run_point(pcase['param'])
+    
     def _run_point(self, data_param):
         """Runs the model at a single point and captures the results. Note that 
-        some differences require the baseline point."""
+        some differences require the baseline point. If the point is in the
+        cache, the model is not run and the cached results are returned."""
 
+        data = self._get_cached(data_param)
+        if data is None:
+            data = self._evaluate_point(data_param)
+            self._set_cached(data_param, data)
+        return data
+        
+    def _evaluate_point(self, data_param):
+        """Runs the model at a single point and returns the results."""
+        
         dvals = [float(val) for val in data_param.values()]
         self._parent.set_parameters(dvals)
         
@@ -375,8 +491,9 @@ class FiniteDifference(HasTraits):
         data = {}
 
         # Get Objectives
-        for key, item in self._parent.get_objectives().iteritems():
-            data[key] = item.evaluate(self._parent.parent)
+        if self.objective_names:
+            for key, item in self._parent.get_objectives().iteritems():
+                data[key] = item.evaluate(self._parent.parent)
 
         # Get Inequality Constraints
         if self.ineqconst_names:
@@ -155,6 +155,53 @@ class FiniteDifferenceTestCase(unittest.TestCase):
         #assert_rel_error(self, hess[0][1], 4.0, .001)
         #assert_rel_error(self, hess[1][0], 4.0, .001)
         
+    def test_concurrent(self):
+        
+        self.model.comp.x = 1.0
+        self.model.comp.u = 1.0
+        self.model.run()
+        diff = self.model.driver.differentiator
+        diff.default_stepsize = .001
+        diff.calc_gradient()
+        diff.calc_hessian(reuse_first=True)
+        serial_grad = diff.get_gradient('comp.y')
+        serial_hess = diff.get_Hessian('comp.y')
+        
+        diff.reset_state()
+        diff.n_procs = 3
+        diff.calc_gradient()
+        diff.calc_hessian()
+        self.assertEqual(list(diff.get_gradient('comp.y')), list(serial_grad))
+        self.assertEqual(list(diff.get_Hessian('comp.y')), list(serial_hess))
+        
+    def test_cache(self):
+        
+        self.model.comp.x = 1.0
+        self.model.comp.u = 1.0
+        self.model.run()
+        diff = self.model.driver.differentiator
+        diff.cache_size = 20
+        diff.calc_gradient()
+        grad = diff.get_gradient('comp.y')
+        
+        # All points are cached, so nothing needs to be run.
+        diff.reset_state()
+        count = self.model.comp.exec_count
+        diff.calc_gradient()
+        self.assertEqual(self.model.comp.exec_count, count)
+        self.assertEqual(list(diff.get_gradient('comp.y')), list(grad))
+        
+        # Only the off-diagonal points are new.
+        diff.calc_hessian(reuse_first=True)
+        self.assertEqual(self.model.comp.exec_count, count+4)
+        
+        # Least recently used points are discarded.
+        diff.cache_size = 2
+        diff.calc_hessian(reuse_first=True)
+        self.assertEqual(len(diff._point_cache), 2)
+        diff.clear_cache()
+        self.assertEqual(len(diff._point_cache), 0)
+        
     def test_reset_state(self):
         
         self.model.driver.form = 'central'
@@ -9,6 +9,7 @@
 __all__ = ['BroydenSolver']
 
 import logging
+from collections import deque
 
 try:
     import numpy
@@ -23,7 +24,7 @@ else:
 # pylint: disable-msg=E0611,F0401
 from openmdao.lib.datatypes.api import Float, Int, Enum
                                  
-from openmdao.main.api import Driver
+from openmdao.main.driver_uses_derivatives import DriverUsesDerivatives
 from openmdao.main.exceptions import RunStopped
 from openmdao.main.hasparameters import HasParameters
 from openmdao.main.hasconstraints import HasEqConstraints
@@ -33,7 +34,7 @@ from openmdao.main.interfaces import IHasParameters, IHasEqConstraints, implemen
     
 @stub_if_missing_deps('numpy')
 @add_delegate(HasParameters, HasEqConstraints)
-class BroydenSolver(Driver):
+class BroydenSolver(DriverUsesDerivatives):
     """ :term:`MIMO` Newton-Raphson Solver with Broyden approximation to the Jacobian.
     Algorithms are based on those found in ``scipy.optimize``.
     
@@ -55,19 +56,29 @@ class BroydenSolver(Driver):
       When computing ``inv(J)*F``, it uses those vectors to
       compute this product, thus avoiding the expensive NxN
       matrix multiplication.
+    - lmbroyden: Limited-memory broyden3 -- only the last *memory* updates
+      are kept, so storage and work per iteration stay O(N*memory) for
+      large systems.
     - excitingmixing: The excitingmixing algorithm. ``J=-1/alpha``
 
-    The broyden2 is the best. For large systems, use broyden3; excitingmixing is
-    also very effective. The remaining nonlinear solvers from SciPy are, in
-    their own words, of "mediocre quality," so they were not implemented.
+    The broyden2 is the best. For large systems, use broyden3 or lmbroyden;
+    excitingmixing is also very effective. The remaining nonlinear solvers
+    from SciPy are, in their own words, of "mediocre quality," so they were
+    not implemented.
+
+    The Broyden methods normally start from ``J=-1/alpha``. If
+    *initial_jacobian* is 'differentiator', they instead start from the
+    Jacobian calculated by the plugged-in differentiator, which uses
+    component-provided derivatives where available.
     """ 
 
     implements(IHasParameters, IHasEqConstraints)
     
     # pylint: disable-msg=E1101
-    algorithm = Enum('broyden2', ['broyden2', 'broyden3', 'excitingmixing'],
+    algorithm = Enum('broyden2', ['broyden2', 'broyden3', 'lmbroyden',
+                                  'excitingmixing'],
                      iotype = 'in', desc='Algorithm to use. Choose from '
-                     'broyden2, broyden3, and excitingmixing.')
+                     'broyden2, broyden3, lmbroyden, and excitingmixing.')
     
     itmax = Int(10, iotype='in', desc='Maximum number of iterations before '
                 'termination.')
@@ -78,6 +89,14 @@ class BroydenSolver(Driver):
     alphamax = Float(1.0, iotype='in', desc='Maximum Mixing Coefficient (only '
                                             'used with excitingmixing.)')
 
+    memory = Int(10, low=1, iotype='in', desc='Number of Jacobian updates '
+                 'kept (only used with lmbroyden.)')
+
+    initial_jacobian = Enum('alpha', ['alpha', 'differentiator'], iotype='in',
+                            desc='Initial Jacobian for the Broyden methods. '
+                            'Either -1/alpha, or calculated by the '
+                            'differentiator.')
+
     tol = Float(0.00001, iotype='in', 
                   desc='Convergence tolerance. If the norm of the independent '
                   'vector is lower than this, then terminate successfully.')
@@ -88,6 +107,14 @@ class BroydenSolver(Driver):
         
         self.xin = numpy.zeros(0,'d')
         self.F = numpy.zeros(0,'d')
+        self._inverse_jacobian = None
+        
+        # Derivatives are only needed to seed the Jacobian.
+        self.uses_gradients = False
+        
+    def _initial_jacobian_changed(self, old, new):
+        """Only check derivatives if we're going to use them."""
+        self.uses_gradients = new == 'differentiator'
         
         
     def execute(self):
@@ -97,26 +124,59 @@ class BroydenSolver(Driver):
         self.xin = numpy.zeros(len(independents),'d')
         for i, val in enumerate(independents):
             self.xin[i] = val.evaluate(self.parent)
+            
+        if self.initial_jacobian == 'differentiator' and \
+           self.algorithm != 'excitingmixing':
+            self._inverse_jacobian = self._calc_inverse_jacobian()
+        else:
+            self._inverse_jacobian = None
+            
         # perform an initial run for self-consistency
         self.pre_iteration()
         self.run_iteration()
         self.post_iteration()
 
         # get initial dependents
-        dependents = self.get_eq_constraints().values()
-        self.F = numpy.zeros(len(dependents),'d')
-        for i, val in enumerate(dependents):
-            term = val.evaluate(self.parent)
-            self.F[i] = term[0] - term[1]
+        self.F = self.eval_eq_constraint_vector(self.parent)
                 
         # pick solver algorithm
         if self.algorithm == 'broyden2':
             self.execute_broyden2()
         elif self.algorithm == 'broyden3':
             self.execute_broyden3()
+        elif self.algorithm == 'lmbroyden':
+            self.execute_lmbroyden()
         elif self.algorithm == 'excitingmixing':
             self.execute_excitingmixing()
             
+    def _calc_inverse_jacobian(self):
+        """Returns the inverse of the Jacobian of the equality constraints
+        with respect to the parameters, as calculated by the differentiator.
+        The parameters are restored to their initial values."""
+        
+        if not self.differentiator:
+            msg = 'A differentiator must be plugged into the differentiator ' \
+                  'slot to calculate the initial Jacobian.'
+            self.raise_exception(msg, RuntimeError)
+            
+        self.calc_derivatives(first=True)
+        self.ffd_order = 1
+        self.differentiator.calc_gradient()
+        self.ffd_order = 0
+        self.differentiator.reset_state()
+        
+        params = self.get_parameters().keys()
+        constraints = self.get_eq_constraints().keys()
+        jacobian = numpy.zeros((len(constraints), len(params)), 'd')
+        for i, con_name in enumerate(constraints):
+            for j, param_name in enumerate(params):
+                jacobian[i, j] = \
+                    self.differentiator.get_derivative(con_name, 
+                                                       wrt=param_name)
+        try:
+            return numpy.linalg.inv(jacobian)
+        except numpy.linalg.LinAlgError:
+            self.raise_exception('Initial Jacobian is singular.', RuntimeError)
                 
     def execute_broyden2(self):
         """From SciPy, Broyden's second method.
@@ -129,7 +189,10 @@ class BroydenSolver(Driver):
         
         xm = self.xin.T
         Fxm = numpy.matrix(self.F).T
-        Gm = -self.alpha*numpy.matrix(numpy.identity(len(self.xin)))
+        if self._inverse_jacobian is None:
+            Gm = -self.alpha*numpy.matrix(numpy.identity(len(self.xin)))
+        else:
+            Gm = numpy.matrix(self._inverse_jacobian)
         
         for n in range(self.itmax):
             
@@ -148,9 +211,7 @@ class BroydenSolver(Driver):
             self.post_iteration()
 
             # get dependents
-            for i, val in enumerate(self.get_eq_constraints().values()):
-                term = val.evaluate(self.parent)
-                self.F[i] = term[0] - term[1]
+            self.eval_eq_constraint_vector(self.parent, self.F)
             
             # successful termination if independents are below tolerance
             if norm(self.F) < self.tol:
@@ -186,9 +247,16 @@ class BroydenSolver(Driver):
             """G:=G+z*y.T'"""
             zy.append((z, y))
             
+        G0 = self._inverse_jacobian
+        if G0 is not None:
+            G0 = numpy.matrix(G0)
+            
         def Gmul(f):
             """G=-alpha*1+z*y.T+z*y.T ..."""
-            s = -self.alpha*f
+            if G0 is None:
+                s = -self.alpha*f
+            else:
+                s = G0*f
             for z, y in zy:
                 s = s + z*(y.T*f)
             return s
@@ -213,9 +281,7 @@ class BroydenSolver(Driver):
             self.post_iteration()
 
             # get dependents
-            for i, val in enumerate(self.get_eq_constraints().values()):
-                term = val.evaluate(self.parent)
-                self.F[i] = term[0] - term[1]
+            self.eval_eq_constraint_vector(self.parent, self.F)
 
             # successful termination if independents are below tolerance
             if norm(self.F) < self.tol:
@@ -236,6 +302,68 @@ class BroydenSolver(Driver):
             updateG(deltaxm - Gmul(deltaFxm), deltaFxm/norm(deltaFxm)**2)
 
 
+    def execute_lmbroyden(self):
+        """Limited-memory form of broyden3.
+
+        Only the last `memory` rank-one updates of the inverse Jacobian
+        are kept, so storage and the work per iteration are O(N*memory)
+        rather than growing with each iteration.
+        """
+        
+        G0 = self._inverse_jacobian
+        updates = deque(maxlen=self.memory)
+        
+        def Gmul(f):
+            """G=G0+z*y.T+z*y.T ..."""
+            if G0 is None:
+                s = -self.alpha*f
+            else:
+                s = numpy.dot(G0, f)
+            for z, y in updates:
+                s += z*numpy.dot(y, f)
+            return s
+
+        xm = self.xin.copy()
+        Fxm = self.F.copy()
+
+        for n in range(self.itmax):
+            
+            if self._stop:
+                self.raise_exception('Stop requested', RunStopped)
+
+            deltaxm = Gmul(-Fxm)
+            xm += deltaxm
+
+            # update the new independents in the model
+            self.set_parameters(xm)
+
+            # run the model
+            self.pre_iteration()
+            self.run_iteration()
+            self.post_iteration()
+
+            # get dependents
+            self.eval_eq_constraint_vector(self.parent, self.F)
+
+            # successful termination if independents are below tolerance
+            if norm(self.F) < self.tol:
+                return
+ 
+            deltaFxm = self.F - Fxm
+            
+            if norm(deltaFxm) == 0:
+                msg = "Broyden iteration has stopped converging. Change in " + \
+                      "input has produced no change in output. This could " + \
+                      "indicate a problem with your component connections. " + \
+                      "It could also mean that this solver method is " + \
+                      "inadequate for your problem."
+                raise RuntimeError(msg)
+            
+            Fxm = self.F.copy()
+            updates.append((deltaxm - Gmul(deltaFxm),
+                            deltaFxm/numpy.dot(deltaFxm, deltaFxm)))
+
+
     def execute_excitingmixing(self):
         """from scipy, The excitingmixing method.
 
@@ -269,9 +397,7 @@ class BroydenSolver(Driver):
             self.post_iteration()
 
             # get dependents
-            for i, val in enumerate(self.get_eq_constraints().values()):
-                term = val.evaluate(self.parent)
-                self.F[i] = term[0] - term[1]
+            self.eval_eq_constraint_vector(self.parent, self.F)
 
             # successful termination if independents are below tolerance
             if norm(self.F) < self.tol:
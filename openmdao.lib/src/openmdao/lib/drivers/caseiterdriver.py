@@ -45,6 +45,12 @@ class CaseIterDriverBase(Driver):
     reload_model = Bool(True, iotype='in',
                         desc='If True, reload the model between executions.')
 
+    restore_vars = Bool(False, iotype='in',
+                        desc='If True and reload_model is True, servers which'
+                             ' already have the model loaded only restore its'
+                             ' variables rather than reloading it. Only valid'
+                             ' if all model state is held in variables.')
+
     error_policy = Enum(values=('ABORT', 'RETRY'), iotype='in',
                         desc='If ABORT, any error stops the evaluation of the'
                              ' whole set of cases.')
@@ -618,9 +624,15 @@ class CaseIterDriverBase(Driver):
             self._queues[server].put((self._remote_load_model, server))
 
     def _remote_load_model(self, server):
-        """ Load model into remote server. """
+        """
+        Load model into remote server. If `restore_vars` is set and the
+        server already has this egg loaded, just have it restore the model's
+        variables.
+        """
         egg_file = self._server_info[server].get('egg_file', None)
-        if egg_file is None or egg_file is not self._egg_file:
+        loaded = egg_file is not None and egg_file is self._egg_file
+        restore = loaded and self.restore_vars
+        if not loaded:
             # Only transfer if changed.
             try:
                 filexfer(None, self._egg_file,
@@ -635,7 +647,10 @@ class CaseIterDriverBase(Driver):
             else:
                 self._server_info[server]['egg_file'] = self._egg_file
         try:
-            tlo = self._servers[server].load_model(self._egg_file)
+            if restore:
+                tlo = self._servers[server].restore_model(self._egg_file)
+            else:
+                tlo = self._servers[server].load_model(self._egg_file)
         # Difficult to force load error.
         except Exception as exc:  #pragma nocover
             self._logger.error('server.load_model of %r failed: %r',
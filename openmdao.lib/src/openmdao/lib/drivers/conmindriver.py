@@ -38,6 +38,7 @@ except ImportError as err:
     numpy_int = int
 
 from openmdao.main.api import Case, ExprEvaluator
+from openmdao.main.expreval import ExprBlock
 from openmdao.main.driver_uses_derivatives import DriverUsesDerivatives
 from openmdao.main.exceptions import RunStopped
 from openmdao.main.datatypes.api import Array, Bool, Enum, Float, Int, Str, List
@@ -391,16 +392,10 @@ class CONMINdriver(DriverUsesDerivatives):
                 super(CONMINdriver, self).run_iteration()
                 self.baseline_point = True
         
-            # calculate objective
-            self.cnmn1.obj = self.eval_objective()
-
-            # update constraint value array
-            for i, v in enumerate(self.get_ineq_constraints().values()):
-                val = v.evaluate(self.parent)
-                if '>' in val[2]:
-                    self.constraint_vals[i] = val[1]-val[0]
-                else:
-                    self.constraint_vals[i] = val[0]-val[1]
+            # calculate objective and update constraint value array
+            vals = self._eval_block.evaluate(self.parent, self._eval_vals)
+            self.cnmn1.obj = vals[0]
+            self.constraint_vals[:self.cnmn1.ncon] = vals[1:]
                 
             #self._logger.debug('constraints = %s'%self.constraint_vals)
                 
@@ -524,6 +519,16 @@ class CONMINdriver(DriverUsesDerivatives):
                 for i, val in enumerate(self.cons_is_linear):
                     self._cons_is_linear[i] = val
         
+        # objective and constraints are evaluated together by a single
+        # compiled function
+        if len(self.get_objectives()) < 1:
+            self.raise_exception('no objective specified', Exception)
+        texts = [obj.text for obj in self.get_objectives().values()]
+        texts.extend([con.get_value_text() 
+                      for con in self.get_ineq_constraints().values()])
+        self._eval_block = ExprBlock(texts)
+        self._eval_vals = zeros(len(texts), 'd')
+        
         self.cnmn1.ndv = num_dvs
         self.cnmn1.ncon = len(self.get_ineq_constraints())
         
@@ -7,8 +7,8 @@ are used as termination criteria.
 import logging
 # pylint: disable-msg=E0611,F0401
 try:
-    from numpy import zeros
-    from numpy.linalg import norm
+    from numpy import dot, zeros
+    from numpy.linalg import lstsq, norm
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
@@ -27,7 +27,11 @@ class FixedPointIterator(Driver):
     """ A simple fixed point iteration driver, which runs a workflow and passes
     the value from the output to the input for the next iteration. Relative
     change and number of iterations are used as termination criterea. This type
-    of iteration is also known as Gauss-Seidel."""
+    of iteration is also known as Gauss-Seidel.
+
+    The update may be accelerated by Aitken relaxation or by Anderson mixing
+    over the last `anderson_depth` iterations, which typically reduces the
+    number of workflow runs needed for tightly coupled problems."""
     
     implements(IHasParameters, IHasEqConstraints)
 
@@ -42,6 +46,12 @@ class FixedPointIterator(Driver):
                        desc = 'For multivariable iteration, type of norm'
                                    'to use to test convergence.')
 
+    accelerator = Enum('None', ['None', 'Aitken', 'Anderson'], iotype='in',
+                       desc='Method used to accelerate convergence.')
+
+    anderson_depth = Int(5, low=1, iotype='in', desc='Number of previous '
+                         'iterations used by Anderson mixing.')
+
     # Extra variables for printing
     printvars = List(Str, iotype='in', desc='List of extra variables to '
                                'output in the recorder.')
@@ -59,7 +69,9 @@ class FixedPointIterator(Driver):
 
         nvar = len(self.get_parameters().values())
         history = zeros([self.max_iteration, nvar])
+        inputs = zeros([self.max_iteration, nvar])
         delta = zeros(nvar)
+        self._omega = 1.0
         
         # Get and save the intial value of the input parameters
         val0 = zeros(nvar)
@@ -70,10 +82,7 @@ class FixedPointIterator(Driver):
         self.run_iteration()
         self.current_iteration = 0
         
-        for i, val in enumerate(self.get_eq_constraints().values()):
-            
-            term = val.evaluate(self.parent)
-            history[0, i] = term[0] - term[1]
+        self.eval_eq_constraint_vector(self.parent, history[0])
 
         if self.norm_order == 'Infinity':
             order = float('inf')
@@ -95,7 +104,8 @@ class FixedPointIterator(Driver):
                 return
                 
             # Pass output to input
-            val0 += history[self.current_iteration, :]
+            inputs[self.current_iteration] = val0
+            val0 += self._step(self.current_iteration, inputs, history)
             self.set_parameters(val0)
 
             # run the workflow
@@ -120,10 +130,7 @@ class FixedPointIterator(Driver):
             self.current_iteration += 1
         
             # check convergence
-            for i, val in enumerate(self.get_eq_constraints().values()):
-            
-                term = val.evaluate(self.parent)
-                delta[i] = term[0] - term[1]
+            self.eval_eq_constraint_vector(self.parent, delta)
             
             history[self.current_iteration] = delta
             
@@ -134,6 +141,25 @@ class FixedPointIterator(Driver):
             #    break
         self.history = history[:self.current_iteration+1, :]
         
+    def _step(self, k, inputs, history):
+        """Return the change to apply to `inputs[k]` given the residuals
+        in `history[:k+1]`."""
+        resid = history[k]
+        if self.accelerator == 'Aitken':
+            if k > 0:
+                dres = resid - history[k-1]
+                denom = dot(dres, dres)
+                if denom > 0.:
+                    self._omega *= -dot(history[k-1], dres) / denom
+            return self._omega * resid
+        elif self.accelerator == 'Anderson' and k > 0:
+            m = min(self.anderson_depth, k)
+            dres = (history[k-m+1:k+1] - history[k-m:k]).T
+            dinp = (inputs[k-m+1:k+1] - inputs[k-m:k]).T
+            gamma = lstsq(dres, resid, rcond=-1)[0]
+            return resid - dot(dinp + dres, gamma)
+        return resid
+
     def _check_config(self):
         """Make sure the problem is set up right."""
         
@@ -139,12 +139,9 @@ def user_function(info, x, obj, dobj, ddobj, g, dg, n2, n3, n4, imode, driver):
         
         # evaluate constraint functions
         if info == 2:
-            for i, v in enumerate(driver.get_ineq_constraints().values()):
-                val = v.evaluate(driver.parent)
-                if '>' in val[2]:
-                    g[i] = val[0]-val[1]
-                else:
-                    g[i] = val[1]-val[0]
+            # NEWSUMT wants g >= 0 for a satisfied constraint
+            vals = driver.eval_ineq_constraint_vector(driver.parent)
+            g[:len(vals)] = -vals
 
     elif info == 3 :
         # evaluate the first and second order derivatives
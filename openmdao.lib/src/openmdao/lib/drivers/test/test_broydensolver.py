@@ -9,6 +9,7 @@ import numpy
 
 from openmdao.main.api import Assembly, Component, set_as_top
 from openmdao.lib.drivers.api import BroydenSolver
+from openmdao.lib.differentiators.finite_difference import FiniteDifference
 from openmdao.main.datatypes.float import Float
 from openmdao.util.testutil import assert_rel_error
 
@@ -249,6 +250,25 @@ class TestCase(unittest.TestCase):
         assert_rel_error(self, prob.dis1.y2, 0.904988, 0.0001)
         assert_rel_error(self, prob.dis2.y2, 0.904988, 0.0001)
         
+    def test_LMBroyden(self):
+    
+        prob = SellarBroyden()
+        set_as_top(prob)
+    
+        prob.dis1.z1_in = 5.0
+        prob.dis1.z2_in = 2.0
+        prob.dis1.x1 = 1.0
+        prob.dis2.z1_in = 5.0
+        prob.dis2.z2_in = 2.0
+        prob.driver.algorithm = "lmbroyden"
+        
+        prob.run()
+
+        assert_rel_error(self, prob.dis1.y1, 0.819002, 0.0001)
+        assert_rel_error(self, prob.dis2.y1, 0.819002, 0.0001)
+        assert_rel_error(self, prob.dis1.y2, 0.904988, 0.0001)
+        assert_rel_error(self, prob.dis2.y2, 0.904988, 0.0001)
+        
     def test_ExcitingMixing(self):
     
         prob = SellarBroyden()
@@ -308,6 +328,54 @@ class TestCase(unittest.TestCase):
         assert_rel_error(self, 1.0 - prob.dis1.x4, 1.0, 0.0001)
         assert_rel_error(self, 1.0 - prob.dis1.x5, 1.0, 0.0001)
         
+    def test_MIMO_LMBroyden(self):
+        # Testing Broyden on a 5 input 5 output case with limited memory
+    
+        prob = MIMOBroyden()
+        set_as_top(prob)
+    
+        prob.dis1.x1 = 1.0
+        prob.dis1.x2 = 1.0
+        prob.dis1.x3 = 1.0
+        prob.dis1.x4 = 1.0
+        prob.dis1.x5 = 1.0
+        prob.driver.algorithm = "lmbroyden"
+        prob.driver.memory = 3
+        
+        prob.run()
+        assert_rel_error(self, 1.0 - prob.dis1.x1, 1.0, 0.0001)
+        assert_rel_error(self, 1.0 - prob.dis1.x2, 1.0, 0.0001)
+        assert_rel_error(self, 1.0 - prob.dis1.x3, 1.0, 0.0001)
+        assert_rel_error(self, 1.0 - prob.dis1.x4, 1.0, 0.0001)
+        assert_rel_error(self, 1.0 - prob.dis1.x5, 1.0, 0.0001)
+        
+    def test_MIMO_initial_jacobian(self):
+        # Seeding the Jacobian takes fewer iterations to converge.
+    
+        for algorithm in ("broyden2", "broyden3", "lmbroyden"):
+            prob = MIMOBroyden()
+            set_as_top(prob)
+            prob.driver.algorithm = algorithm
+            prob.driver.initial_jacobian = "differentiator"
+            
+            try:
+                prob.run()
+            except RuntimeError, err:
+                msg = "driver: A differentiator must be plugged into the " \
+                      "differentiator slot to calculate the initial Jacobian."
+                self.assertEqual(str(err), msg)
+            else:
+                self.fail('RuntimeError expected')
+            
+            prob.driver.differentiator = FiniteDifference()
+            prob.driver.itmax = 5
+            prob.run()
+            assert_rel_error(self, 1.0 - prob.dis1.x1, 1.0, 0.0001)
+            assert_rel_error(self, 1.0 - prob.dis1.x2, 1.0, 0.0001)
+            assert_rel_error(self, 1.0 - prob.dis1.x3, 1.0, 0.0001)
+            assert_rel_error(self, 1.0 - prob.dis1.x4, 1.0, 0.0001)
+            assert_rel_error(self, 1.0 - prob.dis1.x5, 1.0, 0.0001)
+        
     def test_MIMO_ExcitingMixing(self):
         """ Testing Broyden on a 2 input 2 output case"""
     
@@ -361,6 +429,20 @@ class TestCase(unittest.TestCase):
         else:
             self.fail()
         
+        prob.driver.algorithm = "lmbroyden"
+        
+        try:
+            prob.run()
+        except RuntimeError, err:
+            msg = "Broyden iteration has stopped converging. Change in " + \
+                  "input has produced no change in output. This could " + \
+                  "indicate a problem with your component connections. " + \
+                  "It could also mean that this solver method is " + \
+                  "inadequate for your problem."     
+            self.assertEqual(str(err), msg)
+        else:
+            self.fail()
+        
             
 if __name__ == '__main__':
     import nose
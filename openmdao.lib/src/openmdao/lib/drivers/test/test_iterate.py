@@ -71,6 +71,17 @@ class Multi(Component):
         self.out1 = self.in1/10.0
         self.out2 = self.in2/10.0
 
+class Coupled(Component):
+    """Slowly converging linear coupled system"""
+    in1 = Float(0.0, iotype="in")
+    in2 = Float(0.0, iotype="in")
+    out1 = Float(0, iotype="out")
+    out2 = Float(0, iotype="out")
+
+    def execute(self):
+        self.out1 = 0.5*self.in1 + 0.4*self.in2 + 1.0
+        self.out2 = 0.45*self.in1 + 0.5*self.in2 - 1.0
+
 class FixedPointIteratorTestCase(unittest.TestCase):
     """test FixedPointIterator component"""
 
@@ -109,6 +120,31 @@ class FixedPointIteratorTestCase(unittest.TestCase):
         assert_rel_error(self, self.top.simple.out1, .001, .0002)
         self.assertEqual(self.top.driver.current_iteration, 2)
             
+    def test_accelerator(self):
+        self.top.add("driver", FixedPointIterator())
+        self.top.add("simple", Coupled())
+        self.top.driver.workflow.add('simple')
+
+        self.top.driver.add_constraint('simple.out1 = simple.in1')
+        self.top.driver.add_constraint('simple.out2 = simple.in2')
+        self.top.driver.add_parameter('simple.in1', -9e99, 9e99)
+        self.top.driver.add_parameter('simple.in2', -9e99, 9e99)
+        self.top.driver.tolerance = 1e-8
+        self.top.driver.max_iteration = 500
+
+        iterations = {}
+        for accelerator in ('None', 'Aitken', 'Anderson'):
+            self.top.simple.in1 = 0.
+            self.top.simple.in2 = 0.
+            self.top.driver.accelerator = accelerator
+            self.top.run()
+            assert_rel_error(self, self.top.simple.in1, 0.1/0.07, 1e-6)
+            assert_rel_error(self, self.top.simple.in2, -0.05/0.07, 1e-6)
+            iterations[accelerator] = self.top.driver.current_iteration
+
+        self.assertTrue(iterations['Aitken'] < iterations['None'])
+        self.assertTrue(iterations['Anderson'] < 10)
+
     def test_maxiteration(self):
         self.top.add("driver", FixedPointIterator())
         self.top.add("simple", Simple1())
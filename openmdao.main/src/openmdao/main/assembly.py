@@ -11,7 +11,8 @@ import threading
 from enthought.traits.api import Missing
 
 from openmdao.main.interfaces import implements, IDriver
-from openmdao.main.container import find_trait_and_value
+from openmdao.main.container import Container, find_trait_and_value, \
+                                    _copydict
 from openmdao.main.component import Component
 from openmdao.main.variable import Variable
 from openmdao.main.datatypes.slot import Slot
@@ -86,6 +87,8 @@ class Assembly (Component):
     def __init__(self, doc=None, directory=''):
         super(Assembly, self).__init__(doc=doc, directory=directory)
         
+        self._transfer_plans = {}
+        
         # default Driver executes its workflow once
         self.add('driver', Driver())
         
@@ -244,6 +247,7 @@ class Assembly (Component):
                                      (srcpath, destpath, str(err)), RuntimeError)
                     
         super(Assembly, self).connect(srcpath, destpath)
+        self._transfer_plans = {}
         
         # if it's an internal connection, could change dependencies, so we have
         # to call config_changed to notify our driver
@@ -272,6 +276,7 @@ class Assembly (Component):
                 super(Assembly, self).disconnect(src, sink)
         else:
             super(Assembly, self).disconnect(varpath, varpath2)
+        self._transfer_plans = {}
             
     def config_changed(self, update_parent=True):
         """Call this whenever the configuration of this Component changes,
@@ -279,6 +284,7 @@ class Assembly (Component):
         or removed, etc.
         """
         super(Assembly, self).config_changed(update_parent)
+        self._transfer_plans = {}
         # driver must tell workflow that config has changed because
         # dependencies may have changed
         if self.driver is not None:
@@ -305,6 +311,12 @@ class Assembly (Component):
                         if isinstance(dst_type, PassthroughProperty):
                             setattr(self, dest, srccomp.get_wrapped_attr(src))
     
+    def __getstate__(self):
+        """Return dict representing this container's state."""
+        state = super(Assembly, self).__getstate__()
+        state['_transfer_plans'] = {}
+        return state
+        
     def step(self):
         """Execute a single child component and return."""
         self.driver.step()
@@ -329,20 +341,80 @@ class Assembly (Component):
             #cfg.cmds.append("%s.connect('%s', '%s')" % (pathname, src, dest))
         #return cfg
     
-    def _cvt_input_srcs(self, sources):
-        link = self._depgraph.get_link('@xin', '@bin')
-        if link is None:
-            return sources
+    def _build_transfer_plan(self, compname):
+        """Return a list of the form [(srccompname, srccomp, transfers), ...]
+        with an entry for each incoming link to the specified component.
+        *transfers* is a dict mapping each destination variable name to a
+        tuple of the form (src, xfer_src, getter, fast_dest), where *src* is
+        the source name within the link, *xfer_src* is the name of the
+        variable to read on *srccomp*, *getter* is None or a tuple of the
+        form (copy, wrapper) used to read a direct trait of a local
+        Container without going through get_wrapped_attr(), and *fast_dest*
+        is True if the destination can be set directly as an input trait.
+        """
+        if compname[0] == '@':
+            destcomp = self
         else:
-            newsrcs = []
-            dests = link._dests
-            for s in sources:
-                if '.' in s:
-                    newsrcs.append(dests[s])
+            destcomp = getattr(self, compname)
+        fast_dests = destcomp is not self and \
+                     isinstance(destcomp, Container) and \
+                     type(destcomp).set.im_func is Container.set.im_func
+        
+        plan = []
+        for srccompname, link in self._depgraph.in_links(compname):
+            if srccompname == '@bin':
+                srccomp = self
+                xin = self._depgraph.get_link('@xin', '@bin')
+            else:
+                srccomp = getattr(self, srccompname)
+                xin = None
+            transfers = {}
+            for dest, src in link._dests.items():
+                xfer_src = src
+                if xin is not None and '.' in src:
+                    xfer_src = xin._dests[src]
+                
+                getter = None
+                if isinstance(srccomp, Container) and '.' not in xfer_src:
+                    trait = srccomp.get_trait(xfer_src)
+                    if trait is not None:
+                        ttype = trait.trait_type
+                        copy = _copydict[ttype.copy] if ttype.copy else None
+                        getter = (copy, ttype.get_val_wrapper)
+                        
+                fast_dest = False
+                if fast_dests and '.' not in dest:
+                    trait = destcomp.get_trait(dest)
+                    fast_dest = trait is not None and trait.iotype == 'in'
+                    
+                transfers[dest] = (src, xfer_src, getter, fast_dest)
+            plan.append((srccompname, srccomp, transfers))
+            
+        return (destcomp, plan)
+    
+    def _get_transfer_plan(self, compname):
+        """Return a tuple of the form (destcomp, plan) for transferring data
+        to the specified component, building it if necessary.  Plans are
+        discarded when our configuration changes and are rebuilt if any of
+        the components involved has been replaced.
+        """
+        try:
+            destcomp, plan = self._transfer_plans[compname]
+        except KeyError:
+            pass
+        else:
+            if compname[0] == '@' or getattr(self, compname) is destcomp:
+                for srccompname, srccomp, transfers in plan:
+                    if srccompname != '@bin' and \
+                       getattr(self, srccompname) is not srccomp:
+                        break
                 else:
-                    newsrcs.append(s)
-            return newsrcs
+                    return (destcomp, plan)
         
+        destcomp, plan = self._transfer_plans[compname] = \
+            self._build_transfer_plan(compname)
+        return (destcomp, plan)
+    
     @rbac(('owner', 'user'))
     def update_inputs(self, compname, varnames):
         """Transfer input data to input variables on the specified component.
@@ -351,13 +423,15 @@ class Assembly (Component):
         """
         parent = self.parent
         vset = set(varnames)
-        if compname[0] == '@':
-            destcomp = self
-        else:
-            destcomp = getattr(self, compname)
-        for srccompname,srcs,dests in self._depgraph.in_map(compname, vset):
+        destcomp, plan = self._get_transfer_plan(compname)
+        for srccompname, srccomp, transfers in plan:
+            matches = [(dest, transfers[dest]) for dest in vset 
+                                               if dest in transfers]
+            if not matches:
+                continue
             if srccompname == '@bin':   # boundary inputs
-                invalid_srcs = [s for s in srcs if not self._valid_dict[s]]
+                invalid_srcs = [xfer[0] for dest, xfer in matches 
+                                        if not self._valid_dict[xfer[0]]]
                 if len(invalid_srcs) > 0:
                     if parent:
                         parent.update_inputs(self.name, invalid_srcs)
@@ -365,28 +439,32 @@ class Assembly (Component):
                     for name in invalid_srcs:
                         self._valid_dict[name] = True
                 srccompname = ''
-                srccomp = self
-                srcs = self._cvt_input_srcs(srcs)
-            else:
-                srccomp = getattr(self, srccompname)
-                if not srccomp.is_valid():
-                    srccomp.update_outputs(srcs)
+            elif not srccomp.is_valid():
+                srccomp.update_outputs([xfer[0] for dest, xfer in matches])
             
-            # TODO: add multiget/multiset stuff here...
-            for src,dest in zip(srcs, dests):
+            for dest, (src, xfer_src, getter, fast_dest) in matches:
                 try:
-                    srcval = srccomp.get_wrapped_attr(src)
+                    if getter is None:
+                        srcval = srccomp.get_wrapped_attr(xfer_src)
+                    else:
+                        srcval = getattr(srccomp, xfer_src)
+                        if getter[0] is not None:
+                            srcval = getter[0](srcval)
+                        if getter[1] is not None:
+                            srcval = getter[1](srcval)
                 except Exception, err:
                     self.raise_exception(
                         "error retrieving value for %s from '%s': %s" %
-                        (src,srccompname,str(err)), type(err))
+                        (xfer_src,srccompname,str(err)), type(err))
                 try:
                     if srccomp is self:
-                        srcname = src
+                        srcname = xfer_src
                     else:
-                        srcname = '.'.join([srccompname, src])
+                        srcname = '.'.join([srccompname, xfer_src])
                     if destcomp is self:
                         setattr(destcomp, dest, srcval)
+                    elif fast_dest:
+                        destcomp._set_input_nocheck(dest, srcval)
                     else:
                         #destcomp.set(dest, srcval, src='parent.'+srcname)
                         # don't need to do source checking here unless we've messed up our bookkeeping
@@ -6,6 +6,7 @@ from StringIO import StringIO
 
 from openmdao.main.expreval import ExprEvaluator
 from openmdao.main.exceptions import TracedError
+from openmdao.main.filevar import FileRef
 
 class _Missing(object):
     pass
@@ -190,54 +191,75 @@ class Case(object):
 
     def apply_inputs(self, scope):
         """Take the values of all of the inputs in this case and apply them
-        to the specified scope.
+        to the specified scope.  Inputs that are simple names are applied
+        with a single :meth:`set_many` call so that a remote scope requires
+        only one round trip.
         """
         scope._case_id = self.uuid
         if self._exprs:
+            simple = []
             for name,value in self._inputs.items():
                 expr = self._exprs.get(name)
                 if expr:
                     expr.set(value, scope)
                 else:
-                    scope.set(name, value)
+                    simple.append((name, value))
         else:
-            for name,value in self._inputs.items():
-                scope.set(name, value)
+            simple = self._inputs.items()
+        if simple:
+            scope.set_many(simple)
 
     def update_outputs(self, scope, msg=None):
         """Update the value of all outputs in this Case, using the given scope.
+        Outputs that are simple names are retrieved with a single
+        :meth:`get_many` call.  If that fails, they are retrieved one at a
+        time so that errors can be associated with individual outputs.
         """
         self.msg = msg
         last_excpt = None
         if self._outputs is not None:
-            if self._exprs:
-                for name in self._outputs.keys():
-                    expr = self._exprs.get(name)
-                    try:
-                        if expr:
-                            self._outputs[name] = expr.evaluate(scope)
-                        else:
+            simple = []
+            for name in self._outputs.keys():
+                expr = self._exprs.get(name) if self._exprs else None
+                if expr is None:
+                    simple.append(name)
+                    continue
+                try:
+                    self._outputs[name] = expr.evaluate(scope)
+                except Exception as err:
+                    last_excpt = self._output_failed(name, err)
+            if simple:
+                try:
+                    values = scope.get_many(simple)
+                except Exception:
+                    for name in simple:
+                        try:
                             self._outputs[name] = scope.get(name)
-                    except Exception as err:
-                        last_excpt = TracedError(err, traceback.format_exc())
-                        self._outputs[name] = _Missing
-                        if self.msg is None:
-                            self.msg = str(err)
-                        else:
-                            self.msg = self.msg + " %s" % err
-            else:
-                for name in self._outputs.keys():
-                    try:
-                        self._outputs[name] = scope.get(name)
-                    except Exception as err:
-                        last_excpt = TracedError(err, traceback.format_exc())
-                        self._outputs[name] = _Missing
-                        if self.msg is None:
-                            self.msg = str(err)
-                        else:
-                            self.msg = self.msg + " %s" % err
+                        except Exception as err:
+                            last_excpt = self._output_failed(name, err)
+                else:
+                    for name, value in zip(simple, values):
+                        if isinstance(value, FileRef):
+                            # get_many() doesn't proxy FileRefs, get() does.
+                            try:
+                                value = scope.get(name)
+                            except Exception as err:
+                                last_excpt = self._output_failed(name, err)
+                                continue
+                        self._outputs[name] = value
         if last_excpt:
             raise last_excpt
+
+    def _output_failed(self, name, err):
+        """Mark output `name` as missing, record `err` in our message, and
+        return a :class:`TracedError` for it.
+        """
+        self._outputs[name] = _Missing
+        if self.msg is None:
+            self.msg = str(err)
+        else:
+            self.msg = self.msg + " %s" % err
+        return TracedError(err, traceback.format_exc())
             
     def add_input(self, name, value):
         """Adds an input and its value to this case.
@@ -414,34 +414,10 @@ class Component (Container):
         if self.directory:
             self.push_dir()
 
-        if self.force_execute:
-            force = True
-
-        self._stop = False
-        self.ffd_order = ffd_order
-        self._case_id = case_id
         try:
-            self._pre_execute(force)
-            if self._call_execute or force:
+            if self._start_run(force, ffd_order, case_id):
                 #print 'execute: %s' % self.get_pathname()
-                
-                if ffd_order == 1 and \
-                   hasattr(self, 'calculate_first_derivatives'):
-                    # During Fake Finite Difference, the available derivatives
-                    # are used to approximate the outputs.
-                    self._execute_ffd(1)
-                    
-                elif ffd_order == 2 and \
-                   hasattr(self, 'calculate_second_derivatives'):
-                    # During Fake Finite Difference, the available derivatives
-                    # are used to approximate the outputs.
-                    self._execute_ffd(2)
-                    
-                else:
-                    # Component executes as normal
-                    self.execute()
-                    self.exec_count += 1
-                    
+                self._run_execute(ffd_order)
                 self._post_execute()
             #else:
                 #print 'skipping: %s' % self.get_pathname()
@@ -449,6 +425,40 @@ class Component (Container):
         finally:
             if self.directory:
                 self.pop_dir()
+
+    def _start_run(self, force=False, ffd_order=0, case_id=''):
+        """First part of *run()*. Prepares for execution and updates our
+        inputs. Returns True if *execute()* needs to be called.
+        """
+        if self.force_execute:
+            force = True
+
+        self._stop = False
+        self.ffd_order = ffd_order
+        self._case_id = case_id
+        self._pre_execute(force)
+        return self._call_execute or force
+    
+    def _run_execute(self, ffd_order=0):
+        """Calls *execute()*, or *_execute_ffd()* during Fake Finite
+        Difference.
+        """
+        if ffd_order == 1 and \
+           hasattr(self, 'calculate_first_derivatives'):
+            # During Fake Finite Difference, the available derivatives
+            # are used to approximate the outputs.
+            self._execute_ffd(1)
+            
+        elif ffd_order == 2 and \
+           hasattr(self, 'calculate_second_derivatives'):
+            # During Fake Finite Difference, the available derivatives
+            # are used to approximate the outputs.
+            self._execute_ffd(2)
+            
+        else:
+            # Component executes as normal
+            self.execute()
+            self.exec_count += 1
  
     def add(self, name, obj):
         """Override of base class version to force call to *check_config*
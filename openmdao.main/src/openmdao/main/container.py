@@ -875,24 +875,7 @@ class Container(HasTraits):
                 if not force:
                     self._check_source(path, src)
                 if index is None:
-                    # bypass input source checking
-                    chk = self._input_check
-                    self._input_check = self._input_nocheck
-                    try:
-                        setattr(self, path, value)
-                    finally:
-                        self._input_check = chk
-                    # Note: This was done to make foo.bar = 3 behave the
-                    # same as foo.set('bar', 3).
-                    # Without this, the output of the comp was
-                    # always invalidated when you call set_parameters.
-                    # This meant that component was always executed
-                    # even when the inputs were unchanged.
-                    # _call_execute is set in the on-trait-changed
-                    # callback, so it's a good test for whether the
-                    # value changed.
-                    if hasattr(self, "_call_execute") and self._call_execute:
-                        self._input_updated(path)
+                    self._set_input_nocheck(path, value)
                 else:  # array index specified
                     self._index_set(path, value, index)
             elif index:  # array index specified for output
@@ -900,6 +883,62 @@ class Container(HasTraits):
             else: # output
                 setattr(self, path, value)
 
+    def _set_input_nocheck(self, name, value):
+        """Set the value of the input specified by name, which must be a 
+        direct trait of this object, without checking its source.
+        """
+        # bypass input source checking
+        chk = self._input_check
+        self._input_check = self._input_nocheck
+        try:
+            setattr(self, name, value)
+        finally:
+            self._input_check = chk
+        # Note: This was done to make foo.bar = 3 behave the
+        # same as foo.set('bar', 3).
+        # Without this, the output of the comp was
+        # always invalidated when you call set_parameters.
+        # This meant that component was always executed
+        # even when the inputs were unchanged.
+        # _call_execute is set in the on-trait-changed
+        # callback, so it's a good test for whether the
+        # value changed.
+        if hasattr(self, "_call_execute") and self._call_execute:
+            self._input_updated(name)
+
+    @rbac(('owner', 'user'))
+    def get_many(self, paths):
+        """Return a list of the values specified by *paths*, in the same
+        order.  Each entry of *paths* is either a path string or a tuple of the
+        form (path, index), where *index* has the same form as for
+        :meth:`get`.  This allows a remote client to retrieve many values
+        with a single request.  Note that, unlike :meth:`get`, values are
+        returned by value, so they are never proxied.  In particular, a
+        :class:`FileRef` is of no use to a remote client; use :meth:`get`
+        for those.
+        """
+        values = []
+        for entry in paths:
+            if isinstance(entry, basestring):
+                values.append(self.get(entry))
+            else:
+                values.append(self.get(*entry))
+        return values
+
+    @rbac(('owner', 'user'))
+    def set_many(self, values):
+        """Set multiple variables in order.  Each entry of *values* is a
+        tuple of the form (path, value) or (path, value, index), where *index*
+        has the same form as for :meth:`set`.  This allows a remote client
+        to set many values with a single request.  Processing stops at the
+        first entry that fails, raising the corresponding exception.
+        """
+        for entry in values:
+            if len(entry) == 2:
+                self.set(entry[0], entry[1])
+            else:
+                self.set(entry[0], entry[1], entry[2])
+
     def _process_index_entry(self, obj, idx):
         """Return a new object based on a starting object and some operation
         indicated by idx that can be either an index into a container, an 
@@ -1,10 +1,17 @@
 
+import cPickle
+import os
+import select
+from heapq import heappush, heappop
+
 import networkx as nx
 from networkx.algorithms.components import strongly_connected_components
 
 from openmdao.main.seqentialflow import SequentialWorkflow
 from openmdao.main.interfaces import IDriver
-from openmdao.main.mp_support import has_interface
+from openmdao.main.exceptions import RunStopped
+from openmdao.main.mp_support import has_interface, is_instance, \
+                                     OpenMDAO_Proxy
 
 __all__ = ['Dataflow']
 
@@ -12,7 +19,19 @@ class Dataflow(SequentialWorkflow):
     """
     A Dataflow consists of a collection of Components which are executed in 
     data flow order.
+    
+    If *n_procs* is greater than 1, up to *n_procs* independent Components
+    are executed at the same time, each in a forked copy of the process
+    (this requires os.fork).  Inputs are still updated and outputs are
+    still validated in the main process, but only the output Variables of
+    a Component are copied back after it executes, so any other state
+    changed by *execute()* is lost.  Drivers, Assemblies, remote proxies,
+    and Components run during Fake Finite Difference are always executed
+    in the main process.
     """
+    
+    n_procs = 1
+    
     def __init__(self, parent=None, scope=None, members=None):
         """ Create an empty flow. """
         super(Dataflow, self).__init__(parent, scope, members)
@@ -25,6 +44,145 @@ class Dataflow(SequentialWorkflow):
         scope = self.scope
         return [getattr(scope, n) for n in self._get_topsort()].__iter__()
 
+    def run(self, ffd_order=0, case_id=''):
+        """ Run the Components in this Workflow. """
+        if self.n_procs > 1 and ffd_order == 0 and hasattr(os, 'fork'):
+            self._run_concurrent(case_id)
+        else:
+            super(Dataflow, self).run(ffd_order, case_id)
+
+    def _run_concurrent(self, case_id):
+        """Run each component as soon as all of its predecessors in the
+        collapsed graph have finished, with up to *n_procs* components
+        executing in child processes at once.
+        """
+        self._stop = False
+        scope = self.scope
+        order = self._get_topsort()
+        graph = self._get_collapsed_graph()
+        topo = dict([(name, i) for i, name in enumerate(order)])
+        npreds = dict([(name, graph.in_degree(name)) for name in order])
+        ready = []
+        for name in order:
+            if npreds[name] == 0:
+                heappush(ready, (topo[name], name))
+        running = {}  # read fd --> (comp, pid, list of data chunks)
+        error = None
+        
+        while ready or running:
+            while ready and len(running) < self.n_procs and \
+                  error is None and not self._stop:
+                comp = getattr(scope, heappop(ready)[1])
+                try:
+                    child = self._start_comp(comp, case_id)
+                except Exception as err:
+                    error = err
+                    break
+                if child is None:  # finished in this process
+                    self._comp_done(comp.name, graph, npreds, topo, ready)
+                else:
+                    running[child[0]] = (comp, child[1], [])
+            if not running:
+                break
+            
+            for fd in select.select(running.keys(), [], [])[0]:
+                data = os.read(fd, 65536)
+                if data:
+                    running[fd][2].append(data)
+                    continue
+                os.close(fd)
+                comp, pid, chunks = running.pop(fd)
+                os.waitpid(pid, 0)
+                try:
+                    self._finish_comp(comp, ''.join(chunks))
+                except Exception as err:
+                    if error is None:
+                        error = err
+                else:
+                    self._comp_done(comp.name, graph, npreds, topo, ready)
+                    
+        if error is not None:
+            raise error
+        if self._stop:
+            raise RunStopped('Stop requested')
+
+    def _comp_done(self, name, graph, npreds, topo, ready):
+        """Update the ready queue after the named component has run."""
+        for succ in graph.successors(name):
+            npreds[succ] -= 1
+            if npreds[succ] == 0:
+                heappush(ready, (topo[succ], succ))
+
+    def _start_comp(self, comp, case_id):
+        """Update the inputs of *comp* and, if it needs to execute, fork a
+        child process to execute it.  Returns a tuple of the form
+        (read_fd, pid) for the child process, or None if *comp* was
+        completely run in this process.
+        """
+        # Drivers and Assemblies have internal state that isn't copied back,
+        # and a proxy's execution happens in its server anyway.
+        from openmdao.main.assembly import Assembly  # Avoid circular import.
+        if isinstance(comp, OpenMDAO_Proxy) or has_interface(comp, IDriver) \
+           or is_instance(comp, Assembly):
+            comp.run(case_id=case_id)
+            return None
+        
+        if comp.directory:
+            comp.push_dir()
+        try:
+            if not comp._start_run(case_id=case_id):
+                comp._post_run()
+                return None
+        finally:
+            if comp.directory:
+                comp.pop_dir()
+        
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # child
+            try:
+                os.close(rfd)
+                try:
+                    if comp.directory:
+                        comp.push_dir()
+                    comp.execute()
+                    names = comp.list_outputs()
+                    result = (True, zip(names, comp.get_many(names)))
+                    data = cPickle.dumps(result, -1)
+                except Exception as err:
+                    try:
+                        data = cPickle.dumps((False, err), -1)
+                    except Exception:
+                        data = cPickle.dumps((False, RuntimeError(str(err))), -1)
+                while data:
+                    data = data[os.write(wfd, data):]
+                os.close(wfd)
+            finally:
+                os._exit(0)
+        os.close(wfd)
+        return (rfd, pid)
+
+    def _finish_comp(self, comp, data):
+        """Copy the outputs computed by a child process into *comp* and
+        finish its run.
+        """
+        if not data:
+            comp.raise_exception('child process failed', RuntimeError)
+        ok, result = cPickle.loads(data)
+        if not ok:
+            raise result
+        if comp.directory:
+            comp.push_dir()
+        try:
+            for name, value in result:
+                setattr(comp, name, value)
+            comp.exec_count += 1
+            comp._post_execute()
+            comp._post_run()
+        finally:
+            if comp.directory:
+                comp.pop_dir()
+
     def add(self, compnames):
         """ Add new component(s) to the workflow by name. """
         super(Dataflow, self).add(compnames)
@@ -41,9 +199,11 @@ class Dataflow(SequentialWorkflow):
         """
         self._collapsed_graph = None
         self._topsort = None
+        self._graph_generation = None
 
     def _get_topsort(self):
-        if self._topsort is None:
+        if self._topsort is None or \
+           self._graph_generation != self.scope._depgraph.generation:
             graph = self._get_collapsed_graph()
             try:
                 self._topsort = nx.topological_sort(graph)
@@ -60,15 +220,26 @@ class Dataflow(SequentialWorkflow):
         of any Driver components in our workflow, and from any ExprEvaluators
         in any components in our workflow.
         """
-        if self._collapsed_graph:
+        depgraph = self.scope._depgraph
+        if self._collapsed_graph and \
+           self._graph_generation == depgraph.generation:
             return self._collapsed_graph
         
-        to_add = []
-        scope = self.scope
-        graph = scope._depgraph.copy_graph()
-        
         contents = self.get_components()
         
+        itersets = {}
+        for comp in contents:
+            if has_interface(comp, IDriver):
+                itersets[comp.name] = [c.name for c in comp.iteration_set()]
+        
+        # only components connected directly to our components or to the
+        # members of their iteration sets can affect the collapsed graph,
+        # so there's no need to copy the whole dependency graph
+        nodes = set(self._names)
+        for iterset in itersets.values():
+            nodes.update(iterset)
+        graph = depgraph.copy_neighborhood(nodes)
+        
         # add any dependencies due to ExprEvaluators
         for comp in contents:
             graph.add_edges_from([tup for tup in comp.get_expr_depends()])
@@ -80,19 +251,14 @@ class Dataflow(SequentialWorkflow):
         # in our collapsed graph
         cnames = set(self._names)
         removes = set()
-        itersets = {}
-        for comp in contents:
-            cname = comp.name
-            if has_interface(comp, IDriver):
-                iterset = [c.name for c in comp.iteration_set()]
-                itersets[cname] = iterset
-                removes.update(iterset)
-                for u,v in graph.edges_iter(nbunch=iterset): # outgoing edges
-                    if v != cname and v not in iterset:
-                        collapsed_graph.add_edge(cname, v)
-                for u,v in graph.in_edges_iter(nbunch=iterset): # incoming edges
-                    if u != cname and u not in iterset:
-                        collapsed_graph.add_edge(u, cname)
+        for cname, iterset in itersets.items():
+            removes.update(iterset)
+            for u,v in graph.edges_iter(nbunch=iterset): # outgoing edges
+                if v != cname and v not in iterset:
+                    collapsed_graph.add_edge(cname, v)
+            for u,v in graph.in_edges_iter(nbunch=iterset): # incoming edges
+                if u != cname and u not in iterset:
+                    collapsed_graph.add_edge(u, cname)
         # connect all of the edges from each driver's iterset members to itself
         to_add = []
         for drv,iterset in itersets.items():
@@ -123,4 +289,6 @@ class Dataflow(SequentialWorkflow):
             collapsed_graph.add_edges_from(to_add)
         
         self._collapsed_graph = collapsed_graph.subgraph(cnames-removes)
+        self._topsort = None
+        self._graph_generation = depgraph.generation
         return self._collapsed_graph
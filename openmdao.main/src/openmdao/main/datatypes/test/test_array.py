@@ -65,6 +65,16 @@ class ArrayTestCase(unittest.TestCase):
         self.assertAlmostEqual(2., self.hobj.arr2[1])
         self.assertAlmostEqual(4., self.hobj.arr2[2])
         
+    def test_offset_unit_conversion(self):
+        self.hobj.add('temp1', Array(array([212., 32.]), iotype='in', 
+                                     units='degF'))
+        self.hobj.add('temp2', Array(iotype='in', units='degC'))
+        self.hobj.temp2 = self.hobj.get_wrapped_attr('temp1')
+        self.assertAlmostEqual(100., self.hobj.temp2[0])
+        self.assertAlmostEqual(0., self.hobj.temp2[1])
+        # the source array must not be modified by the conversion
+        self.assertEqual(212., self.hobj.temp1[0])
+        
     def test_bogus_units(self):
         try:
             uf = Array([0.], iotype='in', units='bogus')
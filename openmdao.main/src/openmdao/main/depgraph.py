@@ -2,6 +2,7 @@
 
 import sys
 import StringIO
+from heapq import heappush, heappop
 
 import networkx as nx
 from networkx.algorithms.dag import topological_sort_recursive,is_directed_acyclic_graph
@@ -62,6 +63,21 @@ class DependencyGraph(object):
         self._graph = nx.DiGraph()
         self._graph.add_nodes_from(_fakes)
         self._allsrcs = {}
+        self._generation = 0
+        self._clear_index()
+        
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_topo_index'] = None
+        state['_fanout'] = {}
+        state['_ancestors'] = {}
+        state['_descendants'] = {}
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._generation = state.get('_generation', 0)
+        self._clear_index()
         
     def __contains__(self, compname):
         """Return True if this graph contains the given component."""
@@ -77,11 +93,108 @@ class DependencyGraph(object):
     def __ne__(self, other):
         return not self.__eq__(other)
             
+    @property
+    def generation(self):
+        """A counter that is incremented whenever nodes or connections
+        change, so users can tell if information they derived from the
+        graph is out of date.
+        """
+        return self._generation
+    
+    def _clear_index(self):
+        """Discard the cached topological ordering, variable fan-out
+        index and ancestor/descendant closures. Must be called whenever
+        nodes or connections change.
+        """
+        self._topo_index = None
+        self._fanout = {}
+        self._ancestors = {}
+        self._descendants = {}
+        self._generation += 1
+        
+    def _closure(self, cname, cache, neighbors):
+        """Return the frozenset of component names reachable from *cname*
+        by repeatedly following *neighbors*, reusing (and adding to) the
+        closures already stored in *cache*.
+        """
+        try:
+            return cache[cname]
+        except KeyError:
+            pass
+        result = set()
+        stack = [cname]
+        while stack:
+            for node in neighbors(stack.pop()):
+                if node in result or node in _fakes:
+                    continue
+                result.add(node)
+                closure = cache.get(node)
+                if closure is None:
+                    stack.append(node)
+                else:
+                    result.update(closure)
+        closure = cache[cname] = frozenset(result)
+        return closure
+        
+    def get_ancestors(self, cname):
+        """Return a frozenset of the names of all components that the
+        given component depends on, either directly or indirectly.
+        """
+        return self._closure(cname, self._ancestors, 
+                             self._graph.predecessors_iter)
+        
+    def get_descendants(self, cname):
+        """Return a frozenset of the names of all components that depend
+        on the given component, either directly or indirectly.
+        """
+        return self._closure(cname, self._descendants, 
+                             self._graph.successors_iter)
+        
+    def _get_topo_index(self):
+        """Return a dict mapping each node to its position in a
+        topological sort of the graph.
+        """
+        if self._topo_index is None:
+            self._topo_index = dict([(node, i) for i, node in 
+                                 enumerate(nx.topological_sort(self._graph))])
+        return self._topo_index
+    
+    def _get_fanout(self, src):
+        """Return a dict mapping each connected output of node *src* to a
+        list of tuples of the form (destnode, destvars). The key None maps
+        to the list of all destinations of *src*.
+        """
+        try:
+            return self._fanout[src]
+        except KeyError:
+            fanout = {None: []}
+            for dest, link in self.out_links(src):
+                if link._dests:
+                    fanout[None].append((dest, link._dests.keys()))
+                for srcvar, dests in link._srcs.items():
+                    fanout.setdefault(srcvar, []).append((dest, dests[:]))
+            self._fanout[src] = fanout
+            return fanout
+        
     def copy_graph(self):
         graph = self._graph.copy()
         graph.remove_nodes_from(_fakes)
         return graph
     
+    def copy_neighborhood(self, cnames):
+        """Return a copy of the part of the graph containing the given
+        components and all components directly connected to them. This is
+        much cheaper than copy_graph() when *cnames* is a small part of
+        a large graph.
+        """
+        graph = self._graph
+        nodes = set([name for name in cnames if name in graph])
+        for name in list(nodes):
+            nodes.update(graph.predecessors_iter(name))
+            nodes.update(graph.successors_iter(name))
+        nodes.difference_update(_fakes)
+        return graph.subgraph(nodes)
+    
     def get_source(self, destpath):
         cname, _, vname = destpath.partition('.')
         if vname: # internal dest
@@ -108,12 +221,14 @@ class DependencyGraph(object):
 
     def add(self, name):
         """Add the name of a Component to the graph."""
+        self._clear_index()
         self._graph.add_node(name)
 
     def remove(self, name):
         """Remove the name of a Component from the graph. It is not
         an error if the component is not found in the graph.
         """
+        self._clear_index()
         self._graph.remove_node(name)
                                     
     def invalidate_deps(self, scope, cnames, varsets, force=False):
@@ -133,25 +248,40 @@ class DependencyGraph(object):
             If True, force invalidation to continue even if a component in
             the dependency chain was already invalid.
         """
-        graph = self._graph
-        stack = zip(cnames, varsets)
+        topo = self._get_topo_index()
+        pending = {}  # dest node -> set of its newly invalidated inputs
+        heap = []     # dest nodes in topological order
         outset = set()  # set of changed boundary outputs
-        while(stack):
-            src, varset = stack.pop()
-            for dest,link in self.out_links(src):
-                if varset is None:
-                    srcvars = set(link._srcs.keys())
-                else:
-                    srcvars = varset
+        
+        def add_dests(src, varset):
+            fanout = self._get_fanout(src)
+            if varset is None:
+                targets = fanout[None]
+            else:
+                targets = []
+                for var in varset:
+                    targets.extend(fanout.get(var, ()))
+            for dest, dests in targets:
                 if dest == '@bout':
-                    outset.update(link.get_dests(varset))
+                    outset.update(dests)
+                elif dest in pending:
+                    pending[dest].update(dests)
                 else:
-                    dests = link.get_dests(varset)
-                    if dests:
-                        comp = getattr(scope, dest)
-                        outs = comp.invalidate_deps(varnames=dests, force=force)
-                        if (outs is None) or outs:
-                            stack.append((dest, outs))
+                    pending[dest] = set(dests)
+                    heappush(heap, (topo[dest], dest))
+                    
+        for src, varset in zip(cnames, varsets):
+            add_dests(src, varset)
+            
+        # Visiting nodes in topological order means every upstream change
+        # to a node has been collected before it's invalidated, so each
+        # component is invalidated at most once per call.
+        while heap:
+            dest = heappop(heap)[1]
+            comp = getattr(scope, dest)
+            outs = comp.invalidate_deps(varnames=pending.pop(dest), force=force)
+            if (outs is None) or outs:
+                add_dests(dest, outs)
         return outset
 
     def list_connections(self, show_passthrough=True):
@@ -259,6 +389,7 @@ class DependencyGraph(object):
         graph = self._graph
         srccompname, srcvarname, destcompname, destvarname = \
                            _cvt_names_to_graph(srcpath, destpath)
+        self._clear_index()
         
         dpdot = destpath+'.'
         for dst,src in self._allsrcs.items():
@@ -372,6 +503,7 @@ class DependencyGraph(object):
         graph = self._graph
         srccompname, srcvarname, destcompname, destvarname = \
                            _cvt_names_to_graph(srcpath, destpath)
+        self._clear_index()
         
         if srccompname == '@xin' and destcompname != '@bin':
             # this is an auto-passthrough input, so there are two connections
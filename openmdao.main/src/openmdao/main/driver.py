@@ -237,6 +237,14 @@ class Driver(Component):
         """Called after each iteration."""
         self._continue = False  # by default, stop after one iteration
 
+    def _post_run(self):
+        """Flush any recorders that buffer Cases."""
+        super(Driver, self)._post_run()
+        for recorder in self.recorders:
+            flush = getattr(recorder, 'flush', None)
+            if flush is not None:
+                flush()
+
     def config_changed(self, update_parent=True):
         """Call this whenever the configuration of this Component changes,
         for example, children are added or removed or dependencies may have
@@ -1,15 +1,18 @@
 # pylint: disable-msg=W0104,R0914
 
 #public symbols
-__all__ = ["ExprEvaluator"]
+__all__ = ["ExprEvaluator", "ExprBlock"]
 
 import weakref
 import math
 import ast
 import copy
+import threading
 import __builtin__
+from collections import OrderedDict
 
 from openmdao.main.interfaces import IDriver
+from openmdao.main.numpy_fallback import zeros
 
 # this dict will act as the local scope when we eval our expressions
 _expr_dict = {
@@ -31,6 +34,20 @@ else:
 
 _Missing = object()
 
+# Compiled code shared by all ExprEvaluators, keyed on expression text.
+# Each entry holds the free names in the expression and a dict that maps
+# which of those names are contained in the scope to the compiled results.
+# The translated code depends only on the text and on that mapping, so it
+# can be reused by any number of ExprEvaluators and scopes.
+_CODE_CACHE_SIZE = 1000
+_code_cache = OrderedDict()
+_code_cache_lock = threading.Lock()
+
+def clear_code_cache():
+    """Remove all compiled expressions from the shared code cache."""
+    with _code_cache_lock:
+        _code_cache.clear()
+
 
 # some constants used in the get/set downstream protocol
 INDEX = 0
@@ -369,6 +386,39 @@ class ExprEvaluator(object):
             
         self._parse_needed = False
         return new_ast
+
+    def _compile(self):
+        """Set up our compiled code, reusing the code from an earlier
+        parse of the same text in an equivalent scope if possible.
+        """
+        text = self.text
+        with _code_cache_lock:
+            entry = _code_cache.pop(text, None)
+        if entry is None:
+            names = set([node.id for node in ast.walk(self._pre_parse()) 
+                             if isinstance(node, ast.Name)])
+            entry = (tuple(sorted([n for n in names if not self._is_local(n)])), 
+                     {})
+        with _code_cache_lock:
+            _code_cache[text] = entry
+            while len(_code_cache) > _CODE_CACHE_SIZE:
+                _code_cache.popitem(last=False)
+
+        names, variants = entry
+        scope = self.scope
+        if names and scope is None:
+            return self._parse()  # raises the usual 'no scope' error
+        key = tuple([scope.contains(name) for name in names])
+        compiled = variants.get(key)
+        if compiled is None:
+            self._parse()
+            variants[key] = (self._code, 
+                             self._assignment_code if self._allow_set else None,
+                             self._allow_set, frozenset(self.var_names))
+        else:
+            self._code, self._assignment_code, self._allow_set, var_names = compiled
+            self.var_names = set(var_names)
+            self._parse_needed = False
                 
     def _get_updated_scope(self, scope):
         oldscope = self.scope
@@ -387,7 +437,7 @@ class ExprEvaluator(object):
         scope = self._get_updated_scope(scope)
         try:
             if self._parse_needed:
-                self._parse()
+                self._compile()
             return eval(self._code, _expr_dict, locals())
         except Exception, err:
             raise type(err)("can't evaluate expression "+
@@ -404,7 +454,7 @@ class ExprEvaluator(object):
             # and the exec call will pull it out of the locals dict
             _local_setter = val 
             if self._parse_needed:
-                self._parse()
+                self._compile()
             exec(self._assignment_code, _expr_dict, locals())
         else: # self._allow_set is False
             raise ValueError("expression '%s' can't be set to a value" % self.text)
@@ -433,7 +483,7 @@ class ExprEvaluator(object):
         expression string. 
         """
         if self._parse_needed:
-            self._parse()
+            self._compile()
         return self.var_names
 
     def get_referenced_compnames(self):
@@ -441,7 +491,7 @@ class ExprEvaluator(object):
         pathnames of Variables referenced in our expression string. 
         """
         if self._parse_needed:
-            self._parse()
+            self._compile()
         nameset = set()
         for name in self.var_names:
             parts = name.split('.',1)
@@ -454,14 +504,10 @@ class ExprEvaluator(object):
         of our expression string depends on, either directly or indirectly.
         """
         compset = self.get_referenced_compnames()
-        graph = assembly._depgraph.copy_graph()
-        visited = set()
-        while compset:
-            comp = compset.pop()
-            if comp not in visited:
-                visited.add(comp)
-                diff = set(graph.predecessors(comp)).difference(visited)
-                compset.update(diff)
+        depgraph = assembly._depgraph
+        visited = set(compset)
+        for comp in compset:
+            visited.update(depgraph.get_ancestors(comp))
         return visited
     
     def refs_valid(self):
@@ -471,7 +517,7 @@ class ExprEvaluator(object):
         scope = self.scope
         if scope: # and scope.parent:
             if self._parse_needed:
-                self._parse()
+                self._compile()
             #if not all(scope.parent.get_valid(self.var_names)):
             if not all(scope.get_valid(self.var_names)):
                 return False
@@ -482,7 +528,7 @@ class ExprEvaluator(object):
         be resolved.
         """
         if self._parse_needed:
-            self._parse()
+            self._compile()
         if len(self.var_names) > 0:
             scope = self.scope
             if scope:
@@ -506,6 +552,88 @@ class ExprEvaluator(object):
     def __str__(self):
         return self._text
 
+
+class ExprBlock(object):
+    """Evaluates a list of expressions using a single generated function
+    that stores the value of each expression into an array.  This avoids
+    the overhead of a separate ExprEvaluator.evaluate() call for each
+    expression when many expressions are always evaluated together, e.g.,
+    all of the constraints of a driver.
+    """
+    
+    def __init__(self, texts, scope=None):
+        self._exprs = [ExprEvaluator(text, scope) for text in texts]
+        self._func = None
+        
+    def __len__(self):
+        return len(self._exprs)
+    
+    def __getstate__(self):
+        """Return dict representing this block's state."""
+        state = self.__dict__.copy()
+        state['_func'] = None  # generated function won't pickle
+        return state
+    
+    @property
+    def texts(self):
+        """The expression strings."""
+        return [expr.text for expr in self._exprs]
+
+    def _compile(self):
+        """Generate a function of the form::
+        
+            def _expr_block(scope, _out):
+                _out[0] = <translated expression 0>
+                _out[1] = <translated expression 1>
+                ...
+        """
+        body = []
+        for i, expr in enumerate(self._exprs):
+            tree = expr._parse()
+            if not isinstance(tree, ast.Expression):
+                raise ValueError("expression '%s' is not allowed in an "
+                                 "ExprBlock" % expr.text)
+            target = ast.Subscript(value=ast.Name(id='_out', ctx=ast.Load()),
+                                   slice=ast.Index(value=ast.Num(n=i)),
+                                   ctx=ast.Store())
+            body.append(ast.Assign(targets=[target], value=tree.body))
+        if not body:
+            body.append(ast.Pass())
+        args = ast.arguments(args=[ast.Name(id='scope', ctx=ast.Param()),
+                                   ast.Name(id='_out', ctx=ast.Param())],
+                             vararg=None, kwarg=None, defaults=[])
+        func = ast.FunctionDef(name='_expr_block', args=args, body=body,
+                               decorator_list=[])
+        module = ast.Module(body=[func])
+        ast.fix_missing_locations(module)
+        namespace = _expr_dict.copy()
+        exec compile(module, '<ExprBlock>', 'exec') in namespace
+        self._func = namespace['_expr_block']
+
+    def evaluate(self, scope=None, out=None):
+        """Evaluate all of the expressions and return an array containing
+        their values. If *out* is supplied, the values are stored into it
+        and it is returned.
+        """
+        exprs = self._exprs
+        for expr in exprs:
+            scope = expr._get_updated_scope(scope)
+            if expr._parse_needed:
+                self._func = None
+        if self._func is None:
+            self._compile()
+        if out is None:
+            out = zeros(len(exprs), 'd')
+        try:
+            self._func(scope, out)
+        except Exception:
+            # evaluate individually to get the usual error message
+            for expr in exprs:
+                expr.evaluate()
+            raise
+        return out
+
+
 if __name__ == '__main__':
     import sys
     from openmdao.main.container import build_container_hierarchy
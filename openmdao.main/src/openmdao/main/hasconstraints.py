@@ -7,7 +7,7 @@
 import operator
 import ordereddict
 
-from openmdao.main.expreval import ExprEvaluator
+from openmdao.main.expreval import ExprEvaluator, ExprBlock
 
 _ops = {
     '>': operator.gt,
@@ -54,6 +54,18 @@ class Constraint(object):
         rhs = (self.rhs.evaluate(scope) + self.adder)*self.scaler
         return (lhs, rhs, self.comparator, not _ops[self.comparator](lhs, rhs))
         
+    def get_value_text(self):
+        """Returns an expression string for the scaled value of this
+        constraint, which is lhs-rhs for '<', '<=' and '=' constraints 
+        and rhs-lhs for '>' and '>=' constraints, so a value <= 0 means
+        an inequality constraint is satisfied.
+        """
+        lhs = '((%s)+%r)*%r' % (self.lhs.text, self.adder, self.scaler)
+        rhs = '((%s)+%r)*%r' % (self.rhs.text, self.adder, self.scaler)
+        if '>' in self.comparator:
+            return '%s-%s' % (rhs, lhs)
+        return '%s-%s' % (lhs, rhs)
+        
     def get_referenced_compnames(self):
         return self.lhs.get_referenced_compnames().union(self.rhs.get_referenced_compnames())
 
@@ -94,11 +106,13 @@ class _HasConstraintsBase(object):
     def __init__(self, parent, allowed_types=None):
         self._parent = parent
         self._constraints = ordereddict.OrderedDict()
+        self._block = None
     
     def remove_constraint(self, key):
         """Removes the constraint with the given string."""
         try:
             del self._constraints[_remove_spaces(key)]
+            self._block = None
         except KeyError:
             msg = "Constraint '%s' was not found. Remove failed." % key
             self._parent.raise_exception(msg, AttributeError)
@@ -106,6 +120,7 @@ class _HasConstraintsBase(object):
     def clear_constraints(self):
         """Removes all constraints."""
         self._constraints = ordereddict.OrderedDict()
+        self._block = None
         
     def list_constraints(self):
         """Return a list of strings containing constraint expressions."""
@@ -116,6 +131,15 @@ class _HasConstraintsBase(object):
         if cnststr in self._constraints:
             self._parent.raise_exception("'%s' is already a constraint" % cnststr)
     
+    def _eval_block(self, scope=None, out=None):
+        """Returns an array of constraint values (see 
+        Constraint.get_value_text), evaluated by a single compiled function.
+        """
+        if self._block is None:
+            self._block = ExprBlock([c.get_value_text() 
+                                     for c in self._constraints.values()])
+        return self._block.evaluate(_get_scope(self, scope), out)
+    
     def get_expr_depends(self):
         """Returns a list of tuples of the form (comp_name, self_name)
         for each component name referenced by a constraint.
@@ -217,6 +241,7 @@ class HasEqConstraints(_HasConstraintsBase):
             self._constraints[ident] = constraint
         else:
             self._constraints[name] = constraint
+        self._block = None
 
     def get_eq_constraints(self):
         """Returns an ordered dict of constraint objects."""
@@ -228,6 +253,13 @@ class HasEqConstraints(_HasConstraintsBase):
         """
         return [c.evaluate(_get_scope(self,scope)) for c in self._constraints.values()]
     
+    def eval_eq_constraint_vector(self, scope=None, out=None):
+        """Returns an array containing lhs-rhs for each equality
+        constraint, including scaler and adder. If *out* is given, the 
+        values are stored into it instead of a new array.
+        """
+        return self._eval_block(scope, out)
+    
     def allows_constraint_types(self, types):
         """Returns True if types is ['eq']."""
         return types == ['eq']
@@ -297,6 +329,7 @@ class HasIneqConstraints(_HasConstraintsBase):
             self._constraints[ident] = constraint
         else:
             self._constraints[name] = constraint
+        self._block = None
         
     def get_ineq_constraints(self):
         """Returns an ordered dict of inequality constraint objects."""
@@ -306,6 +339,14 @@ class HasIneqConstraints(_HasConstraintsBase):
         """Returns a list of constraint values"""
         return [c.evaluate(_get_scope(self,scope)) for c in self._constraints.values()]
     
+    def eval_ineq_constraint_vector(self, scope=None, out=None):
+        """Returns an array containing the value of each inequality 
+        constraint, including scaler and adder, where a value <= 0 means
+        the constraint is satisfied. If *out* is given, the values are 
+        stored into it instead of a new array.
+        """
+        return self._eval_block(scope, out)
+    
     def allows_constraint_types(self, typ):
         """Returns True if types is ['ineq']."""
         return types == ['eq']
@@ -411,6 +452,19 @@ class HasConstraints(object):
         """
         return self._ineq.eval_ineq_constraints(scope)
     
+    def eval_eq_constraint_vector(self, scope=None, out=None):
+        """Returns an array containing lhs-rhs for each equality
+        constraint, including scaler and adder.
+        """
+        return self._eq.eval_eq_constraint_vector(scope, out)
+    
+    def eval_ineq_constraint_vector(self, scope=None, out=None):
+        """Returns an array containing the value of each inequality 
+        constraint, including scaler and adder, where a value <= 0 means
+        the constraint is satisfied.
+        """
+        return self._ineq.eval_ineq_constraint_vector(scope, out)
+    
     def list_constraints(self):
         """Return a list of strings containing constraint expressions."""
         lst = self._ineq.list_constraints()
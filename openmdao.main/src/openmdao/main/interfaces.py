@@ -603,6 +603,13 @@ class IHasEqConstraints(Interface):
         eval_ineq_constraints function used for inequality constraints.
         """
 
+    def eval_eq_constraint_vector(out=None):
+        """Evaluates all of the constraint expressions at once and returns
+        an array containing lhs-rhs, including scaler and adder, for each
+        equality constraint. If *out* is given, the values are stored into
+        it and it is returned.
+        """
+
     
 class IHasIneqConstraints(Interface):
     """An Interface for objects containing inequality constraints."""
@@ -626,6 +633,14 @@ class IHasIneqConstraints(Interface):
         form (lhs, rhs, relation, is_violated).
         """
 
+    def eval_ineq_constraint_vector(out=None):
+        """Evaluates all of the constraint expressions at once and returns
+        an array containing the value of each inequality constraint,
+        including scaler and adder, where a value <= 0 means the constraint
+        is satisfied. If *out* is given, the values are stored into it and
+        it is returned.
+        """
+
 class IHasConstraints(IHasEqConstraints, IHasIneqConstraints):
     """An Interface for objects containing both equality and inequality constraints."""
     
@@ -4,6 +4,7 @@ which support various operations such as creating objects, loading models via
 egg files, remote execution, and remote file access.
 """
 
+import copy
 import logging
 import optparse
 import os.path
@@ -13,23 +14,25 @@ import shutil
 import signal
 import socket
 import sys
+import threading
 import time
 
 from multiprocessing import current_process
 
-from openmdao.main.component import SimulationRoot
+from openmdao.main.component import Component, SimulationRoot
 from openmdao.main.container import Container
 from openmdao.main.factory import Factory
 from openmdao.main.factorymanager import create, get_available_types
 from openmdao.main.filevar import RemoteFile
-from openmdao.main.mp_support import OpenMDAO_Manager, OpenMDAO_Proxy, register
+from openmdao.main.mp_support import OpenMDAO_Manager, OpenMDAO_Proxy, \
+                                     is_instance, register
 from openmdao.main.mp_util import keytype, read_allowed_hosts, setup_tunnel, \
                                   read_server_config, write_server_config
 from openmdao.main.rbac import get_credentials, set_credentials, \
                                rbac, RoleError
 from openmdao.main.releaseinfo import __version__
 
-from openmdao.util.filexfer import pack_zipfile, unpack_zipfile
+from openmdao.util.filexfer import FileCache, pack_zipfile, unpack_zipfile
 from openmdao.util.publickey import make_private, read_authorized_keys, \
                                     write_authorized_keys, HAVE_PYWIN32
 from openmdao.util.shellproc import ShellProc, STDOUT, DEV_NULL
@@ -59,6 +62,10 @@ class ObjServerFactory(Factory):
         a pipe (default).  Created :class:`ObjServer` servers will use the
         same form of address.
 
+    pool_size: int
+        Number of idle servers to keep started ahead of need, see
+        :meth:`set_pool_size`.
+
     The environment variable ``OPENMDAO_KEEPDIRS`` can be used to avoid
     having server directory trees removed when servers are shut-down.
     """
@@ -71,7 +78,7 @@ class ObjServerFactory(Factory):
     _allow_tunneling = False
 
     def __init__(self, name='ObjServerFactory', authkey=None, allow_shell=False,
-                 allowed_types=None, address=None):
+                 allowed_types=None, address=None, pool_size=0):
         super(ObjServerFactory, self).__init__()
         self._name = name
         self._authkey = authkey
@@ -79,6 +86,7 @@ class ObjServerFactory(Factory):
         self._allow_shell = allow_shell or ObjServerFactory._allow_shell
         self._allowed_types = allowed_types or ObjServerFactory._allowed_types
         self._managers = {}
+        self._managers_lock = threading.Lock()
         self._logger = logging.getLogger(name)
         self._logger.info('PID: %d, %r, allow_shell %s', os.getpid(),
                           keytype(self._authkey), allow_shell)
@@ -88,6 +96,19 @@ class ObjServerFactory(Factory):
         self.manager_class = _ServerManager
         self.server_classname = 'openmdao_main_objserverfactory_ObjServer'
 
+        # Idle servers started ahead of need by the creating user.
+        self._start_lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._pool = []
+        self._pool_size = 0
+        self._pool_count = 0
+        self._pool_generation = 0  # Bumped when pooled servers are stale.
+        self._pool_filler = None
+        self._pool_owner = get_credentials()
+        self._pool_users = {self._pool_owner.user:
+                            self._pool_owner.public_key}
+        self.set_pool_size(pool_size)
+
     @rbac('*', proxy_types=[object])  # ResourceAllocationManager import loop.
     def get_ram(self):
         """
@@ -119,9 +140,10 @@ class ObjServerFactory(Factory):
             address = 'not-a-proxy'
         self._logger.debug('release %r', server)
         self._logger.debug('        at %r', address)
-        try:
-            manager, root_dir, owner = self._managers[server]
-        except KeyError:
+        with self._managers_lock:
+            info = self._managers.get(server)
+            keys = self._managers.keys()
+        if info is None:
             # Not identical to any of our proxies.
             # Could still be a reference to the same remote object.
             try:
@@ -132,42 +154,153 @@ class ObjServerFactory(Factory):
                                    address)
                 raise ValueError("can't identify server at %r" % (address,))
 
-            for key in self._managers.keys():
+            for key in keys:
                 if key.host == server_host and key.pid == server_pid:
-                    manager, root_dir, owner = self._managers[key]
-                    server = key
-                    break
+                    with self._managers_lock:
+                        info = self._managers.get(key)
+                    if info is not None:
+                        server = key
+                        break
             else:
                 self._logger.error('release: server %r not found', server)
-                for key in self._managers.keys():
+                for key in keys:
                     self._logger.debug('    %r', key)
                     self._logger.debug('    at %r', key._token.address)
                 raise ValueError('server %r not found' % server)
 
+        manager, root_dir, owner = info
         if get_credentials().user != owner.user:
             raise RoleError('only the owner can release')
 
+        with self._managers_lock:
+            if self._managers.pop(server, None) is None:
+                return  # Concurrently released.
         manager.shutdown()
         server._close.cancel()
-        del self._managers[server]
         keep_dirs = int(os.environ.get('OPENMDAO_KEEPDIRS', '0'))
         if not keep_dirs and os.path.exists(root_dir):
             shutil.rmtree(root_dir)
 
+    @rbac('owner')
+    def set_pool_size(self, size):
+        """
+        Set the number of idle servers to keep ready. Servers are started
+        in the background, and handed out by :meth:`create` when the
+        requesting user is the user which created this factory.
+        The pool is refilled after each server is handed out.
+
+        size: int
+            Number of idle servers.
+        """
+        self._logger.debug('set_pool_size %d', size)
+        with self._pool_lock:
+            self._pool_size = size
+            excess = self._pool[size:]
+            del self._pool[size:]
+        for server in excess:
+            self.release(server)
+        self._fill_pool()
+
+    @rbac('owner')
+    def refresh_pool(self):
+        """
+        Replace any idle servers with new ones. Used after changing
+        settings, such as `allow_shell`, which servers get when started.
+        """
+        self._logger.debug('refresh_pool')
+        with self._pool_lock:
+            self._pool_generation += 1
+            stale = self._pool
+            self._pool = []
+        for server in stale:
+            self.release(server)
+        self._fill_pool()
+
+    def _fill_pool(self):
+        """ Start a thread to refill the pool of idle servers if needed. """
+        with self._pool_lock:
+            if self._pool_filler is not None or \
+               len(self._pool) >= self._pool_size:
+                return
+            self._pool_filler = threading.Thread(target=self._pool_filler_loop,
+                                                 name=self._name+'-pool')
+            self._pool_filler.daemon = True
+            self._pool_filler.start()
+
+    def _pool_filler_loop(self):
+        """ Start idle servers until the pool is full. """
+        set_credentials(self._pool_owner)
+        while True:
+            with self._pool_lock:
+                if len(self._pool) >= self._pool_size:
+                    self._pool_filler = None
+                    return
+                self._pool_count += 1
+                name = 'Pool_%d' % self._pool_count
+                generation = self._pool_generation
+            try:
+                server = self._start_server(name, self._pool_users)
+            except Exception as exc:
+                self._logger.error('pool server startup failed: %r', exc)
+                with self._pool_lock:
+                    self._pool_filler = None
+                return
+            with self._pool_lock:
+                if len(self._pool) < self._pool_size and \
+                   generation == self._pool_generation:
+                    self._pool.append(server)
+                    server = None
+            if server is not None:  # Pool shrunk or refreshed while starting.
+                self.release(server)
+
+    def _get_pooled(self, allowed_users):
+        """
+        Return an idle server for `allowed_users` from the pool, or None.
+        """
+        if allowed_users != self._pool_users or \
+           get_credentials().user != self._pool_owner.user:
+            return None
+        while True:
+            with self._pool_lock:
+                if not self._pool:
+                    return None
+                server = self._pool.pop(0)
+            try:
+                server.echo()
+            except Exception as exc:
+                self._logger.warning('discarding pool server %r: %r',
+                                     server, exc)
+                try:
+                    self.release(server)
+                except Exception:
+                    pass
+            else:
+                self._logger.debug('using pool server %r', server)
+                return server
+
     @rbac('owner')
     def cleanup(self):
-        """ Shut-down all remaining :class:`ObjServers`. """
+        """
+        Shut-down all remaining :class:`ObjServers`, including any
+        in the pool. Pooling is disabled afterwards.
+        """
         self._logger.debug('cleanup')
+        with self._pool_lock:
+            self._pool_size = 0
+            self._pool = []
         cleanup_creds = get_credentials()
-        servers = self._managers.keys()
-        for server in servers:
+        with self._managers_lock:
+            servers = [(server, info[2])
+                       for server, info in self._managers.items()]
+        for server, owner in servers:
             # Cleanup overrides release() 'owner' protection.
-            set_credentials(self._managers[server][2])
+            set_credentials(owner)
             try:
                 self.release(server)
             finally:
                 set_credentials(cleanup_creds)
-        self._managers = {}
+        with self._managers_lock:
+            self._managers = {}
 
     @rbac('*')
     def get_available_types(self, groups=None):
@@ -209,6 +342,8 @@ class ObjServerFactory(Factory):
             If `name` or `allowed_users` are specified, they are used when
             creating the :class:`ObjServer`. If no `allowed_users` are
             specified, the server is private to the current user.
+            An idle server from the pool is used if one is available for
+            `allowed_users`, in which case `name` is not used.
         """
         self._logger.info('create typname %r, version %r server %s,'
                           ' res_desc %s, args %s', typname, version, server,
@@ -216,8 +351,6 @@ class ObjServerFactory(Factory):
 
         if server is None:
             name = ctor_args.get('name', '')
-            if not name:
-                name = 'Server_%d' % (len(self._managers) + 1)
 
             allowed_users = ctor_args.get('allowed_users')
             if not allowed_users:
@@ -226,18 +359,46 @@ class ObjServerFactory(Factory):
             else:
                 del ctor_args['allowed_users']
 
-            if self._address is None or \
-               isinstance(self._address, basestring) or \
-               self._allow_tunneling:
-                # Local access only via pipe if factory accessed by pipe
-                # or factory is accessed via tunnel.
-                address = None
-            else:
-                # Network access via same IP as factory, system-selected port.
-                address = (self._address[0], 0)
+            server = self._get_pooled(allowed_users)
+            if server is None:
+                if not name:
+                    with self._managers_lock:
+                        name = 'Server_%d' % (len(self._managers) + 1)
+                server = self._start_server(name, allowed_users)
+            self._fill_pool()
+
+        if typname:
+            obj = server.create(typname, version, None, res_desc, **ctor_args)
+        else:
+            obj = server
+
+        self._logger.debug('create returning %r at %r', obj, obj._token.address)
+        return obj
+
+    def _start_server(self, name, allowed_users):
+        """
+        Start a new :class:`ObjServer` in a subdirectory of the current
+        directory and return a proxy for it.
+
+        name: string
+            Name of server.
+
+        allowed_users: dict
+            Users allowed to access the server.
+        """
+        if self._address is None or \
+           isinstance(self._address, basestring) or \
+           self._allow_tunneling:
+            # Local access only via pipe if factory accessed by pipe
+            # or factory is accessed via tunnel.
+            address = None
+        else:
+            # Network access via same IP as factory, system-selected port.
+            address = (self._address[0], 0)
 
-            manager = self.manager_class(address, self._authkey, name=name,
-                                         allowed_users=allowed_users)
+        manager = self.manager_class(address, self._authkey, name=name,
+                                     allowed_users=allowed_users)
+        with self._start_lock:
             root_dir = name
             count = 1
             while os.path.exists(root_dir):
@@ -245,41 +406,35 @@ class ObjServerFactory(Factory):
                 root_dir = '%s_%d' % (name, count)
             os.mkdir(root_dir)
 
-            # On Windows, when running the full test suite under Nose,
-            # starting the process starts a new Nose test session, which
-            # will eventually get here and start a new Nose session, which...
-            orig_main = None
-            if sys.platform == 'win32':  #pragma no cover
-                scripts = ('openmdao-script.py', 'openmdao_test-script.py')
-                if sys.modules['__main__'].__file__.endswith(scripts):
-                    orig_main = sys.modules['__main__'].__file__
-                    sys.modules['__main__'].__file__ = \
-                        pkg_resources.resource_filename('openmdao.main',
-                                                        'objserverfactory.py')
-            owner = get_credentials()
-            self._logger.debug('%s starting server %r in dir %s',
-                               owner, name, root_dir)
-            try:
-                manager.start(cwd=root_dir)
-            finally:
-                if orig_main is not None:  #pragma no cover
-                    sys.modules['__main__'].__file__ = orig_main
-
-            self._logger.info('new server %r for %s', name, owner)
-            self._logger.info('    in dir %s', root_dir)
-            self._logger.info('    listening on %s', manager.address)
-            server_class = getattr(manager, self.server_classname)
-            server = server_class(name=name, allow_shell=self._allow_shell,
-                                  allowed_types=self._allowed_types)
+        # On Windows, when running the full test suite under Nose,
+        # starting the process starts a new Nose test session, which
+        # will eventually get here and start a new Nose session, which...
+        orig_main = None
+        if sys.platform == 'win32':  #pragma no cover
+            scripts = ('openmdao-script.py', 'openmdao_test-script.py')
+            if sys.modules['__main__'].__file__.endswith(scripts):
+                orig_main = sys.modules['__main__'].__file__
+                sys.modules['__main__'].__file__ = \
+                    pkg_resources.resource_filename('openmdao.main',
+                                                    'objserverfactory.py')
+        owner = get_credentials()
+        self._logger.debug('%s starting server %r in dir %s',
+                           owner, name, root_dir)
+        try:
+            manager.start(cwd=root_dir)
+        finally:
+            if orig_main is not None:  #pragma no cover
+                sys.modules['__main__'].__file__ = orig_main
+
+        self._logger.info('new server %r for %s', name, owner)
+        self._logger.info('    in dir %s', root_dir)
+        self._logger.info('    listening on %s', manager.address)
+        server_class = getattr(manager, self.server_classname)
+        server = server_class(name=name, allow_shell=self._allow_shell,
+                              allowed_types=self._allowed_types)
+        with self._managers_lock:
             self._managers[server] = (manager, root_dir, owner)
-
-        if typname:
-            obj = server.create(typname, version, None, res_desc, **ctor_args)
-        else:
-            obj = server
-
-        self._logger.debug('create returning %r at %r', obj, obj._token.address)
-        return obj
+        return server
 
 
 class _FactoryManager(OpenMDAO_Manager):
@@ -308,8 +463,16 @@ class ObjServer(object):
         Names of types which may be created. If None, then allow types listed
         by :meth:`factorymanager.get_available_types`. If empty, no types are
         allowed.
+
+    Files sent to the server may be kept in a cache shared by all servers
+    started from the same directory (see :meth:`cache_files`). The
+    environment variable ``OPENMDAO_FILECACHE`` can be used to specify a
+    different cache directory.
     """
 
+    # Limit on size of file cache.
+    _filecache_bytes = 1 << 32  # 4GB
+
     def __init__(self, name='', allow_shell=False, allowed_types=None):
         self._allow_shell = allow_shell
         if allowed_types is None:
@@ -323,6 +486,9 @@ class ObjServer(object):
         self.version = __version__
 
         self._root_dir = os.getcwd()
+        cache_dir = os.environ.get('OPENMDAO_FILECACHE') or \
+                    os.path.join(os.path.dirname(self._root_dir), 'FileCache')
+        self._filecache = FileCache(cache_dir, self._filecache_bytes)
         self._logger = logging.getLogger(self.name)
         self._logger.info('PID: %d, allow_shell %s',
                           os.getpid(), self._allow_shell)
@@ -333,6 +499,8 @@ class ObjServer(object):
 
         SimulationRoot.chroot(self._root_dir)
         self.tlo = None
+        self._tlo_egg = None       # (filename, mtime) tlo was loaded from.
+        self._tlo_snapshot = None  # Variable state just after loading.
 
         # Ensure Traits Array support is initialized. The code contains
         # globals for numpy symbols that are initialized within
@@ -472,9 +640,48 @@ class ObjServer(object):
         self._check_path(egg_filename, 'load_model')
         if self.tlo:
             self.tlo.pre_delete()
+        self.tlo = None
+        self._tlo_egg = None
+        self._tlo_snapshot = None
         self.tlo = Container.load_from_eggfile(egg_filename)
+        self._tlo_egg = (egg_filename, os.path.getmtime(egg_filename))
+        self._tlo_snapshot = _snapshot(self.tlo)
+        if self._tlo_snapshot is None:
+            self._logger.debug('    model state not copyable,'
+                               ' restore_model will reload')
         return self.tlo
 
+    @rbac('owner', proxy_types=[Container])
+    def restore_model(self, egg_filename):
+        """
+        Return the model in `egg_filename` to the state it had just after
+        loading and return the top-level object. This is the same as
+        :meth:`load_model`, but if that egg is already loaded then only the
+        variables which have changed since are set back. The egg is
+        reloaded if it has been modified or if the model's structure
+        (the set of containers and their variables) has changed.
+
+        Note that only variable values and validity are restored; any other
+        internal state of a component is not.
+
+        egg_filename: string
+            Filename of egg to be restored.
+        """
+        self._logger.debug('restore_model %r', egg_filename)
+        if not self._allow_shell:
+            self._logger.error('attempt to restore %r by %r', egg_filename,
+                               get_credentials().user)
+            raise RuntimeError('shell access is not allowed by this server')
+        self._check_path(egg_filename, 'restore_model')
+        if self.tlo is not None and self._tlo_snapshot is not None and \
+           self._tlo_egg == (egg_filename, os.path.getmtime(egg_filename)):
+            count = _restore(self.tlo, self._tlo_snapshot)
+            if count is not None:
+                self._logger.debug('    restored %d variables', count)
+                return self.tlo
+            self._logger.debug('    model structure changed')
+        return self.load_model(egg_filename)
+
     @rbac('owner')
     def pack_zipfile(self, patterns, filename):
         """
@@ -508,6 +715,49 @@ class ObjServer(object):
         self._check_path(filename, 'unpack_zipfile')
         return unpack_zipfile(filename, self._logger, textfiles)
 
+    @rbac('owner')
+    def cache_files(self, files):
+        """
+        Add files to the file cache for later use by :meth:`link_files`.
+
+        files: dict
+            Maps path of each file to its :func:`file_digest`.
+        """
+        self._logger.debug('cache_files %d', len(files))
+        for path, digest in files.items():
+            self._check_path(path, 'cache_files')
+            self._filecache.add(path, digest)
+
+    @rbac('owner')
+    def link_files(self, files, writable=None):
+        """
+        Restore files from the file cache. Returns ``(nfiles, nbytes, missing)``
+        where `missing` lists the paths which were not in the cache.
+        Files are read-only links to the cache unless listed in `writable`.
+
+        files: dict
+            Maps path of each file to its :func:`file_digest`.
+
+        writable: list
+            Paths which are restored as ordinary writable copies.
+        """
+        self._logger.debug('link_files %d', len(files))
+        writable = set(writable or ())
+        nfiles = 0
+        nbytes = 0
+        missing = []
+        for path, digest in sorted(files.items()):
+            self._check_path(path, 'link_files')
+            link = path not in writable
+            if self._filecache.restore(digest, path, link):
+                self._logger.debug('%s %r', 'linked' if link else 'copied',
+                                   path)
+                nfiles += 1
+                nbytes += os.path.getsize(path)
+            else:
+                missing.append(path)
+        return (nfiles, nbytes, missing)
+
     @rbac('owner')
     def chmod(self, path, mode):
         """
@@ -627,6 +877,102 @@ class ObjServer(object):
                                % (operation, path, self._root_dir))
 
 
+def _containers(obj, path=''):
+    """ Generate ``(path, container)`` for `obj` and all its children. """
+    yield (path, obj)
+    for name in sorted(obj.list_containers()):
+        child = getattr(obj, name)
+        if child is not None:
+            for item in _containers(child, '.'.join([path, name]) if path
+                                                                 else name):
+                yield item
+
+
+def _signature(containers):
+    """ Return structure signature for a list of ``(path, container)``. """
+    return [(path, type(obj).__name__, tuple(sorted(obj.list_vars())))
+            for path, obj in containers]
+
+
+def _snapshot(tlo):
+    """
+    Return ``(signature, state)`` for `tlo`, where `state` is a list of
+    ``(values, valid_dict, call_execute)`` in the same order as `signature`.
+    Returns None if some variable value can't be copied.
+    """
+    containers = list(_containers(tlo))
+    state = []
+    for path, obj in containers:
+        values = {}
+        for name in obj.list_vars():
+            val = getattr(obj, name)
+            if is_instance(val, Container):
+                continue
+            # Trait list/dict objects loaded from an egg can't deepcopy
+            # themselves, so copy their contents.
+            if isinstance(val, list):
+                val = list(val)
+            elif isinstance(val, dict):
+                val = dict(val)
+            try:
+                values[name] = copy.deepcopy(val)
+            except Exception:
+                return None
+        if is_instance(obj, Component):
+            state.append((values, dict(obj._valid_dict), obj._call_execute))
+        else:
+            state.append((values, None, None))
+    return (_signature(containers), state)
+
+
+def _restore(tlo, snapshot):
+    """
+    Set variables of `tlo` that differ from `snapshot` back to their saved
+    values and restore validity. Returns the number of variables set, or
+    None if the structure of `tlo` no longer matches `snapshot`.
+    """
+    signature, state = snapshot
+    containers = list(_containers(tlo))
+    if _signature(containers) != signature:
+        return None
+
+    count = 0
+    for (path, obj), (values, valid, call_execute) in zip(containers, state):
+        for name, saved in values.items():
+            if _same(getattr(obj, name), saved):
+                continue
+            value = copy.deepcopy(saved)
+            if obj.get_iotype(name) == 'in':
+                obj._set_input_nocheck(name, value)
+            else:
+                setattr(obj, name, value)
+            count += 1
+
+    # Setting inputs invalidates downstream, so restore validity afterwards.
+    for (path, obj), (values, valid, call_execute) in zip(containers, state):
+        if valid is not None:
+            obj._valid_dict.clear()
+            obj._valid_dict.update(valid)
+            obj._call_execute = call_execute
+    return count
+
+
+def _same(val1, val2):
+    """ Returns True if `val1` equals `val2` (including numpy arrays). """
+    if type(val1) is not type(val2):
+        return False
+    if getattr(val1, 'shape', None) != getattr(val2, 'shape', None):
+        return False
+    try:
+        result = val1 == val2
+        try:
+            return bool(result)
+        except ValueError:  # Array.
+            return bool(result.all())
+    except Exception:  # Containers of arrays, etc.
+        return False
+
+
 class _ServerManager(OpenMDAO_Manager):
     """
     A :class:`multiprocessing.Manager` which manages :class:`ObjServer`.
@@ -819,8 +819,11 @@ class FactoryAllocator(ResourceAllocator):
     allow_shell: bool
         If True, :meth:`execute_command` and :meth:`load_model` are allowed
         in created servers. Use with caution!
+
+    pool_size: int
+        Number of idle servers to keep started ahead of need.
     """
-    def __init__(self, name, authkey=None, allow_shell=False):
+    def __init__(self, name, authkey=None, allow_shell=False, pool_size=0):
         super(FactoryAllocator, self).__init__(name)
 
         if authkey is None:
@@ -828,7 +831,8 @@ class FactoryAllocator(ResourceAllocator):
             if authkey is None:
                 authkey = 'PublicKey'
                 multiprocessing.current_process().authkey = authkey
-        self.factory = ObjServerFactory(name, authkey, allow_shell)
+        self.factory = ObjServerFactory(name, authkey, allow_shell,
+                                        pool_size=pool_size)
 
     def configure(self, cfg):
         """
@@ -839,17 +843,30 @@ class FactoryAllocator(ResourceAllocator):
             Configuration data is located under the section matching
             this allocator's `name`.
 
-        Allows modifying `auth_key` and `allow_shell`.
+        Allows modifying `auth_key`, `allow_shell`, and `pool_size`.
+        Idle pooled servers are replaced if `auth_key` or `allow_shell`
+        is modified.
         """
+        refresh = False
         if cfg.has_option(self.name, 'authkey'):
             value = cfg.get(self.name, 'authkey')
             self._logger.debug('    authkey: %s', value)
             self.factory._authkey = value
+            refresh = True
 
         if cfg.has_option(self.name, 'allow_shell'):
             value = cfg.getboolean(self.name, 'allow_shell')
             self._logger.debug('    allow_shell: %s', value)
             self.factory._allow_shell = value
+            refresh = True
+
+        if cfg.has_option(self.name, 'pool_size'):
+            value = cfg.getint(self.name, 'pool_size')
+            self._logger.debug('    pool_size: %s', value)
+            self.factory.set_pool_size(value)
+
+        if refresh:
+            self.factory.refresh_pool()
 
     @rbac('*')
     def deploy(self, name, resource_desc, criteria):
@@ -911,6 +928,10 @@ class LocalAllocator(FactoryAllocator):
         If True, :meth:`execute_command` and :meth:`load_model` are allowed
         in created servers. Use with caution!
 
+    pool_size: int
+        Number of idle servers to keep started ahead of need, so that
+        :meth:`deploy` can return one immediately.
+
     Resource configuration file entry equivalent to the default
     ``LocalHost`` allocator::
 
@@ -920,12 +941,14 @@ class LocalAllocator(FactoryAllocator):
         max_load: 1.0
         authkey: PublicKey
         allow_shell: True
+        pool_size: 0
 
     """
 
     def __init__(self, name='LocalAllocator', total_cpus=0, max_load=1.0,
-                 authkey=None, allow_shell=False):
-        super(LocalAllocator, self).__init__(name, authkey, allow_shell)
+                 authkey=None, allow_shell=False, pool_size=0):
+        super(LocalAllocator, self).__init__(name, authkey, allow_shell,
+                                             pool_size)
         if total_cpus > 0:
             self.total_cpus = total_cpus
         else:
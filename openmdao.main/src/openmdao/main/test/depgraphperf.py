@@ -0,0 +1,66 @@
+"""
+Time invalidation of downstream components in large assemblies.
+
+Usage: python depgraphperf.py [ncomps [reps]]
+"""
+
+import sys
+import time
+
+from openmdao.main.api import Assembly, Component, set_as_top
+from openmdao.lib.datatypes.api import Float
+
+
+class Simple(Component):
+    a = Float(iotype='in')
+    b = Float(iotype='in')
+    c = Float(iotype='out')
+    d = Float(iotype='out')
+
+    def execute(self):
+        self.c = self.a + self.b
+        self.d = self.a - self.b
+
+
+def build_model(ncomps):
+    """ Return an assembly of `ncomps` components where each component
+    feeds the next two, so most components are reachable along several
+    paths from the first one.
+    """
+    top = set_as_top(Assembly())
+    names = ['comp%d' % i for i in range(ncomps)]
+    for name in names:
+        top.add(name, Simple())
+        top.driver.workflow.add(name)
+    for i, name in enumerate(names[:-1]):
+        top.connect(name+'.c', names[i+1]+'.a')
+        if i+2 < ncomps:
+            top.connect(name+'.d', names[i+2]+'.b')
+    return top
+
+
+def run_test(ncomps, reps):
+    """ Time invalidation of the whole model from its first input. """
+    start = time.time()
+    top = build_model(ncomps)
+    et = time.time() - start
+    print '%d components: build %.3f sec' % (ncomps, et)
+
+    total = 0.
+    for i in range(reps):
+        top.run()  # make everything valid again
+        start = time.time()
+        top.comp0.a = float(i+1)
+        total += time.time() - start
+    print '    invalidate: %.6f sec/rep' % (total/reps)
+
+
+def main():
+    """ Run the benchmark for the given model size (default 1000). """
+    ncomps = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    reps = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    run_test(ncomps, reps)
+
+
+if __name__ == '__main__':
+    main()
@@ -233,6 +233,31 @@ class AssemblyTestCase(unittest.TestCase):
         self.asm.comp2.r = 33
         self.assertEqual(33, self.asm.comp2.r)
         
+    def test_transfer_plan(self):
+        top = set_as_top(Assembly())
+        top.add('comp1', Multiplier())
+        top.add('comp2', Multiplier())
+        top.driver.workflow.add(['comp1', 'comp2'])
+        top.connect('comp1.rval_out', 'comp2.rval_in')
+        top.run()
+        self.assertEqual(top.comp2.rval_out, 9.)
+        plan = top._transfer_plans['comp2']
+        
+        # plan is reused as long as the configuration doesn't change
+        top.comp1.mult = 2.0
+        top.run()
+        self.assertEqual(top.comp2.rval_out, 12.)
+        self.assertTrue(top._transfer_plans['comp2'] is plan)
+        
+        # changing connections forces a new plan
+        top.disconnect('comp1.rval_out', 'comp2.rval_in')
+        self.assertEqual(top._transfer_plans, {})
+        top.connect('comp1.rval_out', 'comp2.rval_in')
+        top.comp1.mult = 3.0
+        top.run()
+        self.assertEqual(top.comp2.rval_out, 18.)
+        self.assertFalse(top._transfer_plans['comp2'] is plan)
+        
     def test_direct_set_of_connected_input(self):
         comp1 = self.asm.comp1
         comp2 = self.asm.comp2
@@ -1,7 +1,7 @@
 import unittest
 import copy
 
-from openmdao.main.api import Component, Assembly, Case, set_as_top
+from openmdao.main.api import Component, Assembly, Case, FileRef, set_as_top
 from openmdao.lib.datatypes.api import Int, List
 
 class Simple(Component):
@@ -25,6 +25,17 @@ class Simple(Component):
         self.d = self.a - self.b
         self.c_lst = [x*2 for x in self.a_lst]
 
+class RemoteScope(object):
+    """ Mimics a proxy, for which only get() returns FileRef proxies. """
+
+    def get_many(self, paths):
+        return [FileRef('remote/path') if path == 'comp.file' else 42
+                for path in paths]
+
+    def get(self, path):
+        return 'proxy for %s' % path
+
+
 class CaseTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -101,6 +112,25 @@ class CaseTestCase(unittest.TestCase):
         self.assertTrue(case == copy.deepcopy(case))
         
         
+    def test_bad_output(self):
+        case = Case(inputs=[('comp1.a',4)], outputs=['comp2.c', 'comp2.bogus'])
+        case.apply_inputs(self.top)
+        self.top.run()
+        try:
+            case.update_outputs(self.top)
+        except Exception as err:
+            self.assertTrue("has no attribute 'bogus'" in str(err))
+        else:
+            self.fail('Exception expected')
+        self.assertEqual(case['comp2.c'], 8)
+        self.assertTrue("has no attribute 'bogus'" in case.msg)
+
+    def test_fileref_output(self):
+        case = Case(outputs=['comp.x', 'comp.file'])
+        case.update_outputs(RemoteScope())
+        self.assertEqual(case['comp.x'], 42)
+        self.assertEqual(case['comp.file'], 'proxy for comp.file')
+
     def test_items(self):
         inputs = dict(self.case.items(iotype='in'))
         self.assertEqual(len(self.inputs), len(inputs))
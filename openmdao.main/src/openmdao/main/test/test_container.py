@@ -220,6 +220,22 @@ class ContainerTestCase(unittest.TestCase):
         num = self.root.get('c2.c22.c221.number')
         self.assertEqual(num, 3.14)
 
+    def test_get_set_many(self):
+        self.root.c2.c22.c221.add('arr', List([1,2,3], iotype='in'))
+        self.root.set_many([('c2.c22.c221.number', 2.5),
+                            ('c2.c22.c221.arr', [1,7,3])])
+        self.assertEqual(self.root.c2.c22.c221.number, 2.5)
+        self.assertEqual(self.root.c2.c22.c221.arr, [1,7,3])
+        self.assertEqual(self.root.get_many(['c2.c22.c221.number',
+                                             ('c2.c22.c221.arr', [1])]),
+                         [2.5, 7])
+        try:
+            self.root.get_many(['c2.c22.c221.number', 'c2.bogus'])
+        except AttributeError as err:
+            self.assertEqual(str(err), "c2: 'Container' object has no attribute 'bogus'")
+        else:
+            self.fail('AttributeError expected')
+
     def test_add_trait_w_subtrait(self):
         obj = Container()
         obj.add('lst', List([1,2,3], iotype='in'))
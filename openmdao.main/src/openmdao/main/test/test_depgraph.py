@@ -203,6 +203,69 @@ class DepGraphTestCase(unittest.TestCase):
         dep.connect('C.d', 'F.a')
         self.assertEqual(dep.find_all_connecting('A','F'), set(['A','B','C','F']))
         
+    def test_invalidate_deps(self):
+        class Recorder(object):
+            def __init__(self):
+                self.calls = []
+            def invalidate_deps(self, varnames=None, force=False):
+                self.calls.append(set(varnames))
+                return None
+            
+        class Scope(object):
+            pass
+        
+        scope = Scope()
+        dep = DependencyGraph()
+        for node in ['A','B','C','D']:
+            dep.add(node)
+            setattr(scope, node, Recorder())
+        dep.connect('A.c', 'B.a')
+        dep.connect('A.d', 'C.a')
+        dep.connect('B.c', 'D.a')
+        dep.connect('C.c', 'D.b')
+        dep.connect('D.c', 'out')
+        
+        # D is reachable along two paths but is only invalidated once
+        outs = dep.invalidate_deps(scope, ['A'], [None])
+        self.assertEqual(outs, set(['out']))
+        self.assertEqual(scope.B.calls, [set(['a'])])
+        self.assertEqual(scope.C.calls, [set(['a'])])
+        self.assertEqual(scope.D.calls, [set(['a','b'])])
+        
+        # only the exact downstream set of A.d is invalidated
+        scope.B.calls = []
+        scope.D.calls = []
+        dep.invalidate_deps(scope, ['A'], [['d']])
+        self.assertEqual(scope.B.calls, [])
+        self.assertEqual(scope.D.calls, [set(['b'])])
+        
+        # the cached index must follow changes in connectivity
+        dep.disconnect('C.c', 'D.b')
+        scope.D.calls = []
+        dep.invalidate_deps(scope, ['A'], [['d']])
+        self.assertEqual(scope.D.calls, [])
+        
+    def test_ancestors_descendants(self):
+        dep = self.dep
+        self.assertEqual(dep.get_ancestors('B'), set(['A']))
+        self.assertEqual(dep.get_descendants('A'), set(['B']))
+        self.assertEqual(dep.get_ancestors('A'), set())
+        
+        gen = dep.generation
+        dep.add('E')
+        dep.connect('B.c', 'C.a')
+        dep.connect('C.c', 'D.a')
+        dep.connect('E.c', 'C.b')
+        self.assertTrue(dep.generation > gen)
+        self.assertEqual(dep.get_ancestors('C'), set(['A','B','E']))
+        self.assertEqual(dep.get_ancestors('D'), set(['A','B','C','E']))
+        self.assertEqual(dep.get_descendants('A'), set(['B','C','D']))
+        self.assertEqual(dep.get_descendants('E'), set(['C','D']))
+        
+        dep.disconnect('B.c', 'C.a')
+        self.assertEqual(dep.get_ancestors('D'), set(['C','E']))
+        self.assertEqual(dep.get_descendants('A'), set(['B']))
+        
     def test_dump(self):
         s = StringIO.StringIO()
         self.dep.dump(s)
@@ -4,7 +4,7 @@ import ast
 
 from openmdao.main.numpy_fallback import array
 from openmdao.main.datatypes.array import Array
-from openmdao.main.expreval import ExprEvaluator
+from openmdao.main.expreval import ExprEvaluator, ExprBlock
 from openmdao.main.api import Assembly, Container, Component, set_as_top
 from openmdao.main.datatypes.api import Float, List, Slot, Dict
 
@@ -674,6 +674,64 @@ class ExprEvalTestCase(unittest.TestCase):
         self.assertEqual(exp.get_required_compnames(top),
                          set())
         
+    def test_code_cache(self):
+        ex1 = ExprEvaluator('comp.x+a.f', self.top)
+        ex2 = ExprEvaluator('comp.x+a.f', self.top)
+        self.assertEqual(ex1.evaluate(), ex2.evaluate())
+        self.assertTrue(ex1._code is ex2._code)
+        self.assertEqual(ex2.get_referenced_varpaths(), 
+                         set(['comp.x', 'a.f']))
+        
+        # a scope that translates names differently gets its own code
+        ex3 = ExprEvaluator('f', self.top.a)
+        ex4 = ExprEvaluator('f', self.top)
+        self.assertEqual(ex3.evaluate(), self.top.a.f)
+        try:
+            ex4.evaluate()
+        except AttributeError:
+            pass
+        else:
+            self.fail("AttributeError expected")
+        self.assertFalse(ex3._code is ex4._code)
+        
+        # adding a child changes the translation
+        self.top.add('f', Float(7.5, iotype='in'))
+        ex5 = ExprEvaluator('f', self.top)
+        self.assertEqual(ex5.evaluate(), 7.5)
+        self.assertTrue(ex5._code is ex3._code)
+        
+        ex6 = ExprEvaluator('f = 10.333', self.top.a)
+        ex6.evaluate()
+        self.assertEqual(self.top.a.f, 10.333)
+        ex7 = ExprEvaluator('f = 10.333', self.top.a)
+        ex7.evaluate()
+        self.assertTrue(ex6._code is ex7._code)
+        
+    def test_block(self):
+        self.top.comp.contlist = [A(), A(), A()]
+        self.top.comp.contlist[1].a1d = [4]*5
+        texts = ['comp.x', 'a.f*2', 'sin(comp.y)+a.a1d[2]', 'comp.get_cont(1).a1d[2]']
+        block = ExprBlock(texts, self.top)
+        self.assertEqual(block.texts, texts)
+        self.assertEqual(list(block.evaluate()), 
+                         [ExprEvaluator(t, self.top).evaluate() for t in texts])
+        self.top.comp.x = -1.
+        out = block.evaluate(out=[0.]*len(texts))
+        self.assertEqual(out[0], -1.)
+        
+        # scope change forces a new function
+        block = ExprBlock(['f', 'a1d[1]'])
+        self.assertEqual(list(block.evaluate(self.top.a)), [self.top.a.f, 2.])
+        
+        block = ExprBlock(['comp.x', 'comp.bogus'], self.top)
+        try:
+            block.evaluate()
+        except AttributeError as err:
+            self.assertEqual(str(err), "can't evaluate expression 'comp.bogus': "
+                                       "comp: 'Comp' object has no attribute 'bogus'")
+        else:
+            self.fail("AttributeError expected")
+        
 if __name__ == "__main__":
     unittest.main()
     
@@ -2,6 +2,8 @@
 
 import unittest
 
+from openmdao.main.numpy_fallback import zeros
+
 from openmdao.main.api import Assembly, Driver, set_as_top
 from openmdao.util.decorators import add_delegate
 from openmdao.main.hasconstraints import HasConstraints, HasEqConstraints, HasIneqConstraints, Constraint
@@ -283,6 +285,30 @@ class HasConstraintsTestCase(unittest.TestCase):
     def test_eval_ineq_constraint(self):
         self._check_ineq_eval_constraints(MyInEqDriver())
 
+    def test_eval_constraint_vector(self):
+        drv = self.asm.add('driver', MyDriver())
+        self.asm.comp1.a = 3000
+        self.asm.comp1.b = 5000
+        drv.add_constraint('comp1.a < comp1.b', scaler=1.0/1000.0, adder=-4000.0)
+        drv.add_constraint('comp1.a > comp1.b')
+        drv.add_constraint('comp1.a = comp1.b+1.5')
+        
+        ineq = drv.eval_ineq_constraint_vector()
+        self.assertEqual(list(ineq), [-2.0, 2000.0])
+        for val, con in zip(ineq, drv.eval_ineq_constraints()):
+            self.assertEqual(val > 0, con[3])
+        self.assertEqual(list(drv.eval_eq_constraint_vector()), [-2001.5])
+        
+        out = zeros(2, 'd')
+        self.asm.comp1.b = 1000
+        self.assertTrue(drv.eval_ineq_constraint_vector(out=out) is out)
+        self.assertEqual(list(out), [2.0, -2000.0])
+        
+        drv.remove_constraint('comp1.a > comp1.b')
+        self.assertEqual(list(drv.eval_ineq_constraint_vector()), [2.0])
+        drv.clear_constraints()
+        self.assertEqual(len(drv.eval_ineq_constraint_vector()), 0)
+
 if __name__ == "__main__":
     unittest.main()
 
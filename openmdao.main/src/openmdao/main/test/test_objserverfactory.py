@@ -8,19 +8,39 @@ import logging
 import os.path
 import shutil
 import socket
+import stat
 import sys
 import time
 import unittest
 import nose
 
+import numpy
+
+from openmdao.main.api import Assembly, Component, set_as_top
 from openmdao.main.component import SimulationRoot
+from openmdao.main.datatypes.api import Float, List
 from openmdao.main.objserverfactory import ObjServerFactory, ObjServer, \
                                            start_server, stop_server, \
                                            connect_to_server, _PROXIES
+from openmdao.main.rbac import get_credentials
 from openmdao.main.resource import ResourceAllocationManager as RAM
+from openmdao.util.filexfer import file_digest
 from openmdao.util.testutil import assert_raises
 
 
+class Linear(Component):
+    """ y = a*x + b """
+
+    x = Float(iotype='in')
+    a = Float(1., iotype='in')
+    b = Float(iotype='in')
+    y = Float(iotype='out')
+    arrays = List(iotype='in')
+
+    def execute(self):
+        self.y = self.a * self.x + self.b
+
+
 class TestCase(unittest.TestCase):
     """ Test object service sub-objects for better test coverage. """
 
@@ -91,6 +111,73 @@ class TestCase(unittest.TestCase):
             if not keep_dirs:
                 shutil.rmtree(testdir)
 
+    def test_pool(self):
+        logging.debug('')
+        logging.debug('test_pool')
+
+        testdir = 'test_pool'
+        if os.path.exists(testdir):
+            shutil.rmtree(testdir)
+        os.mkdir(testdir)
+        os.chdir(testdir)
+
+        factory = None
+        try:
+            factory = ObjServerFactory(pool_size=2)
+
+            def wait_for_pool(size):
+                for i in range(600):
+                    if len(factory._pool) == size:
+                        break
+                    time.sleep(0.1)
+                self.assertEqual(len(factory._pool), size)
+
+            # Servers are handed out from the pool, which is then refilled.
+            wait_for_pool(2)
+            pooled = list(factory._pool)
+            server = factory.create('')
+            self.assertTrue(server is pooled[0])
+            self.assertEqual(server.echo('Hello'), ('Hello',))
+            wait_for_pool(2)
+            self.assertEqual(sorted(os.listdir('.')),
+                             ['Pool_1', 'Pool_2', 'Pool_3'])
+
+            # Shrinking the pool releases idle servers.
+            factory.set_pool_size(0)
+            self.assertEqual(factory._pool, [])
+            self.assertEqual(os.listdir('.'), ['Pool_1'])
+
+            # Other users don't get pooled servers.
+            factory.set_pool_size(1)
+            wait_for_pool(1)
+            credentials = get_credentials()
+            allowed_users = {credentials.user: credentials.public_key,
+                             'someone@localhost': credentials.public_key}
+            other = factory.create('', allowed_users=allowed_users)
+            self.assertEqual(len(factory._pool), 1)
+            factory.release(other)
+
+            # Refreshing replaces idle servers started with old settings.
+            stale = factory._pool[0]
+            factory._allow_shell = True
+            factory.refresh_pool()
+            wait_for_pool(1)
+            self.assertFalse(factory._pool[0] is stale)
+
+            factory.release(server)
+            factory.cleanup()
+            self.assertEqual(factory._pool, [])
+            self.assertEqual(os.listdir('.'), [])
+        finally:
+            if factory is not None:
+                factory.cleanup()
+            SimulationRoot.chroot('..')
+            if sys.platform == 'win32':
+                time.sleep(2)  # Wait for process shutdown.
+            keep_dirs = int(os.environ.get('OPENMDAO_KEEPDIRS', '0'))
+            if not keep_dirs:
+                shutil.rmtree(testdir)
+
     def test_server(self):
         logging.debug('')
         logging.debug('test_server')
@@ -103,6 +190,8 @@ class TestCase(unittest.TestCase):
 
         try:
             # Create a server.
+            os.environ['OPENMDAO_FILECACHE'] = os.path.join(os.getcwd(),
+                                                            'FileCache')
             server = ObjServer()
 
             # Create a component.
@@ -214,9 +303,31 @@ class TestCase(unittest.TestCase):
                 msg = "[Errno 2] No such file or directory: '42'"
             assert_raises(self, "server.listdir('42')",
                           globals(), locals(), OSError, msg)
+
+            # File cache.
+            digest = file_digest('fred')
+            self.assertEqual(server.link_files({'fred': digest}),
+                             (0, 0, ['fred']))
+            server.cache_files({'fred': digest})
+            os.remove('fred')
+            self.assertEqual(server.link_files({'fred': digest,
+                                                'xyzzy': 'no-such-digest'}),
+                             (1, 12, ['xyzzy']))
+            with server.open('fred', 'r') as inp:
+                self.assertEqual(inp.read(), 'Hello fred!\n')
+            os.remove('fred')
+            self.assertEqual(server.link_files({'fred': digest}, ['fred']),
+                             (1, 12, []))
+            info = os.stat('fred')
+            self.assertEqual(info.st_nlink, 1)
+            self.assertTrue(info.st_mode & stat.S_IWUSR)
+            assert_raises(self, "server.link_files({'../fred': digest})",
+                          globals(), locals(), RuntimeError,
+                          "Can't link_files '../fred', not within root ")
         finally:
             SimulationRoot.chroot('..')
             shutil.rmtree(testdir)
+            del os.environ['OPENMDAO_FILECACHE']
 
     def test_shell(self):
         logging.debug('')
@@ -274,6 +385,69 @@ class TestCase(unittest.TestCase):
             SimulationRoot.chroot('..')
             shutil.rmtree(testdir)
 
+    def test_restore(self):
+        logging.debug('')
+        logging.debug('test_restore')
+
+        testdir = 'test_restore'
+        if os.path.exists(testdir):
+            shutil.rmtree(testdir)
+        os.mkdir(testdir)
+        os.chdir(testdir)
+
+        try:
+            model = set_as_top(Assembly())
+            model.add('comp1', Linear())
+            model.add('comp2', Linear())
+            model.driver.workflow.add(['comp1', 'comp2'])
+            model.connect('comp1.y', 'comp2.x')
+            model.comp1.a = 2.
+            model.comp2.b = 1.
+            model.comp1.x = 1.
+            model.comp1.arrays = [numpy.arange(3)]
+            model.run()
+            egg_info = model.save_to_egg('model', '0', need_requirements=False)
+
+            server = ObjServer(allow_shell=True)
+            tlo = server.load_model(egg_info[0])
+            self.assertEqual(tlo.comp2.y, 3.)
+
+            # Changed variables are set back, validity is restored.
+            tlo.comp1.x = 5.
+            self.assertFalse(tlo.comp2.is_valid())
+            tlo.run()
+            self.assertEqual(tlo.comp2.y, 11.)
+            self.assertTrue(server.restore_model(egg_info[0]) is tlo)
+            self.assertEqual(tlo.comp1.x, 1.)
+            self.assertEqual(tlo.comp1.y, 2.)
+            self.assertEqual(tlo.comp2.x, 2.)
+            self.assertEqual(tlo.comp2.y, 3.)
+            self.assertTrue(tlo.comp2.is_valid())
+
+            # Values which can't be compared simply are restored.
+            tlo.comp1.arrays = [numpy.arange(3)+1]
+            self.assertTrue(server.restore_model(egg_info[0]) is tlo)
+            self.assertEqual(list(tlo.comp1.arrays[0]), [0, 1, 2])
+            tlo.comp1.x = 2.
+            tlo.run()
+            self.assertEqual(tlo.comp2.y, 5.)
+
+            # Structure change forces a reload.
+            tlo.comp1.add('w', Float(iotype='in'))
+            restored = server.restore_model(egg_info[0])
+            self.assertFalse(restored is tlo)
+            self.assertFalse(hasattr(restored.comp1, 'w'))
+            self.assertEqual(restored.comp1.x, 1.)
+
+            # Modified egg forces a reload.
+            tlo = restored
+            mtime = os.path.getmtime(egg_info[0])
+            os.utime(egg_info[0], (mtime+1, mtime+1))
+            self.assertFalse(server.restore_model(egg_info[0]) is tlo)
+        finally:
+            SimulationRoot.chroot('..')
+            shutil.rmtree(testdir)
+
 
 if __name__ == '__main__':
     sys.argv.append('--cover-package=openmdao.main')
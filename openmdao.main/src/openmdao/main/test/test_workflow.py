@@ -2,11 +2,14 @@
 Test run/step/stop aspects of a simple workflow.
 """
 
+import os
 import unittest
 
+import nose
+
 from openmdao.main.api import Assembly, Component, set_as_top
 from openmdao.main.exceptions import RunStopped
-from openmdao.lib.datatypes.api import Int, Bool
+from openmdao.lib.datatypes.api import Int, Bool, Float
 
 # pylint: disable-msg=E1101,E1103
 # "Instance of <class> has no <attr> member"
@@ -31,6 +34,34 @@ class TestComponent(Component):
 
 
 
+class Branch(Component):
+    """ Records the process it executed in. """
+
+    x = Float(0., iotype='in')
+    k = Float(2., iotype='in')
+    fail = Bool(False, iotype='in')
+    y = Float(0., iotype='out')
+    pid = Int(0, iotype='out')
+
+    def execute(self):
+        if self.fail:
+            self.raise_exception('failed', RuntimeError)
+        self.y = self.k*self.x
+        self.pid = os.getpid()
+
+
+class Sum(Component):
+    """ Adds up the branches. """
+
+    a = Float(0., iotype='in')
+    b = Float(0., iotype='in')
+    c = Float(0., iotype='in')
+    total = Float(0., iotype='out')
+
+    def execute(self):
+        self.total = self.a + self.b + self.c
+
+
 class Model(Assembly):
     """ Just a simple three-component workflow. """
 
@@ -181,8 +212,67 @@ class TestCase(unittest.TestCase):
             self.fail('Expected StopIteration')
 
 
+class ConcurrentTestCase(unittest.TestCase):
+    """ Test concurrent execution of a Dataflow. """
+
+    def setUp(self):
+        self.model = model = set_as_top(Assembly())
+        model.add('src', Branch())
+        model.add('sink', Sum())
+        names = ['b1', 'b2', 'b3']
+        for name, inp in zip(names, ['a', 'b', 'c']):
+            model.add(name, Branch())
+            model.connect('src.y', name+'.x')
+            model.connect(name+'.y', 'sink.'+inp)
+        model.driver.workflow.add(['src', 'sink'] + names)
+        model.driver.workflow.n_procs = 3
+
+    def test_concurrent(self):
+        if not hasattr(os, 'fork'):
+            raise nose.SkipTest('os.fork is required')
+        model = self.model
+        model.src.x = 1.5
+        model.run()
+        self.assertEqual(model.sink.total, 18.)
+        pids = set([getattr(model, name).pid for name in ['b1', 'b2', 'b3']])
+        self.assertEqual(len(pids), 3)
+        self.assertFalse(os.getpid() in pids)
+        self.assertEqual(model.b1.exec_count, 1)
+        self.assertEqual(model.sink.exec_count, 1)
+
+        # only invalid components run again
+        model.b2.k = 3.
+        model.run()
+        self.assertEqual(model.sink.total, 21.)
+        self.assertEqual(model.b1.exec_count, 1)
+        self.assertEqual(model.b2.exec_count, 2)
+        self.assertEqual(model.sink.exec_count, 2)
+
+        model.b3.fail = True
+        try:
+            model.run()
+        except RuntimeError as err:
+            self.assertEqual(str(err), 'b3: failed')
+        else:
+            self.fail('Expected RuntimeError')
+
+    def test_assembly(self):
+        if not hasattr(os, 'fork'):
+            raise nose.SkipTest('os.fork is required')
+        model = self.model
+        sub = model.add('sub', Assembly())
+        sub.add('comp', Branch())
+        sub.driver.workflow.add('comp')
+        model.driver.workflow.add('sub')
+        model.src.x = 1.5
+        model.run()
+        self.assertEqual(model.sink.total, 18.)
+        # Assemblies run in this process, so their internal state is kept.
+        self.assertEqual(model.sub.comp.pid, os.getpid())
+        self.assertEqual(model.sub.comp.exec_count, 1)
+
+
 if __name__ == '__main__':
-    import nose
     import sys
     sys.argv.append('--cover-package=openmdao')
     sys.argv.append('--cover-erase')
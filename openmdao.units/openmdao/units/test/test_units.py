@@ -739,6 +739,25 @@ class test__PhysicalUnit(unittest.TestCase):
         else:
             self.fail("Expecting TypeError")
             
+    def test_get_conversion_tuple(self):
+        self.assertEqual(units.get_conversion_tuple('cm', 'm'), (1/100.0, 0))
+        factor, offset = units.get_conversion_tuple('degF', 'degC')
+        self.assertAlmostEqual(factor, 0.556, 3)
+        self.assertAlmostEqual(offset, -32.0, 3)
+        
+        # second lookup comes from the cache
+        self.assertTrue(units.get_conversion_tuple('degF', 'degC') is 
+                        units.get_conversion_tuple('degF', 'degC'))
+        self.assertAlmostEqual(units.convert_units(212., 'degF', 'degC'), 
+                               100., 6)
+        
+        try:
+            units.get_conversion_tuple('m', 'degC')
+        except TypeError,err: 
+            self.assertEqual(str(err),"Incompatible units")
+        else:
+            self.fail("Expecting TypeError")
+            
     def test_name(self):
         """name should return a mathematically correct representation of the unit"""
         x1=units.PhysicalQuantity('1m')
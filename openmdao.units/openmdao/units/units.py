@@ -538,6 +538,7 @@ class PhysicalUnit(object):
 #Helper Functions
 
 _unit_cache = {}
+_conversion_cache = {}
 
 def _find_unit(unit):
     """Find unit helper function."""
@@ -644,7 +645,9 @@ def import_library(libfilepointer):
     """Imports a library."""
     global _unit_lib 
     global _unit_cache
+    global _conversion_cache
     _unit_cache = {}
+    _conversion_cache = {}
     _unit_lib = ConfigParser.ConfigParser()
     _unit_lib.optionxform = do_nothing
     _unit_lib.readfp(libfilepointer)
@@ -739,13 +742,28 @@ def import_library(libfilepointer):
 
     return _unit_lib
 
+def get_conversion_tuple(units, convunits):
+    """Return the (factor, offset) tuple that converts a value in units
+    to convunits via (value + offset) * factor. Tuples are cached by unit
+    name, so repeated conversions between the same pair of units skip
+    parsing and PhysicalQuantity creation entirely. Raises TypeError if the
+    units are incompatible.
+    """
+    key = (units, convunits)
+    try:
+        return _conversion_cache[key]
+    except KeyError:
+        tup = _find_unit(units).conversion_tuple_to(_find_unit(convunits))
+        _conversion_cache[key] = tup
+        return tup
+
+
 def convert_units(value, units, convunits):
     """Return the given value (given in units) converted 
     to convunits.
     """
-    pq = PhysicalQuantity(value, units)
-    pq.convert_to_unit(convunits)
-    return pq.value
+    factor, offset = get_conversion_tuple(units, convunits)
+    return (value + offset) * factor
     
 
 try:
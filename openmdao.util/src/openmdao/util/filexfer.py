@@ -1,11 +1,17 @@
 import fnmatch
 import glob
+import hashlib
 import os
+import shutil
+import stat
 import sys
 import zipfile
 
 from openmdao.util.log import NullLogger
 
+# Files up to this size are transferred over the network in a single call.
+_BULK_SIZE = 1 << 26  # 64MB
+
 
 def filexfer(src_server, src_path, dst_server, dst_path, mode=''):
     """
@@ -19,6 +25,9 @@ def filexfer(src_server, src_path, dst_server, dst_path, mode=''):
     After the copy has completed, permission bits from :meth:`stat` are set
     via :meth:`chmod`.
 
+    When either end is remote, files up to 64MB are transferred with a single
+    :meth:`read` and :meth:`write` rather than many small proxy calls.
+
     src_server: Proxy
         Host to get file from.
 
@@ -34,6 +43,18 @@ def filexfer(src_server, src_path, dst_server, dst_path, mode=''):
     mode: string
         Mode settings for :func:`open`, not including 'r' or 'w'.
     """
+    if src_server is None:
+        info = os.stat(src_path)
+    else:
+        info = src_server.stat(src_path)
+
+    if src_server is None and dst_server is None:
+        chunk = 1 << 20  # 1MB locally.
+    elif info.st_size <= _BULK_SIZE:
+        chunk = max(info.st_size, 1)  # Entire file over network.
+    else:
+        chunk = 1 << 23  # 8MB over network.
+
     if src_server is None:
         src_file = open(src_path, 'r'+mode)
     else:
@@ -45,29 +66,211 @@ def filexfer(src_server, src_path, dst_server, dst_path, mode=''):
         else:
             dst_file = dst_server.open(dst_path, 'w'+mode)
 
-        if src_server is None and dst_server is None:
-            chunk = 1 << 20  # 1MB locally.
-        else:
-            chunk = 1 << 17  # 128KB over network.
-
         try:
             data = src_file.read(chunk)
             while data:
                 dst_file.write(data)
+                if len(data) < chunk:
+                    break  # Short read, avoid another round trip for EOF.
                 data = src_file.read(chunk)
         finally:
             dst_file.close()
     finally:
         src_file.close()
 
-    if src_server is None:
-        mode = os.stat(src_path).st_mode
-    else:
-        mode = src_server.stat(src_path).st_mode
     if dst_server is None:
-        os.chmod(dst_path, mode)
+        os.chmod(dst_path, info.st_mode)
     else:
-        dst_server.chmod(dst_path, mode)
+        dst_server.chmod(dst_path, info.st_mode)
+
+
+def file_digest(path):
+    """
+    Returns the SHA-1 hex digest of the contents of file `path`.
+
+    path: string
+        Path to file to be hashed.
+    """
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as inp:
+        data = inp.read(1 << 20)
+        while data:
+            sha1.update(data)
+            data = inp.read(1 << 20)
+    return sha1.hexdigest()
+
+
+class FileCache(object):
+    """
+    A content-addressed store of files, keyed by :func:`file_digest`.
+    Files are copied into the cache and made read-only. They are restored
+    by hard-linking where the platform supports it, so restored files are
+    read-only too; a program which updates an input in place should
+    remove and recreate it instead.
+
+    directory: string
+        Path to cache directory. It is created when the first file is added.
+
+    max_bytes: int
+        If not None, the least recently used files are removed when the
+        cache grows beyond this size.
+    """
+
+    def __init__(self, directory, max_bytes=None):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self._total = None  # Running size estimate, None until scanned.
+
+    def _path(self, digest):
+        """ Returns path to cached file for `digest`. """
+        return os.path.join(self.directory, digest)
+
+    def __contains__(self, digest):
+        return os.path.exists(self._path(digest))
+
+    def add(self, path, digest=None):
+        """
+        Add file `path` to the cache, returning its digest.
+
+        path: string
+            Path to file to be added.
+
+        digest: string
+            Key for the file. If None, :func:`file_digest` is used.
+        """
+        if digest is None:
+            digest = file_digest(path)
+        cached = self._path(digest)
+        if not os.path.exists(cached):
+            tmp = self._tmpname(digest)
+            shutil.copyfile(path, tmp)
+            self._install(tmp, cached)
+        return digest
+
+    def write(self, digest, data):
+        """
+        Store string `data` under `digest`.
+
+        digest: string
+            Key for the data.
+
+        data: string
+            Data to be stored.
+        """
+        tmp = self._tmpname(digest)
+        with open(tmp, 'wb') as out:
+            out.write(data)
+        self._install(tmp, self._path(digest))
+
+    def read(self, digest):
+        """
+        Returns the data stored under `digest`, or None if not in the cache.
+
+        digest: string
+            Key for the data.
+        """
+        cached = self._path(digest)
+        try:
+            with open(cached, 'rb') as inp:
+                data = inp.read()
+        except IOError:
+            return None
+        self._touch(cached)
+        return data
+
+    def _tmpname(self, digest):
+        """ Returns temporary path to use when adding `digest`. """
+        if not os.path.exists(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:  # Possibly created by another process.
+                if not os.path.isdir(self.directory):
+                    raise
+        return '%s.%d' % (self._path(digest), os.getpid())
+
+    def _install(self, tmp, cached):
+        """ Move `tmp` to `cached`, then prune if necessary. """
+        # Rename into place so concurrent readers never see partial files.
+        os.chmod(tmp, stat.S_IREAD)
+        size = os.path.getsize(tmp)
+        os.rename(tmp, cached)
+        if self.max_bytes is not None:
+            # Only rescan when our estimate says the cache may be too big.
+            if self._total is not None:
+                self._total += size
+            if self._total is None or self._total > self.max_bytes:
+                self.prune(self.max_bytes)
+
+    def _touch(self, cached):
+        """ Record use of `cached` for :meth:`prune`. """
+        try:
+            os.utime(cached, None)
+        except OSError:  # pragma no cover
+            pass
+
+    def restore(self, digest, path, link=True):
+        """
+        Place the cached file for `digest` at `path`.
+        Returns False if `digest` is not in the cache.
+
+        digest: string
+            Key for the cached file.
+
+        path: string
+            Where to place the file.
+
+        link: bool
+            If True, `path` is a read-only hard link to the cached file
+            (where supported). Otherwise `path` is a writable copy.
+        """
+        cached = self._path(digest)
+        if not os.path.exists(cached):
+            return False
+        if os.path.exists(path):
+            os.remove(path)  # Don't write through an existing link.
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        if link:
+            try:
+                os.link(cached, path)
+            except (AttributeError, OSError):  # No os.link() on Windows.
+                link = False
+        if not link:
+            shutil.copyfile(cached, path)
+        self._touch(cached)
+        return True
+
+    def prune(self, max_bytes):
+        """
+        Remove least recently used files until the cache is no larger than
+        `max_bytes`.
+
+        max_bytes: int
+            Maximum total size of cached files.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if os.path.splitext(name)[1][1:].isdigit():
+                continue  # Temporary file being added by some process.
+            path = os.path.join(self.directory, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue  # Possibly removed by another process.
+            entries.append((info.st_mtime, info.st_size, path))
+            total += info.st_size
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:  # pragma no cover
+                pass  # Possibly removed by another process.
+            total -= size
+        self._total = total
 
 
 def pack_zipfile(patterns, filename, logger=None):
@@ -137,6 +340,8 @@ def unpack_zipfile(filename, logger=None, textfiles=None):
             filename = info.filename
             size = info.file_size
             logger.debug('unpacking %r (%d)...', filename, size)
+            if os.path.isfile(filename):
+                os.remove(filename)  # Possibly a read-only cached link.
             zipped.extract(info)
             # Requires mismatched systems.
             if info.create_system != local_system:  # pragma no cover
@@ -2,7 +2,7 @@ import os.path
 import signal
 import subprocess
 import sys
-import time
+import threading
 
 PIPE = subprocess.PIPE
 STDOUT = subprocess.STDOUT
@@ -100,46 +100,81 @@ class ShellProc(subprocess.Popen):
         if timeout is not None:
             return self.wait(timeout=timeout)
 
-    def wait(self, poll_delay=0., timeout=0.):
+    def wait(self, poll_delay=0., timeout=0., output_handler=None):
         """
-        Polls for command completion or timeout.
+        Waits for command completion or timeout.
         Closes any files implicitly opened.
         Returns ``(return_code, error_msg)``.
 
+        Completion is detected as soon as the process exits, by a thread
+        blocked waiting for it, so there is no polling latency and any
+        number of processes may be waited for concurrently.
+
         poll_delay: float (seconds)
-            Time to delay between polling for command completion.
-            A value of zero uses an internal default.
+            Not used, retained for compatibility.
 
         timeout: float (seconds)
             Maximum time to wait for command completion.
             A value of zero implies an infinite maximum wait.
+
+        output_handler: callable
+            If specified, then lines from `stdout` and `stderr` streams which
+            are :data:`PIPE` are passed to ``output_handler(name, line)`` as
+            they are read, where `name` is 'stdout' or 'stderr'.
         """
-        return_code = None
+        readers = []
+        if output_handler is not None:
+            for name in ('stdout', 'stderr'):
+                stream = getattr(self, name)
+                if stream is not None:
+                    reader = threading.Thread(target=_read_stream,
+                                              args=(stream, name,
+                                                    output_handler))
+                    reader.daemon = True
+                    reader.start()
+                    readers.append(reader)
+
         try:
-            if poll_delay <= 0:
-                poll_delay = max(0.1, timeout/100.)
-                poll_delay = min(10., poll_delay)
-            npolls = int(timeout / poll_delay) + 1
-
-            time.sleep(poll_delay)
-            return_code = self.poll()
-            while return_code is None:
-                npolls -= 1
-                if (timeout > 0) and (npolls < 0):
-                    self.terminate()
+            exited = self._watch()
+            # Event.wait() without a timeout can't be interrupted.
+            while not exited.is_set():
+                exited.wait(timeout or 60.)
+                if timeout > 0:
                     break
-                time.sleep(poll_delay)
-                return_code = self.poll()
+            return_code = self.returncode
+            if return_code is None:
+                self.terminate()
+            else:
+                for reader in readers:
+                    reader.join()
         finally:
             self.close_files()
 
-        # self.returncode set by self.poll().
         if return_code is not None:
             self.errormsg = self.error_message(return_code)
         else:
             self.errormsg = 'Timed out'
         return (return_code, self.errormsg)
 
+    def _watch(self):
+        """
+        Returns an :class:`threading.Event` which is set when the process
+        exits, starting a thread to wait for that if necessary.
+        """
+        if getattr(self, '_exited', None) is None:
+            self._exited = threading.Event()
+            watcher = threading.Thread(target=self._wait_for_exit)
+            watcher.daemon = True
+            watcher.start()
+        return self._exited
+
+    def _wait_for_exit(self):
+        """ Blocks until the process exits (sets `returncode`). """
+        try:
+            subprocess.Popen.wait(self)
+        finally:
+            self._exited.set()
+
     def error_message(self, return_code):
         """
         Return error message for `return_code`.
@@ -165,6 +200,12 @@ class ShellProc(subprocess.Popen):
         return error_msg
 
 
+def _read_stream(stream, name, handler):
+    """ Pass lines read from `stream` to `handler`. """
+    for line in iter(stream.readline, ''):
+        handler(name, line)
+
+
 def call(args, stdin=None, stdout=None, stderr=None, env=None,
          poll_delay=0., timeout=0.):
     """
@@ -186,8 +227,7 @@ def call(args, stdin=None, stdout=None, stderr=None, env=None,
         Environment variables for the command.
 
     poll_delay: float (seconds)
-        Time to delay between polling for command completion.
-        A value of zero uses an internal default.
+        Not used, retained for compatibility.
 
     timeout: float (seconds)
         Maximum time to wait for command completion.
@@ -218,8 +258,7 @@ def check_call(args, stdin=None, stdout=None, stderr=None, env=None,
         Environment variables for the command.
 
     poll_delay: float (seconds)
-        Time to delay between polling for command completion.
-        A value of zero uses an internal default.
+        Not used, retained for compatibility.
 
     timeout: float (seconds)
         Maximum time to wait for command completion.
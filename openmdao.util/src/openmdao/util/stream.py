@@ -235,6 +235,41 @@ class Stream(object):
 
         return data.reshape(shape, order=order) if reshape else data
 
+    def map_floats(self, shape, order='C'):
+        """
+        Returns floats as a :class:`numpy.memmap` of `shape` referencing
+        the data at the current file position, which is then advanced past
+        the data. Data is only read from the file when accessed, and
+        modifications are not written back to the file.
+        Only valid for binary streams on a real file.
+
+        shape: tuple(int)
+            Dimensions of returned array.
+
+        order: string
+            If 'C', the data is in row-major order.
+            If 'Fortran', the data is in column-major order.
+        """
+        if not self.binary:
+            raise RuntimeError('map_floats requires binary data')
+
+        count = 1
+        try:
+            for size in shape:
+                count *= size
+        except TypeError:
+            count = shape
+            shape = (shape,)
+
+        dtype = numpy.dtype(numpy.float32 if self.single_precision
+                                          else numpy.float64)
+        dtype = dtype.newbyteorder('>' if self.big_endian else '<')
+        offset = self.file.tell()
+        data = numpy.memmap(self.file, dtype=dtype, mode='c', offset=offset,
+                            shape=tuple(shape), order=order[0])
+        self.file.seek(offset + count * dtype.itemsize)
+        return data
+
     def read_recordmark(self):
         """ Returns value of next recordmark. """
         fmt = '>' if self.big_endian else '<'
@@ -6,10 +6,11 @@ import logging
 import os.path
 import signal
 import sys
+import time
 import unittest
 
 from openmdao.util.shellproc import call, check_call, CalledProcessError, \
-                                    ShellProc
+                                    ShellProc, PIPE
 
 
 class TestCase(unittest.TestCase):
@@ -80,6 +81,37 @@ class TestCase(unittest.TestCase):
         else:
             self.assertEqual(msg, ': SIGTERM')
 
+    def test_wait(self):
+        logging.debug('')
+        logging.debug('test_wait')
+
+        # Concurrent children.
+        sleep = 'import time; time.sleep(%s)'
+        start = time.time()
+        procs = [ShellProc([sys.executable, '-c', sleep % 1]) for i in range(5)]
+        for proc in procs:
+            self.assertEqual(proc.wait(), (0, ''))
+        self.assertTrue(time.time() - start < 4)
+
+        # Timeout.
+        proc = ShellProc([sys.executable, '-c', sleep % 10])
+        start = time.time()
+        return_code, error_msg = proc.wait(timeout=0.5)
+        self.assertEqual(return_code, None)
+        self.assertEqual(error_msg, 'Timed out')
+        self.assertTrue(time.time() - start < 5)
+
+        # Streamed output.
+        lines = []
+        def handler(name, line):
+            lines.append((name, line.rstrip()))
+        code = "import sys; print 'out'; sys.stdout.flush();" \
+               " sys.stderr.write('err\\n')"
+        proc = ShellProc([sys.executable, '-c', code], stdout=PIPE,
+                         stderr=PIPE)
+        self.assertEqual(proc.wait(output_handler=handler), (0, ''))
+        self.assertEqual(sorted(lines), [('stderr', 'err'), ('stdout', 'out')])
+
 
 if __name__ == '__main__':
     import nose
@@ -560,6 +560,43 @@ class TestCase(unittest.TestCase):
             new_data = stream.read_floats((5, 2), order='Fortran')
         numpy.testing.assert_array_equal(new_data, arr2d)
 
+    def test_map_floats(self):
+        logging.debug('')
+        logging.debug('test_map_floats')
+
+        with open(self.filename, 'wb') as out:
+            out.write(UNF_R4A)
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, single_precision=True,
+                            unformatted=True)
+            self.assertEqual(stream.read_recordmark(), 32)
+            data = stream.map_floats((2, 4), order='Fortran')
+            self.assertEqual(stream.read_recordmark(), 32)
+        self.assertTrue(isinstance(data, numpy.memmap))
+        expected = numpy.array([1., 2., 3., 4., 5., 6., 7., 8.],
+                               dtype=numpy.float32).reshape((2, 4), order='F')
+        numpy.testing.assert_array_equal(data, expected)
+
+        # Modifications are not written to the file.
+        data[0, 0] = 42.
+        with open(self.filename, 'rb') as inp:
+            self.assertEqual(inp.read(), UNF_R4A)
+
+        # Big-endian.
+        arr = numpy.array([1., 2., 3.], dtype=numpy.float64)
+        with open(self.filename, 'wb') as out:
+            stream = Stream(out, binary=True, big_endian=True)
+            stream.write_floats(arr)
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, big_endian=True)
+            data = stream.map_floats(3)
+        numpy.testing.assert_array_equal(data, arr)
+
+        with open(self.filename, 'r') as inp:
+            stream = Stream(inp)
+            assert_raises(self, 'stream.map_floats(3)', globals(), locals(),
+                          RuntimeError, 'map_floats requires binary data')
+
     def test_misc(self):
         logging.debug('')
         logging.debug('test_misc')